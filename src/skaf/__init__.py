@@ -1,4 +1,2 @@
 from .registry import load_and_register_template_plugins, load_and_register_packaged_templates
-
-load_and_register_packaged_templates()
-load_and_register_template_plugins()
+from .scaffold import Scaffolder, ScaffoldError, VariableError, OutputExistsError, RenderError
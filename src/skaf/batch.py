@@ -0,0 +1,124 @@
+import csv
+import json
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Generator, Iterable
+
+from .scaffold import Scaffolder
+from .template_classes.base import BaseTemplate
+
+
+BATCH_FORMATS = ("jsonl", "yaml", "csv")
+DEFAULT_NAME_FIELD = "project_name"
+
+_format_suffixes = {
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".csv": "csv",
+}
+
+
+@dataclass
+class BatchResult:
+    project_name: str
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def detect_batch_format(filepath: Path) -> str:
+    suffix = Path(filepath).suffix.lower()
+    if suffix not in _format_suffixes:
+        raise ValueError(f"Cannot infer the format of '{filepath}'. Use one of: {', '.join(BATCH_FORMATS)}.")
+    return _format_suffixes[suffix]
+
+
+def iter_variable_sets(filepath: Path, format: str | None = None) -> Generator[dict[str, Any], None, None]:
+    """
+    Streams per-project variable sets from a JSON Lines, YAML or CSV file, one record
+    at a time. YAML files may hold several `---`-separated documents, each of which is
+    either a single mapping or a list of mappings.
+    """
+    filepath = Path(filepath)
+    format = format or detect_batch_format(filepath)
+    with open(filepath, 'r', newline='' if format == "csv" else None) as file:
+        if format == "jsonl":
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError(f"Line {line_number} of '{filepath}' is not a JSON object.")
+                yield record
+        elif format == "yaml":
+            import yaml
+            for document in yaml.safe_load_all(file):
+                if document is None:
+                    continue
+                records = document if isinstance(document, list) else [document]
+                for record in records:
+                    if not isinstance(record, dict):
+                        raise ValueError(f"Entries of '{filepath}' must be mappings, got {type(record).__name__}.")
+                    yield record
+        elif format == "csv":
+            yield from csv.DictReader(file)
+        else:
+            raise ValueError(f"Batch format '{format}' does not exist. Use one of: {', '.join(BATCH_FORMATS)}.")
+
+
+def scaffold_one(scaffolder: Scaffolder,
+                 variables: dict[str, Any],
+                 output_dir: Path,
+                 name_field: str = DEFAULT_NAME_FIELD,
+                 overwrite: bool = False,
+                 ) -> BatchResult:
+    """
+    Scaffolds a single project of a batch without prompting, returning its result
+    rather than raising or exiting.
+    """
+    variables = dict(variables)
+    project_name = variables.pop(name_field, None)
+    if not project_name:
+        return BatchResult(str(project_name), f"Missing '{name_field}' field.")
+    try:
+        scaffolder.scaffold(str(project_name), variables, output_dir, overwrite=overwrite)
+    except Exception as e:
+        etype = type(e).__name__
+        return BatchResult(project_name, f"{etype}: {e}")
+    return BatchResult(project_name)
+
+
+def run_batch(template: BaseTemplate | Scaffolder,
+              variable_sets: Iterable[dict[str, Any]],
+              output_dir: Path,
+              name_field: str = DEFAULT_NAME_FIELD,
+              overwrite: bool = False,
+              jobs: int = 1,
+              **scaffolder_kwargs,
+              ) -> Generator[BatchResult, None, None]:
+    """
+    Scaffolds one project per variable set from a single, already loaded template and
+    yields a `BatchResult` for each, in input order. A template is wrapped in a
+    `Scaffolder`, created with `scaffolder_kwargs`, that every project reuses. With
+    `jobs > 1`, projects are scaffolded concurrently on a thread pool while reading at
+    most `2 * jobs` variable sets ahead.
+    """
+    scaffolder = template if isinstance(template, Scaffolder) else Scaffolder(template, **scaffolder_kwargs)
+    if jobs <= 1:
+        for variables in variable_sets:
+            yield scaffold_one(scaffolder, variables, output_dir, name_field, overwrite)
+        return
+    window: deque[Future] = deque()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for variables in variable_sets:
+            window.append(pool.submit(scaffold_one, scaffolder, variables, output_dir, name_field, overwrite))
+            while len(window) > 2 * jobs:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
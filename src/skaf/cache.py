@@ -0,0 +1,124 @@
+import os
+import shutil
+from pathlib import Path
+
+
+CACHE_DIR_ENV_VAR = "SKAF_CACHE_DIR"
+NO_CACHE_ENV_VAR = "SKAF_NO_CACHE"
+# The named areas of the user cache, each kept in its own subdirectory.
+CACHE_AREAS = ("bytecode", "computed_defaults", "git", "helpers", "renders", "templates")
+
+
+def user_cache_dir() -> Path:
+    """
+    Returns the root of skaf's user cache directory.
+    Honors `SKAF_CACHE_DIR`, then `XDG_CACHE_HOME`, and finally falls back to `~/.cache/skaf`.
+    """
+    if explicit := os.environ.get(CACHE_DIR_ENV_VAR):
+        return Path(explicit)
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(xdg_cache_home) / "skaf"
+
+
+def cache_enabled() -> bool:
+    """
+    Returns False when persistent caching has been disabled with `SKAF_NO_CACHE`.
+    """
+    return os.environ.get(NO_CACHE_ENV_VAR, "").lower() not in ("1", "true", "yes")
+
+
+def disable_cache() -> None:
+    """
+    Disables persistent caching for this process and any child processes it spawns.
+    """
+    os.environ[NO_CACHE_ENV_VAR] = "1"
+
+
+def cache_subdir(name: str) -> Path:
+    """
+    Returns the path of a named cache area inside the user cache directory.
+    The directory is not created.
+    """
+    return user_cache_dir() / name
+
+
+def directory_usage(path: Path) -> tuple[int, int]:
+    """
+    Returns a `(file_count, total_bytes)` tuple for all files below `path`.
+    """
+    count, size = 0, 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.stat(os.path.join(root, name)).st_size
+                count += 1
+            except FileNotFoundError:
+                continue
+    return count, size
+
+
+def prune_directory(path: Path, max_bytes: int) -> int:
+    """
+    Deletes the least recently used files below `path` until their total size is at
+    most `max_bytes`. Recency is judged by modification time, which cache readers bump
+    on every hit. Returns the total size remaining.
+    """
+    entries = []
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            filepath = os.path.join(root, name)
+            try:
+                stat = os.stat(filepath)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, filepath))
+            total += stat.st_size
+    entries.sort()
+    for _, size, filepath in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(filepath)
+        except FileNotFoundError:
+            pass
+        total -= size
+    return total
+
+
+def cache_stats() -> dict[str, tuple[int, int]]:
+    """
+    Returns `(file_count, total_bytes)` usage for each named cache area.
+    """
+    root = user_cache_dir()
+    if not root.is_dir():
+        return {}
+    return {
+        entry.name: directory_usage(Path(entry.path))
+        for entry in sorted(os.scandir(root), key=lambda e: e.name)
+        if entry.is_dir()
+    }
+
+
+def clear_cache(names: list[str] | None = None) -> list[str]:
+    """
+    Removes the named cache areas (see `CACHE_AREAS`), or the entire user cache
+    directory when no names are given. Returns the names of the areas that were
+    removed. Raises a ValueError for a name that is not a cache area, before anything
+    is removed.
+    """
+    root = user_cache_dir()
+    for name in names or ():
+        if name not in CACHE_AREAS or (root / name).resolve().parent != root.resolve():
+            raise ValueError(f"'{name}' is not a cache area. Choose from: {', '.join(CACHE_AREAS)}.")
+    if not root.is_dir():
+        return []
+    if not names:
+        names = [entry.name for entry in os.scandir(root) if entry.is_dir(follow_symlinks=False)]
+    removed = []
+    for name in names:
+        target = root / name
+        if target.is_dir() and not target.is_symlink():
+            shutil.rmtree(target)
+            removed.append(name)
+    return removed
@@ -1,34 +1,76 @@
 import sys
 import os
+from contextlib import nullcontext, redirect_stdout
 from pathlib import Path
-from .scaffold import scaffold_project
+from .scaffold import Scaffolder, scaffold_project
 from argparse import ArgumentParser
 from .template_classes.filesystem_template import FilesystemTemplate
-from .template_classes.git_template import GitTemplate
+from .template_classes.archive_template import ArchiveTemplate, is_archive
+from .template_classes.pack_template import PACK_SUFFIX, PackTemplate, write_pack
+from .scaffold.executors import EXECUTORS
+from .scaffold.static import LINK_MODES
+from .scaffold.dedup import Deduplicator
+from .scaffold.sinks import SINKS, STDOUT
+from .scaffold.manifest import Manifest, ManifestReport
+from .batch import BATCH_FORMATS, DEFAULT_NAME_FIELD, iter_variable_sets, run_batch
+from .registry import available_templates, get_template
+from .template_classes.base import BaseTemplate
+from .cache import CACHE_AREAS, user_cache_dir, cache_stats, clear_cache, disable_cache
 
 
 def get_args():
-    parser = ArgumentParser(description="Run the templater to build out a project file structure from templates.")
+    parser = ArgumentParser(
+        description="Run the templater to build out a project file structure from templates.",
+        epilog=f"Subcommands: {', '.join(sorted(_commands))}. To create a project named like a subcommand, "
+               f"give an option or '--' before its name, e.g. 'skaf -t <template> cache' or 'skaf -t <template> -- cache'.",
+    )
     parser.add_argument("name", help="The name of the project to create.")
     parser.add_argument("-t", "--template", default=None, help="Name of the project template to use.")
-    parser.add_argument("-p", "--path", default=None, help="Path to a template directory.")
+    parser.add_argument("-p", "--path", default=None, help=f"Path to a template directory, a '{PACK_SUFFIX}' template pack, or a zip or tar archive of a template directory.")
     parser.add_argument("--varfile", default=None, help="Path to a yaml file holding variables values.")
-    parser.add_argument("-g", "--git", default=None, help="URI of a git repo to be used as a template directory.")
-    parser.add_argument("-o", "--output", help="Output directory for the project.", default=os.getcwd())
+    parser.add_argument("-g", "--git", default=None, help="URI of a git repo to be used as a template directory. Append '@<ref>' to use a branch, tag or commit.")
+    parser.add_argument("--git-no-checkout", action="store_true", help="Read --git templates straight from git objects, fetching file contents lazily, instead of extracting a working tree.")
+    parser.add_argument("--offline", action="store_true", help="Resolve --git templates from the local clone cache only, without contacting the remote.")
+    parser.add_argument("-o", "--output", help="Output directory for the project, or a .zip, .tar or .tar.gz archive to write it to. Use '-' to write a tar archive to standard output.", default=os.getcwd())
+    parser.add_argument("--output-format", choices=SINKS, default=None, help="Write the project to a directory or to an archive of this format, instead of inferring it from the --output suffix.")
     parser.add_argument("--overwrite", action="store_true", help="Force overwrite existing files.")
     parser.add_argument("--auto-use-defaults", action="store_true", help="Automatically use default values for template variables if present. (Overrides the template properties field of the same name.)")
     parser.add_argument("--debug", action="store_true", help="Enable debug mode.")
     parser.add_argument("--no-project-dir", action="store_true", help="Do not create a project directory.")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Number of files to render in parallel.")
+    parser.add_argument("--executor", choices=EXECUTORS, default=None, help="How to render files: 'serial', or in parallel on a 'thread' or 'process' pool. Defaults to 'thread' when --jobs is greater than 1.")
+    parser.add_argument("--link-static", choices=LINK_MODES, default="copy", help="How to materialize files that are not templated: 'copy' (default), 'hardlink' or 'reflink'. Falls back to copying where linking is unsupported.")
+    parser.add_argument("--manifest", action="store_true", help="Write a .skaf-manifest into the project so that later runs with --overwrite only update the files that changed.")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write skaf's persistent user cache.")
+    parser.add_argument("--render-cache", action="store_true", default=None, help="Reuse rendered files from skaf's user cache when a file is rendered again with the same variable values, and store new ones there. Defaults to the SKAF_RENDER_CACHE environment variable.")
+    parser.add_argument("--dedup", nargs="?", const="hardlink", choices=LINK_MODES, default=None, help="Write each distinct rendered output once and materialize files that repeat it as hard links (default), reflinks or copies of the first one.")
     args = parser.parse_args()
     if args.auto_use_defaults is False:
         args.auto_use_defaults = None  # tracks only explicit True
     return args
 
 
-def get_filesystem_template(template_path) -> FilesystemTemplate:
+def print_manifest_report(report: ManifestReport):
+    for label, paths in (("added", report.added), ("changed", report.changed),
+                         ("removed", report.removed), ("conflict", report.conflicted)):
+        for path in paths:
+            print(f"{label:<9} {path}")
+    print(f"Files: {report.summary()}.")
+
+
+def print_dedup_summary(dedup: Deduplicator):
+    print(f"Duplicate files: {dedup.files} ({_format_size(dedup.bytes_saved)} saved).")
+
+
+def get_filesystem_template(template_path) -> BaseTemplate:
     """
-    Get a template from the filesystem.
+    Get a template from the filesystem: a template directory, a template pack, or a
+    zip or tar archive of a template directory.
     """
+    if str(template_path).endswith(PACK_SUFFIX) and os.path.isfile(template_path):
+        return PackTemplate(None, template_path)
+    if is_archive(template_path) and os.path.isfile(template_path):
+        return ArchiveTemplate(None, template_path)
     if os.path.isdir(template_path):
         template_name = Path(template_path).name
         template = FilesystemTemplate(template_name, template_path)
@@ -37,16 +79,340 @@ def get_filesystem_template(template_path) -> FilesystemTemplate:
         raise ValueError(f"Template path '{template_path}' is not a valid directory.")
 
 
-def get_git_template(git_uri) -> GitTemplate:
+def get_git_template(git_uri, offline: bool = False, checkout: bool = True) -> BaseTemplate:
     """
     Get a template from a git repository.
     """
-    template_name = Path(git_uri).name
-    return GitTemplate(template_name, git_uri)
+    # Imported here so that GitPython is only loaded when a git template is used.
+    from .template_classes.git_template import GitTemplate
+    from .template_classes.git_cache import split_git_ref
+
+    template_name = Path(split_git_ref(git_uri)[0]).name
+    return GitTemplate(template_name, git_uri, offline=offline, checkout=checkout)
+
+
+def get_cache_args(argv: list[str]):
+    parser = ArgumentParser(prog="skaf cache", description="Inspect or clear skaf's persistent user cache.")
+    parser.add_argument("action", choices=["stats", "clear"], help="Show cache usage or remove cached data.")
+    parser.add_argument("names", nargs="*", help=f"Cache areas to clear, among: {', '.join(CACHE_AREAS)}. Defaults to all.")
+    return parser.parse_args(argv)
+
+
+def _format_size(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def cache_main(argv: list[str]):
+    args = get_cache_args(argv)
+    if args.action == "stats":
+        print(f"Cache directory: {user_cache_dir()}")
+        stats = cache_stats()
+        if not stats:
+            print("The cache is empty.")
+        for name, (count, size) in stats.items():
+            print(f"{name}: {count} files, {_format_size(size)}")
+    else:
+        try:
+            removed = clear_cache(args.names)
+        except ValueError as e:
+            print(f"Error clearing the cache: {e}")
+            sys.exit(1)
+        print(f"Cleared cache: {', '.join(removed) if removed else 'nothing to clear'}")
+
+
+def get_batch_args(argv: list[str]):
+    parser = ArgumentParser(prog="skaf batch", description="Scaffold many projects from one template, loading the template only once.")
+    parser.add_argument("varsets", help="Path to a JSON Lines, YAML or CSV file holding one set of variable values per project.")
+    parser.add_argument("-t", "--template", default=None, help="Name of the project template to use.")
+    parser.add_argument("-p", "--path", default=None, help=f"Path to a template directory, a '{PACK_SUFFIX}' template pack, or a zip or tar archive of a template directory.")
+    parser.add_argument("-g", "--git", default=None, help="URI of a git repo to be used as a template directory. Append '@<ref>' to use a branch, tag or commit.")
+    parser.add_argument("--offline", action="store_true", help="Resolve --git templates from the local clone cache only, without contacting the remote.")
+    parser.add_argument("--format", choices=BATCH_FORMATS, default=None, help="Format of the variable sets file. Inferred from its suffix by default.")
+    parser.add_argument("--name-field", default=DEFAULT_NAME_FIELD, help=f"Field holding each project's name. Defaults to '{DEFAULT_NAME_FIELD}'.")
+    parser.add_argument("-o", "--output", help="Output directory for the projects.", default=os.getcwd())
+    parser.add_argument("--overwrite", action="store_true", help="Force overwrite existing files.")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Number of projects to scaffold in parallel.")
+    parser.add_argument("--link-static", choices=LINK_MODES, default="copy", help="How to materialize files that are not templated: 'copy' (default), 'hardlink' or 'reflink'.")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write skaf's persistent user cache.")
+    parser.add_argument("--render-cache", action="store_true", default=None, help="Reuse rendered files from skaf's user cache when a file is rendered again with the same variable values, and store new ones there. Defaults to the SKAF_RENDER_CACHE environment variable.")
+    parser.add_argument("--dedup", nargs="?", const="hardlink", choices=LINK_MODES, default=None, help="Write each distinct rendered output once across all projects and materialize files that repeat it as hard links (default), reflinks or copies of the first one.")
+    parser.add_argument("--debug", action="store_true", help="Enable debug mode.")
+    return parser.parse_args(argv)
+
+
+def load_template(template_name: str | None = None,
+                  template_path: str | None = None,
+                  git_uri: str | None = None,
+                  offline: bool = False,
+                  ) -> BaseTemplate:
+    """
+    Load a template by registered name, filesystem path or git URI.
+    """
+    if template_path:
+        return get_filesystem_template(template_path)
+    if git_uri:
+        return get_git_template(git_uri, offline=offline)
+    if template_name:
+        return get_template(template_name)
+    raise ValueError("One of --template, --path or --git must be provided.")
+
+
+def batch_main(argv: list[str]):
+    args = get_batch_args(argv)
+    if args.no_cache:
+        disable_cache()
+    try:
+        template = load_template(args.template, args.path, args.git, offline=args.offline)
+        scaffolder = Scaffolder(
+            template,
+            link_static=args.link_static,
+            render_cache=args.render_cache,
+            dedup=args.dedup,
+        )
+        results = run_batch(
+            scaffolder,
+            iter_variable_sets(Path(args.varsets), args.format),
+            output_dir=Path(args.output),
+            name_field=args.name_field,
+            overwrite=args.overwrite,
+            jobs=args.jobs,
+        )
+        succeeded, failed = 0, 0
+        for result in results:
+            if result.ok:
+                succeeded += 1
+                print(f"ok      {result.project_name}")
+            else:
+                failed += 1
+                print(f"FAILED  {result.project_name}: {result.error}")
+    except Exception as e:
+        if args.debug:
+            raise
+        etype = type(e).__name__
+        print(f"An error occurred while running the batch: {etype}: {e}")
+        sys.exit(1)
+    print(f"Scaffolded {succeeded} of {succeeded + failed} projects using the '{template.template_name}' template ({failed} failed).")
+    if scaffolder.deduplicator is not None:
+        print_dedup_summary(scaffolder.deduplicator)
+    if failed:
+        sys.exit(1)
+
+
+def get_pack_args(argv: list[str]):
+    parser = ArgumentParser(prog="skaf pack", description="Pack a template directory into a single precompiled template file.")
+    parser.add_argument("template_dir", help="Path to the template directory to pack.")
+    parser.add_argument("-o", "--output", default=None, help=f"Path of the pack to write. Defaults to '<template name>{PACK_SUFFIX}' in the current directory.")
+    parser.add_argument("--name", default=None, help="Template name to record in the pack. Defaults to the directory name.")
+    parser.add_argument("--debug", action="store_true", help="Enable debug mode.")
+    return parser.parse_args(argv)
+
+
+def pack_main(argv: list[str]):
+    args = get_pack_args(argv)
+    template_dir = Path(args.template_dir)
+    output = args.output or f"{args.name or template_dir.resolve().name}{PACK_SUFFIX}"
+    try:
+        if not template_dir.is_dir():
+            raise ValueError(f"Template path '{template_dir}' is not a valid directory.")
+        pack_path = write_pack(template_dir, output, template_name=args.name)
+    except Exception as e:
+        if args.debug:
+            raise
+        etype = type(e).__name__
+        print(f"An error occurred while packing the template: {etype}: {e}")
+        sys.exit(1)
+    print(f"Template '{template_dir}' packed into '{pack_path}'.")
+
+
+def list_main(argv: list[str]):
+    parser = ArgumentParser(prog="skaf list", description="List the names of the installed templates.")
+    parser.parse_args(argv)
+    for template_name in available_templates():
+        print(template_name)
+
+
+def get_rerender_args(argv: list[str]):
+    parser = ArgumentParser(prog="skaf rerender", description="Re-render a project scaffolded with --manifest, updating only the files affected by changed variables or template files.")
+    parser.add_argument("project_dir", help="Path to the project directory holding a .skaf-manifest.")
+    parser.add_argument("-t", "--template", default=None, help="Name of the template. Defaults to the template recorded in the manifest.")
+    parser.add_argument("-p", "--path", default=None, help=f"Path to a template directory, a '{PACK_SUFFIX}' template pack, or a zip or tar archive of a template directory.")
+    parser.add_argument("-g", "--git", default=None, help="URI of a git repo to be used as a template directory. Append '@<ref>' to use a branch, tag or commit.")
+    parser.add_argument("--offline", action="store_true", help="Resolve --git templates from the local clone cache only, without contacting the remote.")
+    parser.add_argument("--varfile", default=None, help="Path to a yaml file holding new variable values.")
+    parser.add_argument("--set", dest="values", action="append", default=[], metavar="NAME=VALUE", help="Set a variable value. May be repeated.")
+    parser.add_argument("--changed-var", dest="changed_vars", action="append", default=[], metavar="NAME", help="Re-render the files that depend on this variable even if its value is unchanged. May be repeated.")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Number of files to render in parallel.")
+    parser.add_argument("--executor", choices=EXECUTORS, default=None, help="How to render files: 'serial', or in parallel on a 'thread' or 'process' pool.")
+    parser.add_argument("--link-static", choices=LINK_MODES, default="copy", help="How to materialize files that are not templated: 'copy' (default), 'hardlink' or 'reflink'.")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write skaf's persistent user cache.")
+    parser.add_argument("--render-cache", action="store_true", default=None, help="Reuse rendered files from skaf's user cache when a file is rendered again with the same variable values, and store new ones there. Defaults to the SKAF_RENDER_CACHE environment variable.")
+    parser.add_argument("--debug", action="store_true", help="Enable debug mode.")
+    return parser.parse_args(argv)
+
+
+def rerender_main(argv: list[str]):
+    args = get_rerender_args(argv)
+    if args.no_cache:
+        disable_cache()
+    project_dir = Path(args.project_dir)
+    try:
+        manifest = Manifest.load(project_dir)
+        if manifest is None:
+            raise FileNotFoundError(f"'{project_dir}' has no manifest. Scaffold it with --manifest first.")
+        template = load_template(args.template or manifest.template_name, args.path, args.git, offline=args.offline)
+        variables = dict(manifest.variables)
+        if args.varfile:
+            from .scaffold.variables import load_variables_filepath
+            variables.update(load_variables_filepath(Path(args.varfile)) or {})
+        for value in args.values:
+            name, sep, value = value.partition("=")
+            if not sep:
+                raise ValueError(f"Expected NAME=VALUE, got '{name}'.")
+            variables[name] = value
+        report = scaffold_project(
+            # A new project_name from --set or --varfile applies like any other variable.
+            project_name=variables.get("project_name", manifest.variables["project_name"]),
+            template=template,
+            output_dir=str(project_dir),
+            no_project_dir=True,
+            overwrite=True,
+            variables=variables,
+            interactive=False,
+            executor=args.executor,
+            jobs=args.jobs,
+            link_static=args.link_static,
+            manifest=True,
+            changed_variables=args.changed_vars,
+            render_cache=args.render_cache,
+            _debug=True
+        )
+    except Exception as e:
+        if args.debug:
+            raise
+        etype = type(e).__name__
+        print(f"An error occurred while re-rendering the project: {etype}: {e}")
+        sys.exit(1)
+    print_manifest_report(report)
+
+
+def get_serve_args(argv: list[str]):
+    parser = ArgumentParser(prog="skaf serve", description="Serve scaffolded projects as archives over HTTP, keeping templates loaded and compiled between requests.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on. Defaults to 127.0.0.1.")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on. Defaults to 8000.")
+    parser.add_argument("-t", "--template", dest="templates", action="append", default=None, help="Name of a registered template to serve. May be repeated. Defaults to every registered template.")
+    parser.add_argument("-p", "--path", dest="paths", action="append", default=[], help=f"Path to a template directory, a '{PACK_SUFFIX}' template pack, or a zip or tar archive to serve. May be repeated.")
+    parser.add_argument("--max-concurrency", type=int, default=os.cpu_count() or 1, help="Maximum number of projects scaffolded at once. Defaults to the number of CPUs.")
+    parser.add_argument("--queue-timeout", type=float, default=0.0, help="Seconds a request may wait for a free slot before being rejected with a 503. Defaults to 0.")
+    parser.add_argument("--format", choices=["tar.gz", "tar", "zip"], default="tar.gz", help="Archive format used when a request does not ask for one.")
+    parser.add_argument("--no-warm", action="store_true", help="Do not compile the served templates before accepting requests.")
+    parser.add_argument("--quiet", action="store_true", help="Do not log requests.")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write skaf's persistent user cache.")
+    parser.add_argument("--debug", action="store_true", help="Enable debug mode.")
+    return parser.parse_args(argv)
+
+
+def serve_main(argv: list[str]):
+    args = get_serve_args(argv)
+    if args.no_cache:
+        disable_cache()
+    # Imported here so that http.server is only loaded by `skaf serve`.
+    from .serve import ScaffoldServer, load_served_templates
+    try:
+        if args.max_concurrency < 1:
+            raise ValueError("--max-concurrency must be at least 1.")
+        templates = load_served_templates(
+            args.templates if args.templates or not args.paths else [],
+            [get_filesystem_template(path) for path in args.paths],
+            warm=not args.no_warm,
+        )
+        server = ScaffoldServer(
+            (args.host, args.port),
+            templates,
+            max_concurrency=args.max_concurrency,
+            queue_timeout=args.queue_timeout,
+            default_format=args.format,
+            quiet=args.quiet,
+        )
+    except Exception as e:
+        if args.debug:
+            raise
+        etype = type(e).__name__
+        print(f"An error occurred while starting the server: {etype}: {e}")
+        sys.exit(1)
+    host, port = server.server_address[:2]
+    print(f"Serving {len(templates)} templates on http://{host}:{port}/ (press Ctrl+C to stop).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def get_daemon_args(argv: list[str]):
+    parser = ArgumentParser(prog="skaf daemon", description="Run a background process that keeps skaf imported and templates compiled, so that later 'skaf' commands are forwarded to it and start instantly.")
+    parser.add_argument("action", nargs="?", choices=["run", "status", "stop"], default="run", help="Run the daemon in the foreground (default), show its status, or stop it.")
+    parser.add_argument("--socket", default=None, help="Path of the daemon's Unix socket. Defaults to $SKAF_DAEMON_SOCKET, or 'skaf/daemon.sock' in the user runtime directory.")
+    parser.add_argument("--no-warm", action="store_true", help="Do not load and compile the registered templates at start-up.")
+    parser.add_argument("--quiet", action="store_true", help="Do not print a message once the daemon is listening.")
+    parser.add_argument("--debug", action="store_true", help="Enable debug mode.")
+    return parser.parse_args(argv)
+
+
+def daemon_main(argv: list[str]):
+    args = get_daemon_args(argv)
+    from .daemon import daemon_request, daemon_socket_path, serve_daemon
+    socket_path = Path(args.socket) if args.socket else daemon_socket_path()
+    if args.action in ("status", "stop"):
+        reply = daemon_request(args.action, socket_path)
+        if reply is None:
+            print(f"No skaf daemon is listening on '{socket_path}'.")
+            sys.exit(1)
+        if args.action == "stop":
+            print("skaf daemon stopped.")
+        else:
+            print(f"skaf daemon (pid {reply['pid']}) listening on '{reply['socket']}' for {reply['uptime_seconds']:.0f}s with {len(reply['templates'])} warm templates.")
+        return
+    try:
+        serve_daemon(socket_path, warm=not args.no_warm, quiet=args.quiet)
+    except Exception as e:
+        if args.debug:
+            raise
+        etype = type(e).__name__
+        print(f"An error occurred while running the daemon: {etype}: {e}")
+        sys.exit(1)
+
+
+_commands = {
+    "daemon": daemon_main,
+    "serve": serve_main,
+    "list": list_main,
+    "rerender": rerender_main,
+    "cache": cache_main,
+    "batch": batch_main,
+    "pack": pack_main,
+}
 
 
 def main():
+    # A subcommand name is only recognised as the first argument, so a project with the
+    # same name is scaffolded by giving any option (or '--') before it.
+    if sys.argv[1:2] != ["daemon"]:
+        # Imported here rather than at the top so the daemon check stays cheap.
+        from .daemon import forward_to_daemon
+        code = forward_to_daemon(sys.argv[1:])
+        if code is not None:
+            sys.exit(code)
+    if len(sys.argv) > 1 and sys.argv[1] in _commands:
+        return _commands[sys.argv[1]](sys.argv[2:])
+
     args = get_args()
+    if args.no_cache:
+        disable_cache()
     project_name = args.name
     template_name = args.template
     output_dir = args.output
@@ -57,25 +423,42 @@ def main():
         template = get_filesystem_template(template_path)
         template_name = template.template_name
     elif args.git:
-        template = get_git_template(args.git)
+        template = get_git_template(args.git, offline=args.offline, checkout=not args.git_no_checkout)
         template_name = template.template_name
 
-    try:
-        scaffold_project(
-            project_name=project_name,
-            template_name=template_name,
-            output_dir=output_dir,
-            no_project_dir=args.no_project_dir,
-            overwrite=args.overwrite,
-            template=template,
-            auto_use_defaults=args.auto_use_defaults,
-            varfile=args.varfile,
-            _debug=args.debug
-            )
-        print(f"Project '{project_name}' initialized successfully using the '{template_name}' template.")
-    except Exception as e:
-        if args.debug:
-            raise
-        etype = type(e).__name__
-        print(f"An error occurred while initializing the project: {etype}: {e}")
-        sys.exit(1)
+    # When the project is written to standard output, messages and prompts go to stderr.
+    to_stdout = output_dir == STDOUT
+    output_stream = sys.stdout.buffer if to_stdout else None
+    dedup = Deduplicator(args.dedup) if args.dedup else None
+    with redirect_stdout(sys.stderr) if to_stdout else nullcontext():
+        try:
+            report = scaffold_project(
+                project_name=project_name,
+                template_name=template_name,
+                output_dir=output_dir,
+                no_project_dir=args.no_project_dir,
+                overwrite=args.overwrite,
+                template=template,
+                auto_use_defaults=args.auto_use_defaults,
+                varfile=args.varfile,
+                executor=args.executor,
+                jobs=args.jobs,
+                link_static=args.link_static,
+                manifest=args.manifest,
+                output_sink=args.output_format,
+                output_stream=output_stream,
+                render_cache=args.render_cache,
+                dedup=dedup,
+                _debug=args.debug
+                )
+            print(f"Project '{project_name}' initialized successfully using the '{template_name}' template.")
+            if report is not None:
+                print_manifest_report(report)
+            if dedup is not None:
+                print_dedup_summary(dedup)
+        except Exception as e:
+            if args.debug:
+                raise
+            etype = type(e).__name__
+            print(f"An error occurred while initializing the project: {etype}: {e}")
+            sys.exit(1)
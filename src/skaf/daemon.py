@@ -0,0 +1,366 @@
+import json
+import os
+import signal
+import socket
+import stat
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+
+DAEMON_SOCKET_ENV_VAR = "SKAF_DAEMON_SOCKET"
+NO_DAEMON_ENV_VAR = "SKAF_NO_DAEMON"
+PROTOCOL_VERSION = 1
+# Length prefix of a request header.
+_LENGTH = struct.Struct("!I")
+_MAX_HEADER_BYTES = 1 << 20
+# Environment variables that are read when skaf modules are imported or the templater
+# environment is built. A client whose values differ from the daemon's runs in-process.
+_FINGERPRINT_ENV_VARS = ("HOME", "XDG_CACHE_HOME")
+# Arguments whose effect cannot be applied to the daemon's already warm state.
+_IN_PROCESS_ARGS = ("--no-cache",)
+
+
+def daemon_socket_path() -> Path:
+    """
+    Returns the path of the daemon's Unix socket: `SKAF_DAEMON_SOCKET` if set, or
+    `skaf/daemon.sock` in `XDG_RUNTIME_DIR` or, failing that, in a per-user directory
+    under the system temporary directory.
+    """
+    if explicit := os.environ.get(DAEMON_SOCKET_ENV_VAR):
+        return Path(explicit)
+    if runtime_dir := os.environ.get("XDG_RUNTIME_DIR"):
+        return Path(runtime_dir) / "skaf" / "daemon.sock"
+    return Path(tempfile.gettempdir()) / f"skaf-{os.getuid()}" / "daemon.sock"
+
+
+def daemon_enabled() -> bool:
+    """
+    Returns False when forwarding to the daemon has been disabled with `SKAF_NO_DAEMON`.
+    """
+    return (
+        hasattr(socket, "AF_UNIX")
+        and hasattr(socket, "send_fds")
+        and os.environ.get(NO_DAEMON_ENV_VAR, "").lower() not in ("1", "true", "yes")
+    )
+
+
+def runtime_fingerprint() -> dict[str, str | None]:
+    """
+    Identifies the skaf installation and Python environment a process runs, so that
+    commands are not forwarded to a daemon running other code, such as one started
+    before an upgrade or from another virtual environment.
+    """
+    # Imported here as it is only needed once a daemon socket has been found.
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        skaf_version = version("skaf")
+    except PackageNotFoundError:
+        skaf_version = None
+    return {
+        "skaf": skaf_version,
+        "package": str(Path(__file__).resolve().parent),
+        "executable": sys.executable,
+        "prefix": sys.prefix,
+    }
+
+
+def environment_fingerprint(env: dict[str, str]) -> dict[str, str]:
+    return {
+        name: value for name, value in sorted(env.items())
+        if (name.startswith("SKAF_") and name not in (DAEMON_SOCKET_ENV_VAR, NO_DAEMON_ENV_VAR))
+        or name in _FINGERPRINT_ENV_VARS
+    }
+
+
+def _send_header(sock: socket.socket, header: dict[str, Any], fds: list[int] = ()) -> None:
+    data = json.dumps(header).encode("utf-8")
+    message = _LENGTH.pack(len(data)) + data
+    sent = socket.send_fds(sock, [message], list(fds)) if fds else sock.send(message)
+    sock.sendall(message[sent:])
+
+
+def _receive_header(sock: socket.socket) -> tuple[dict[str, Any], list[int]]:
+    data, fds, _, _ = socket.recv_fds(sock, 1 << 16, 3)
+    while len(data) < _LENGTH.size:
+        chunk = sock.recv(1 << 16)
+        if not chunk:
+            raise ConnectionError("Connection closed before the request header was received.")
+        data += chunk
+    (length,) = _LENGTH.unpack_from(data)
+    if length > _MAX_HEADER_BYTES:
+        raise ValueError("Request header is too large.")
+    while len(data) < _LENGTH.size + length:
+        chunk = sock.recv(1 << 16)
+        if not chunk:
+            raise ConnectionError("Connection closed before the request header was received.")
+        data += chunk
+    return json.loads(data[_LENGTH.size:_LENGTH.size + length]), fds
+
+
+def _send_reply(sock: socket.socket, reply: dict[str, Any]) -> None:
+    sock.sendall(json.dumps(reply).encode("utf-8") + b"\n")
+
+
+def _is_private_directory(directory: Path) -> bool:
+    """
+    Returns True when `directory` belongs to this user and is closed to everyone else.
+    """
+    try:
+        info = os.stat(directory)
+    except OSError:
+        return False
+    return info.st_uid == os.getuid() and stat.S_ISDIR(info.st_mode) and info.st_mode & 0o077 == 0
+
+
+def _is_trusted_socket(socket_path: Path) -> bool:
+    """
+    Returns True when the socket at `socket_path` was created by this user, in a
+    directory no other user can write to, so that it cannot be another user's.
+    """
+    try:
+        info = os.lstat(socket_path)
+    except OSError:
+        return False
+    return info.st_uid == os.getuid() and stat.S_ISSOCK(info.st_mode) and _is_private_directory(socket_path.parent)
+
+
+def _peer_uid(sock: socket.socket) -> int | None:
+    """
+    Returns the user id of the process at the other end of a Unix socket, or None when
+    the platform cannot tell.
+    """
+    peercred = getattr(socket, "SO_PEERCRED", None)
+    if peercred is None:
+        return None
+    _, uid, _ = struct.unpack("3i", sock.getsockopt(socket.SOL_SOCKET, peercred, struct.calcsize("3i")))
+    return uid
+
+
+def _connect(socket_path: Path) -> socket.socket | None:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def forward_to_daemon(argv: list[str]) -> int | None:
+    """
+    Runs the command line `argv` in the skaf daemon, if one is listening, and returns
+    its exit code. The daemon forks a worker that takes over this process's standard
+    input, output and error, working directory and environment, so output and
+    interactive prompts behave as they would in-process.
+
+    Returns None, so that the command runs in-process instead, when forwarding is
+    disabled, no daemon is running, or the daemon cannot reproduce this process's
+    environment. Nothing is sent unless the socket, its directory and the process
+    listening on it all belong to this user, as the request carries the environment.
+    """
+    if not daemon_enabled() or any(arg in _IN_PROCESS_ARGS for arg in argv):
+        return None
+    socket_path = daemon_socket_path()
+    if not _is_trusted_socket(socket_path):
+        return None
+    sock = _connect(socket_path)
+    if sock is None:
+        return None
+    with sock:
+        peer_uid = _peer_uid(sock)
+        if peer_uid is not None and peer_uid != os.getuid():
+            return None
+        header = {
+            "version": PROTOCOL_VERSION,
+            "command": "run",
+            "argv": argv,
+            "cwd": os.getcwd(),
+            "env": dict(os.environ),
+            "runtime": runtime_fingerprint(),
+        }
+        try:
+            _send_header(sock, header, [sys.stdin.fileno(), sys.stdout.fileno(), sys.stderr.fileno()])
+            replies = sock.makefile("rb")
+            reply = json.loads(replies.readline() or b"{}")
+            if "pid" not in reply:
+                # The daemon declined the request, or went away.
+                return None
+        except (OSError, ValueError, AttributeError):
+            return None
+        worker_pid = reply["pid"]
+        while True:
+            try:
+                reply = json.loads(replies.readline() or b'{"exit": 1}')
+                return int(reply.get("exit", 1))
+            except KeyboardInterrupt:
+                # The worker is not in this terminal's process group, so pass Ctrl+C on.
+                try:
+                    os.kill(worker_pid, signal.SIGINT)
+                except OSError:
+                    return 130
+
+
+def daemon_request(command: str, socket_path: Path | None = None) -> dict[str, Any] | None:
+    """
+    Sends a control `command` ("status" or "stop") to the daemon and returns its reply,
+    or None if no daemon is listening.
+    """
+    sock = _connect(socket_path or daemon_socket_path())
+    if sock is None:
+        return None
+    with sock:
+        _send_header(sock, {"version": PROTOCOL_VERSION, "command": command})
+        return json.loads(sock.makefile("rb").readline() or b"{}")
+
+
+def _run_worker(header: dict[str, Any], fds: list[int]) -> int:
+    """
+    Runs a forwarded command line in a forked worker, on the client's file descriptors.
+    """
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    sys.stdin = open(0, "r", closefd=False)
+    sys.stdout = open(1, "w", buffering=1 if os.isatty(1) else -1, closefd=False)
+    sys.stderr = open(2, "w", buffering=1, closefd=False)
+    os.chdir(header["cwd"])
+    os.environ.clear()
+    os.environ.update(header["env"])
+    os.environ[NO_DAEMON_ENV_VAR] = "1"
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    sys.argv = ["skaf", *header["argv"]]
+
+    from .cli import main
+    try:
+        result = main()
+        code = result if isinstance(result, int) else 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            code = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except KeyboardInterrupt:
+        code = 130
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+        code = 1
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except OSError:
+            pass
+    return code
+
+
+def serve_daemon(socket_path: Path | None = None, warm: bool = True, quiet: bool = False) -> None:
+    """
+    Runs the skaf daemon in the foreground until it is stopped. The daemon imports the
+    templaters and loads and compiles every registered template once, then forks a
+    worker from this warm state for each forwarded command line.
+    """
+    import socketserver
+
+    socket_path = Path(socket_path or daemon_socket_path())
+    fingerprint = environment_fingerprint(dict(os.environ))
+    runtime = runtime_fingerprint()
+    started = time.time()
+
+    if warm:
+        from .serve import load_served_templates
+        from .templaters.registry import get_templater
+        templates = load_served_templates()
+        for name in ("jinja2", "pystring"):
+            get_templater(name)
+        # Importing GitPython now saves each worker that uses a git template from doing it.
+        try:
+            from .template_classes import git_template  # noqa: F401
+        except ImportError:
+            pass
+    else:
+        templates = {}
+    from . import cli  # noqa: F401
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self) -> None:
+            header, fds = _receive_header(self.request)
+            try:
+                _check_peer(self.request)
+                if header.get("version") != PROTOCOL_VERSION:
+                    _send_reply(self.request, {"fallback": "protocol version mismatch"})
+                    return
+                command = header.get("command")
+                if command == "status":
+                    _send_reply(self.request, {"pid": os.getppid(), "uptime_seconds": round(time.time() - started, 3),
+                                               "templates": sorted(templates), "socket": str(socket_path)})
+                elif command == "stop":
+                    _send_reply(self.request, {"stopping": True})
+                    os.kill(os.getppid(), signal.SIGTERM)
+                elif command == "run" and len(fds) == 3:
+                    if environment_fingerprint(header["env"]) != fingerprint:
+                        _send_reply(self.request, {"fallback": "environment differs from the daemon's"})
+                        return
+                    if header.get("runtime") != runtime:
+                        _send_reply(self.request, {"fallback": "skaf installation differs from the daemon's"})
+                        return
+                    _send_reply(self.request, {"pid": os.getpid()})
+                    code = _run_worker(header, fds)
+                    fds = []
+                    _send_reply(self.request, {"exit": code})
+                else:
+                    _send_reply(self.request, {"fallback": "invalid request"})
+            finally:
+                for fd in fds:
+                    os.close(fd)
+
+    class Server(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+        pass
+
+    socket_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+    if not _is_private_directory(socket_path.parent):
+        # Another user could have created it first, to receive forwarded commands.
+        raise PermissionError(
+            f"The daemon socket directory '{socket_path.parent}' must belong to the current user "
+            f"and be accessible to no one else (mode 0700)."
+        )
+    if socket_path.exists():
+        if daemon_request("status", socket_path) is not None:
+            raise RuntimeError(f"A skaf daemon is already listening on '{socket_path}'.")
+        socket_path.unlink()
+    old_umask = os.umask(0o177)
+    try:
+        server = Server(str(socket_path), Handler)
+    finally:
+        os.umask(old_umask)
+
+    def stop(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    if not quiet:
+        print(f"skaf daemon listening on '{socket_path}' with {len(templates)} warm templates (pid {os.getpid()}).", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            socket_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _check_peer(sock: socket.socket) -> None:
+    """
+    Refuses connections from other users, where the platform can tell.
+    """
+    uid = _peer_uid(sock)
+    if uid is not None and uid != os.getuid():
+        raise PermissionError(f"Refusing a connection from user {uid}.")
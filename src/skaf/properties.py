@@ -1,10 +1,19 @@
 from typing import Any, TypedDict, Literal
 
 
+class ComputedDefault(TypedDict, total=False):
+    command: str | list[str]
+    callable: str
+    env: str
+    ttl: float
+    timeout: float
+
+
 class CustomVariable(TypedDict):
     name: str
     type: str | None
     default: Any | None
+    computed_default: ComputedDefault | None
     description: str | None
 
 
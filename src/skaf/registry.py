@@ -1,5 +1,7 @@
-from importlib.metadata import entry_points
+import threading
+import warnings
 from pathlib import Path
+from typing import Callable
 
 from .template_classes.base import BaseTemplate
 from .template_classes.filesystem_template import FilesystemTemplate
@@ -23,29 +25,84 @@ class RegisterTemplateError(Exception):
     pass
 
 
-_templates = {}
+TemplateFactory = Callable[[], BaseTemplate]
+
+_templates: dict[str, BaseTemplate] = {}
+_template_factories: dict[str, TemplateFactory] = {}
+_template_index: tuple[str, ...] | None = None
+_registry_lock = threading.RLock()
+_discovered = False
+# Where each discovered template was found, so that discovering it again is a no-op.
+_discovered_sources: dict[str, str] = {}
+_plugin_names: set[str] = set()
+
+
+def _discover_templates():
+    """
+    Registers the packaged templates and template plugins the first time the registry
+    is queried, so that importing skaf does not scan installed distributions. Discovery
+    is tried again on the next query if it fails.
+    """
+    global _discovered
+    with _registry_lock:
+        if _discovered:
+            return
+        load_and_register_packaged_templates()
+        load_and_register_template_plugins()
+        _discovered = True
+
+
+def _register_discovered(template_name: str, factory: TemplateFactory, source: str) -> bool:
+    """
+    Registers a discovered template, warning instead of failing when its name is taken,
+    so that one conflicting template does not keep the others from being registered.
+    A template already registered from the same source is left as it is.
+    """
+    with _registry_lock:
+        if _discovered_sources.get(template_name) == source:
+            return False
+        try:
+            register_template_factory(template_name, factory)
+        except RegisterTemplateError as e:
+            warnings.warn(f"Skipping {source}: {e}", stacklevel=3)
+            return False
+        _discovered_sources[template_name] = source
+        return True
 
 
 def load_and_register_template_plugins():
-    template_entry_points = entry_points(group=_entry_points_group)
+    """
+    Registers a lazy factory for each `skaf.template` entry point, under the entry
+    point's name. Plugins are only imported when their template is requested, or when
+    a template is requested by a name no entry point has, as a plugin's template may be
+    named differently from its entry point.
+    """
+    from importlib.metadata import entry_points
+
+    try:
+        template_entry_points = entry_points(group=_entry_points_group)
+    except Exception as e:
+        etype = type(e).__name__
+        warnings.warn(f"Template plugins could not be listed: {etype}: {e}", stacklevel=2)
+        return
     for tep in template_entry_points:
-        _template = tep.load()
-        register_template(_template)
+        if _register_discovered(tep.name, tep.load, f"template plugin '{tep.name}' ({tep.value})"):
+            _plugin_names.add(tep.name)
 
 
 def load_and_register_packaged_templates():
     """
-    Loads and registers all packaged templates.
+    Registers a lazy factory for each packaged template. Template properties and
+    variables helpers are only read when the template is requested.
     """
     for template_dir in template_lib_dir.iterdir():
         if template_dir.is_dir():
             template_name = template_dir.name
-            try:
-                template = FilesystemTemplate(template_name, template_dir)
-                register_template(template)
-            except Exception as e:
-                etype = type(e).__name__
-                raise LoadTemplateError(f"Error loading '{template_name}': {etype}: {e}")
+            _register_discovered(
+                template_name,
+                lambda name=template_name, path=template_dir: FilesystemTemplate(name, path),
+                f"packaged template '{template_name}'",
+            )
 
 
 def register_template(template: BaseTemplate):
@@ -61,18 +118,94 @@ def register_template(template: BaseTemplate):
     if template_name == "none":
         return
 
-    if template_name in _templates:
-        raise RegisterTemplateError(f"Template '{template_name}' is already registered.")
-    
+    with _registry_lock:
+        if template_name in _templates or template_name in _template_factories:
+            raise RegisterTemplateError(f"Template '{template_name}' is already registered.")
+        _templates[template_name] = template
+        invalidate_template_index()
+
+
+def register_template_factory(template_name: str, factory: TemplateFactory):
+    """
+    Registers a callable that builds the template named `template_name`. The factory is
+    called at most once, the first time `get_template(template_name)` is called.
+    """
+    if template_name == "none":
+        return
+
+    with _registry_lock:
+        if template_name in _templates or template_name in _template_factories:
+            raise RegisterTemplateError(f"Template '{template_name}' is already registered.")
+        _template_factories[template_name] = factory
+        invalidate_template_index()
+
+
+def _resolve_template(template_name: str) -> BaseTemplate:
+    factory = _template_factories[template_name]
+    try:
+        template = factory()
+    except Exception as e:
+        etype = type(e).__name__
+        raise LoadTemplateError(f"Error loading '{template_name}': {etype}: {e}")
+    if not isinstance(template, BaseTemplate):
+        raise LoadTemplateError(f"Error loading '{template_name}': template must be a subclass of BaseTemplate.")
+    del _template_factories[template_name]
     _templates[template_name] = template
+    return template
 
 
 def get_template(template_name: str) -> BaseTemplate:
     """
-    Returns the template class registered with the given name.
-    If no template is found, raises a KeyError.
+    Returns the template class registered with the given name, building it from its
+    factory on first use.
+    If no template is found, raises a LoadTemplateError.
     """
-    if template_name not in _templates:
-        raise LoadTemplateError(f"Template '{template_name}' not found.")
-    
-    return _templates[template_name]
+    _discover_templates()
+    with _registry_lock:
+        if template_name in _templates:
+            return _templates[template_name]
+        if template_name in _template_factories:
+            return _resolve_template(template_name)
+        template = _find_plugin_template(template_name)
+        if template is None:
+            raise LoadTemplateError(f"Template '{template_name}' not found.")
+        return template
+
+
+def _find_plugin_template(template_name: str) -> BaseTemplate | None:
+    """
+    Loads the plugins not loaded yet until one provides a template named
+    `template_name`, which is then also registered under that name.
+    """
+    for plugin_name in sorted(_plugin_names & _template_factories.keys()):
+        try:
+            template = _resolve_template(plugin_name)
+        except LoadTemplateError:
+            continue
+        if template.template_name == template_name:
+            _templates[template_name] = template
+            invalidate_template_index()
+            return template
+    return None
+
+
+def available_templates() -> tuple[str, ...]:
+    """
+    Returns the sorted names of all registered templates without building any of them.
+    The result is cached until a template is registered or `invalidate_template_index`
+    is called.
+    """
+    global _template_index
+    _discover_templates()
+    with _registry_lock:
+        if _template_index is None:
+            _template_index = tuple(sorted({*_templates, *_template_factories}))
+        return _template_index
+
+
+def invalidate_template_index():
+    """
+    Discards the cached index of template names.
+    """
+    global _template_index
+    _template_index = None
@@ -1 +1,4 @@
 from .scaffold import scaffold_project
+from .scaffolder import Scaffolder
+from .dedup import Deduplicator
+from .errors import ScaffoldError, VariableError, OutputExistsError, RenderError
@@ -0,0 +1,217 @@
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Iterable
+
+from ..template_classes.base import BaseTemplate
+from ..template_classes.document import TemplateDocument
+from ..templaters.base import ABCTemplater
+from .errors import VariableError
+from .utils import is_templated
+
+
+_DOCUMENT_ANALYSIS_CACHE_SIZE = 4096
+_document_analyses: OrderedDict[tuple[type, str, str | None], "DocumentAnalysis"] = OrderedDict()
+_document_analyses_lock = threading.Lock()
+
+
+def document_variables(relpath: str,
+                       source: str | None,
+                       templater: ABCTemplater
+                       ) -> list[str] | None:
+    """
+    Returns the sorted names of the variables a template file depends on, through its
+    templated path and, for templated files, its `source`. Returns None when the
+    templater cannot determine them, in which case the file depends on every variable.
+    """
+    names = _find_variables(relpath, templater)
+    if names is None:
+        return None
+    if source is not None:
+        source_names = _find_variables(source, templater)
+        if source_names is None:
+            return None
+        names = names | source_names
+    return sorted(names)
+
+
+def _find_variables(template: str, templater: ABCTemplater) -> set[str] | None:
+    if templater.is_literal(template):
+        return set()
+    return templater.find_variables(template)
+
+
+def changed_variables(previous: dict[str, Any], current: dict[str, Any]) -> set[str]:
+    """
+    Returns the names of the variables whose values differ between two variable sets,
+    including variables present in only one of them. Values are compared in their JSON
+    form, as they are stored in a manifest.
+    """
+    def normalized(value: Any) -> str:
+        return json.dumps(value, sort_keys=True, default=str)
+
+    missing = object()
+    return {
+        name for name in previous.keys() | current.keys()
+        if previous.get(name, missing) is missing
+        or current.get(name, missing) is missing
+        or normalized(previous[name]) != normalized(current[name])
+    }
+
+
+class DependencyIndex:
+    """
+    Maps each variable to the files that depend on it. Files whose dependencies could
+    not be determined are kept apart and depend on every variable.
+    """
+
+    def __init__(self):
+        self.files_by_variable: dict[str, set[str]] = {}
+        self.unresolved: set[str] = set()
+
+    def add(self, relpath: str, names: Iterable[str] | None) -> None:
+        if names is None:
+            self.unresolved.add(relpath)
+            return
+        for name in names:
+            self.files_by_variable.setdefault(name, set()).add(relpath)
+
+    def dependents(self, names: Iterable[str]) -> set[str]:
+        """
+        Returns the files that must be rendered again when the variables `names` change.
+        """
+        files = set(self.unresolved)
+        for name in names:
+            files |= self.files_by_variable.get(name, set())
+        return files
+
+    @classmethod
+    def from_template(cls, template: BaseTemplate, templater: ABCTemplater) -> "DependencyIndex":
+        """
+        Builds the index of a template by analysing the path of every file and the source
+        of every templated one.
+        """
+        return analyze_template(template, templater).index
+
+    @classmethod
+    def from_entries(cls, files: dict[str, dict[str, Any]]) -> "DependencyIndex":
+        """
+        Builds the index of a scaffolded project from the file entries of its manifest.
+        """
+        index = cls()
+        for relpath, entry in files.items():
+            index.add(relpath, entry.get("depends_on"))
+        return index
+
+
+@dataclass
+class DocumentAnalysis:
+    """
+    What static analysis found out about one template file. `static_path` and
+    `static_body` are True when the path or content holds no template syntax;
+    `static_body` is None for files that are not templated.
+    """
+    relpath: str
+    static_path: bool
+    static_body: bool | None
+    variables: list[str] | None
+    required: set[str] | None
+
+
+class TemplateAnalysis:
+    """
+    The result of analysing every file of a template: which paths and bodies are
+    static, the variables each file depends on, and those it cannot be rendered without.
+    """
+
+    def __init__(self, documents: Iterable[DocumentAnalysis]):
+        self.documents = {document.relpath: document for document in documents}
+        self.index = DependencyIndex()
+        self.required_variables: dict[str, list[str]] = {}
+        for document in self.documents.values():
+            self.index.add(document.relpath, document.variables)
+            for name in sorted(document.required or ()):
+                self.required_variables.setdefault(name, []).append(document.relpath)
+
+    def missing_variables(self, variables: dict[str, Any]) -> dict[str, list[str]]:
+        """
+        Returns the required variables that have no value in `variables`, each with the
+        files that use it.
+        """
+        return {
+            name: relpaths
+            for name, relpaths in sorted(self.required_variables.items())
+            if name not in variables
+        }
+
+    def validate(self, variables: dict[str, Any]) -> None:
+        """
+        Raises a VariableError naming every required variable missing from `variables`.
+        """
+        missing = self.missing_variables(variables)
+        if missing:
+            details = "; ".join(f"'{name}' (used in {', '.join(relpaths)})" for name, relpaths in missing.items())
+            raise VariableError(f"No value provided for variables: {details}.")
+
+
+def analyze_document(relpath: str, source: str | None, templater: ABCTemplater) -> DocumentAnalysis:
+    static_path = templater.is_literal(relpath)
+    required = set() if static_path else templater.find_required_variables(relpath)
+    static_body = None
+    if source is not None:
+        static_body = templater.is_literal(source)
+        if not static_body and required is not None:
+            source_required = templater.find_required_variables(source)
+            required = None if source_required is None else required | source_required
+    return DocumentAnalysis(
+        relpath=relpath,
+        static_path=static_path,
+        static_body=static_body,
+        variables=document_variables(relpath, source, templater),
+        required=required,
+    )
+
+
+def document_analysis(document: TemplateDocument,
+                      templater: ABCTemplater,
+                      source_hash: str | None = None
+                      ) -> DocumentAnalysis:
+    """
+    Analyses one template file, reading its source only when it is templated and has
+    not been analysed before. Results are remembered by the hash of the source (the
+    document's digest, or `source_hash` when the caller already has it) rather than by
+    template, so they never outlive an edit to the file, even in a long-lived process.
+    """
+    templated = document.link_target is None and is_templated(Path(document.relpath), templater)
+    data = None
+    if templated:
+        source_hash = source_hash or document.digest
+        if source_hash is None:
+            data = document.read_bytes()
+            source_hash = sha256(data).hexdigest()
+    key = (type(templater), document.relpath, source_hash if templated else None)
+    with _document_analyses_lock:
+        if key in _document_analyses:
+            _document_analyses.move_to_end(key)
+            return _document_analyses[key]
+    source = None
+    if templated:
+        source = data.decode("utf-8") if data is not None else document.read_text()
+    analysis = analyze_document(document.relpath, source, templater)
+    with _document_analyses_lock:
+        _document_analyses[key] = analysis
+        while len(_document_analyses) > _DOCUMENT_ANALYSIS_CACHE_SIZE:
+            _document_analyses.popitem(last=False)
+    return analysis
+
+
+def analyze_template(template: BaseTemplate, templater: ABCTemplater) -> TemplateAnalysis:
+    """
+    Analyses every file of a template, reading the source of templated files whose
+    current content has not been analysed before. Templated sources are parsed once:
+    the templater keeps the parse for when the file is rendered.
+    """
+    return TemplateAnalysis(document_analysis(document, templater) for document in template.iter_documents())
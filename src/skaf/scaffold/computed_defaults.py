@@ -0,0 +1,197 @@
+import json
+import os
+import shlex
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+from pathlib import Path
+from typing import Any
+
+from ..cache import cache_enabled, cache_subdir
+from ..properties import ComputedDefault, CustomVariable
+
+
+COMPUTED_DEFAULTS_CACHE_NAME = "computed_defaults"
+COMPUTED_DEFAULT_KINDS = ("command", "callable", "env")
+# Seconds a computed default is reused for, unless its `ttl` says otherwise.
+DEFAULT_COMPUTED_TTL = float(os.environ.get("SKAF_COMPUTED_DEFAULT_TTL", 300))
+DEFAULT_COMPUTED_TIMEOUT = 10.0
+
+_memory_cache: dict[str, tuple[float, Any]] = {}
+_memory_lock = threading.Lock()
+
+
+def computed_default_kind(spec: ComputedDefault) -> str:
+    """
+    Returns which of `command`, `callable` or `env` a `computed_default` declares, and
+    raises a ValueError unless it declares exactly one.
+    """
+    kinds = [kind for kind in COMPUTED_DEFAULT_KINDS if kind in spec] if isinstance(spec, dict) else []
+    if len(kinds) != 1:
+        raise ValueError(f"A computed default must set exactly one of: {', '.join(COMPUTED_DEFAULT_KINDS)}. Got {spec!r}.")
+    return kinds[0]
+
+
+def compute_default(spec: ComputedDefault) -> Any:
+    """
+    Computes a default value: the stripped standard output of a `command` (a string,
+    split like a shell command line, or a list of arguments), the return value of a
+    `callable` named as `module:function`, or the value of the `env` environment
+    variable. Returns None when the command fails or the variable is unset.
+    """
+    kind = computed_default_kind(spec)
+    if kind == "env":
+        return os.environ.get(spec["env"])
+    if kind == "callable":
+        from importlib import import_module
+        module_name, _, attribute = spec["callable"].partition(":")
+        function = import_module(module_name)
+        for name in attribute.split("."):
+            function = getattr(function, name)
+        return function()
+    command = spec["command"]
+    args = shlex.split(command) if isinstance(command, str) else [str(arg) for arg in command]
+    try:
+        result = subprocess.run(
+            args,
+            capture_output=True,
+            text=True,
+            stdin=subprocess.DEVNULL,
+            timeout=spec.get("timeout", DEFAULT_COMPUTED_TIMEOUT),
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
+
+
+def _cache_key(template_name: str, spec: ComputedDefault) -> str:
+    data = {"template": template_name, "spec": spec}
+    if computed_default_kind(spec) == "command":
+        # Commands such as `git config` answer differently in different directories.
+        data["cwd"] = os.getcwd()
+    return sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ComputedDefaultCache:
+    """
+    The computed default values of one template, kept until their TTL expires: in
+    memory for the life of the process, and in the user cache so that later runs reuse
+    them too. Values that cannot be stored as JSON are only kept in memory.
+    """
+
+    def __init__(self, template_name: str, directory: Path | None = None):
+        self.template_name = template_name
+        self.persistent = cache_enabled()
+        directory = Path(directory) if directory is not None else cache_subdir(COMPUTED_DEFAULTS_CACHE_NAME)
+        self.path = directory / f"{sha256(template_name.encode('utf-8')).hexdigest()[:32]}.json"
+        self._entries: dict[str, list] | None = None
+        self._dirty = False
+
+    def _load(self) -> dict[str, list]:
+        if self._entries is None:
+            self._entries = {}
+            if self.persistent:
+                try:
+                    with open(self.path, "r") as file:
+                        self._entries = json.load(file)
+                except (OSError, ValueError):
+                    pass
+        return self._entries
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """
+        Returns `(True, value)` if an unexpired value is cached under `key`, and
+        `(False, None)` otherwise.
+        """
+        now = time.time()
+        with _memory_lock:
+            entry = _memory_cache.get(key)
+        if entry is None:
+            entry = self._load().get(key)
+        if entry is None or entry[0] <= now:
+            return False, None
+        with _memory_lock:
+            _memory_cache[key] = (entry[0], entry[1])
+        return True, entry[1]
+
+    def put(self, key: str, value: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        expires = time.time() + ttl
+        with _memory_lock:
+            _memory_cache[key] = (expires, value)
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            return
+        self._load()[key] = [expires, value]
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self.persistent or not self._dirty:
+            return
+        now = time.time()
+        entries = {key: entry for key, entry in self._load().items() if entry[0] > now}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(entries, file)
+            os.replace(tmp_name, self.path)
+        except OSError:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+        self._dirty = False
+
+
+def resolve_computed_defaults(template_name: str,
+                              custom_variables: list[CustomVariable],
+                              ) -> dict[str, Any]:
+    """
+    Computes the `computed_default` of each of `custom_variables` that declares one,
+    concurrently, and returns the values by variable name. Values are reused from the
+    template's `ComputedDefaultCache` until their `ttl` (in seconds) expires; `env`
+    lookups are cheap and never cached. Variables whose default could not be computed
+    are left out, so that their static `default` applies.
+    """
+    values: dict[str, Any] = {}
+    computed = [custom_var for custom_var in custom_variables if custom_var.get('computed_default') is not None]
+    if not computed:
+        return values
+    cache = ComputedDefaultCache(template_name)
+    pending: dict[str, tuple[ComputedDefault, str]] = {}
+    for custom_var in computed:
+        spec = custom_var['computed_default']
+        if computed_default_kind(spec) == "env":
+            value = compute_default(spec)
+            if value is not None:
+                values[custom_var['name']] = value
+            continue
+        key = _cache_key(template_name, spec)
+        hit, value = cache.get(key)
+        if hit:
+            values[custom_var['name']] = value
+        else:
+            pending[custom_var['name']] = (spec, key)
+    if not pending:
+        return values
+
+    with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+        futures = {name: pool.submit(compute_default, spec) for name, (spec, _) in pending.items()}
+    for name, future in futures.items():
+        spec, key = pending[name]
+        value = future.result()
+        if value is None or value == "":
+            continue
+        values[name] = value
+        cache.put(key, value, float(spec.get("ttl", DEFAULT_COMPUTED_TTL)))
+    cache.save()
+    return values
@@ -1,15 +1,22 @@
 from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO
 import os
 
 from ..template_classes.base import BaseTemplate
 from ..registry import get_template
 from ..templaters.base import ABCTemplater
 from ..templaters.registry import get_templater
+from ..cache import cache_enabled
+from .render_cache import render_cache_enabled
+from .dedup import Deduplicator
+from .sinks import infer_sink
 from .utils import sanitize_project_name
 
 
 DEFAULT_TEMPLATER = os.environ.get('SKAF_TEMPLATER', 'jinja2')
+# Templated files larger than this many bytes are rendered and written in chunks.
+DEFAULT_STREAM_THRESHOLD = int(os.environ.get('SKAF_STREAM_THRESHOLD', 16 * 1024 * 1024))
 
 
 @dataclass
@@ -24,6 +31,19 @@ class ScaffoldContext:
     template: BaseTemplate = None
     templater: ABCTemplater = None
     variables_filepath: Path | None = None
+    variables: dict | None = None
+    interactive: bool = True
+    executor: str | None = None
+    jobs: int | None = None
+    link_static: str = "copy"
+    manifest: bool = False
+    changed_variables: list[str] | None = None
+    stream_threshold: int | None = None
+    output_sink: str | None = None
+    output_stream: BinaryIO | None = None
+    render_cache: bool | None = None
+    dedup: Deduplicator | str | None = None
+    templater_name: str = None
     _debug: bool = False
 
     def __post_init__(self):
@@ -36,6 +56,20 @@ class ScaffoldContext:
             self.template = get_template(self.template_name)
         elif not self.template:
             raise ValueError("Either template or template_name must be provided.")
-        self.templater = get_templater(self.template.properties.get('templater', DEFAULT_TEMPLATER))
+        if self.templater_name is None:
+            self.templater_name = self.template.properties.get('templater', DEFAULT_TEMPLATER)
+        if self.templater is None:
+            # A templater passed in (by a `Scaffolder`) is reused rather than created anew.
+            self.templater = get_templater(self.templater_name)
+        if self.output_sink is None:
+            self.output_sink = infer_sink(self.output_dir)
+        if self.stream_threshold is None:
+            self.stream_threshold = DEFAULT_STREAM_THRESHOLD
+        if self.render_cache is None:
+            self.render_cache = render_cache_enabled()
+        elif self.render_cache:
+            self.render_cache = cache_enabled()
+        if isinstance(self.dedup, str):
+            self.dedup = Deduplicator(self.dedup)
         if self.auto_use_defaults is None:
             self.auto_use_defaults = self.template.properties.get('auto_use_defaults', False)
@@ -0,0 +1,173 @@
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterator
+
+from ..template_classes.document import TemplateDocument
+from .manifest import content_hash, document_mode
+from .render_cache import RenderedFile
+from .sinks import OutputSink
+from .static import LINK_MODES, materialize_file
+
+
+DEFAULT_DEDUP_MAXSIZE = int(os.environ.get('SKAF_DEDUP_MAXSIZE', 65536))
+
+
+class Deduplicator:
+    """
+    Writes each distinct rendered output once and materializes repeats of it from the
+    first copy, by hardlink, reflink or copy according to `link_mode`, falling back to a
+    copy where linking is unsupported. Output is hashed as it is rendered, and compared
+    along with the file mode, so that linked files never need their mode changed.
+
+    Renders are also remembered by their render cache key, so that a file rendered from
+    the same source with the same variable values is not rendered again at all, but
+    materialized from the copy already written.
+
+    A deduplicator may be shared by every scaffold of a batch, including concurrent
+    ones. Repeats are only found among files written to the filesystem, and streamed
+    files are always written in full. At most `maxsize` distinct outputs and render
+    cache keys are remembered, the least recently used being forgotten first, so that a
+    long-lived deduplicator does not grow without bound.
+    """
+
+    def __init__(self, link_mode: str = "hardlink", maxsize: int = DEFAULT_DEDUP_MAXSIZE):
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"Link mode '{link_mode}' does not exist. Choose one of: {', '.join(LINK_MODES)}.")
+        self.link_mode = link_mode
+        self.maxsize = maxsize
+        self.files = 0
+        self.bytes_saved = 0
+        # The first copy of each output, and the output each first copy holds.
+        self._written: OrderedDict[tuple[str, int | None], Path] = OrderedDict()
+        self._written_paths: dict[Path, tuple[str, int | None]] = {}
+        self._digests: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self._rendered: OrderedDict[int, tuple[TemplateDocument, str, int]] = OrderedDict()
+        self._writing: dict[tuple[str, int | None], threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str, document: TemplateDocument) -> RenderedFile | None:
+        """
+        Returns the copy already written of the document's output for the given render
+        cache key, or None when there is none yet.
+        """
+        with self._lock:
+            digest, size = self._digests.get(key, (None, None))
+            path = self._written.get((digest, document_mode(document))) if digest is not None else None
+            if path is not None:
+                self._digests.move_to_end(key)
+                self._written.move_to_end((digest, document_mode(document)))
+        return RenderedFile(path, digest, size) if path is not None else None
+
+    def rendered(self, key: str | None, document: TemplateDocument, content: str) -> str:
+        """
+        Hashes the output a document rendered to, recording it under its render cache
+        `key` when it has one, and returns it to be written.
+        """
+        data = content.encode("utf-8")
+        digest = content_hash(data)
+        with self._lock:
+            if key is not None:
+                self._digests[key] = (digest, len(data))
+                self._digests.move_to_end(key)
+                self._trim(self._digests)
+            # Popped when the document is written; bounded in case it never is.
+            self._rendered[id(document)] = (document, digest, len(data))
+            self._trim(self._rendered)
+        return content
+
+    def write(self,
+              sink: OutputSink,
+              target_path: Path,
+              document: TemplateDocument,
+              content: str | Iterator[str] | RenderedFile | None
+              ) -> None:
+        """
+        Writes one file to the sink, unless the same output was already written with
+        the same mode, in which case it is linked or copied from there.
+        """
+        with self._lock:
+            rendered = self._rendered.pop(id(document), None)
+        path = sink.local_path(target_path)
+        if path is None or not isinstance(content, (str, RenderedFile)):
+            sink.write(target_path, document, content)
+            return
+        if isinstance(content, RenderedFile):
+            digest, size = content.digest, content.size
+        elif rendered is not None and rendered[0] is document:
+            digest, size = rendered[1], rendered[2]
+        else:
+            data = content.encode("utf-8")
+            digest, size = content_hash(data), len(data)
+        mode = document_mode(document)
+        if isinstance(content, RenderedFile) and content.path == path:
+            # Scaffolded again over the copy that was looked up: it is already in place.
+            return
+        source = self._claim(digest, mode)
+        if source is not None and source != path and self._materialize(source, path, mode, size):
+            with self._lock:
+                self.files += 1
+                self.bytes_saved += size
+                self._record(path, digest, mode, first=False)
+            return
+        try:
+            sink.write(target_path, document, content)
+            with self._lock:
+                self._record(path, digest, mode, first=True)
+        finally:
+            if source is None:
+                self._release(digest, mode)
+
+    def _claim(self, digest: str, mode: int | None) -> Path | None:
+        """
+        Returns the first copy of an output, waiting for it while another thread writes
+        it. Returns None when there is none yet, in which case the caller writes it and
+        must `_release` it afterwards.
+        """
+        while True:
+            with self._lock:
+                source = self._written.get((digest, mode))
+                writing = self._writing.get((digest, mode))
+                if source is None and writing is None:
+                    self._writing[(digest, mode)] = threading.Event()
+                    return None
+                if source is not None:
+                    self._written.move_to_end((digest, mode))
+            if source is not None:
+                return source
+            writing.wait()
+
+    def _release(self, digest: str, mode: int | None) -> None:
+        with self._lock:
+            self._writing.pop((digest, mode)).set()
+
+    def _materialize(self, source: Path, path: Path, mode: int | None, size: int) -> bool:
+        try:
+            if os.path.getsize(source) != size:
+                return False
+            path.parent.mkdir(parents=True, exist_ok=True)
+            materialize_file(source, path, mode, self.link_mode)
+        except FileNotFoundError:
+            # The first copy was removed since it was written.
+            return False
+        return True
+
+    def _record(self, path: Path, digest: str, mode: int | None, first: bool) -> None:
+        previous = self._written_paths.pop(path, None)
+        if previous is not None:
+            # The path held other output, which must no longer be copied from it.
+            del self._written[previous]
+        if first or (digest, mode) not in self._written:
+            replaced = self._written.pop((digest, mode), None)
+            if replaced is not None:
+                del self._written_paths[replaced]
+            self._written[(digest, mode)] = path
+            self._written_paths[path] = (digest, mode)
+            while self.maxsize >= 0 and len(self._written) > self.maxsize:
+                _, evicted = self._written.popitem(last=False)
+                del self._written_paths[evicted]
+
+    def _trim(self, entries: OrderedDict) -> None:
+        while self.maxsize >= 0 and len(entries) > self.maxsize:
+            entries.popitem(last=False)
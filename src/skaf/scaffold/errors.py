@@ -0,0 +1,27 @@
+class ScaffoldError(Exception):
+    """
+    Base class of the exceptions raised when a project cannot be scaffolded.
+    """
+    pass
+
+
+class VariableError(ScaffoldError, ValueError):
+    """
+    Exception raised when variable values cannot be resolved, or when a variable the
+    template requires has no value.
+    """
+    pass
+
+
+class OutputExistsError(ScaffoldError, FileExistsError):
+    """
+    Exception raised when the output already exists and overwriting was not requested.
+    """
+    pass
+
+
+class RenderError(ScaffoldError, RuntimeError):
+    """
+    Exception raised when a template path or file cannot be rendered.
+    """
+    pass
@@ -0,0 +1,77 @@
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Generator, Iterable
+import os
+
+from ..templaters.base import ABCTemplater
+from ..template_classes.document import TemplateDocument
+
+
+EXECUTORS = ("serial", "thread", "process")
+
+
+def resolve_executor(executor: str | None, jobs: int | None) -> tuple[str, int]:
+    """
+    Returns the `(executor, jobs)` pair to use. When no executor is named, rendering
+    is serial for a single job and threaded otherwise; when a parallel executor is
+    named without a job count, one job per CPU is used.
+    """
+    if executor is None:
+        executor = "serial" if (jobs or 1) <= 1 else "thread"
+    if executor not in EXECUTORS:
+        raise ValueError(f"Executor '{executor}' does not exist. Choose one of: {', '.join(EXECUTORS)}.")
+    if executor == "serial":
+        return executor, 1
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if jobs < 1:
+        raise ValueError(f"The number of jobs must be at least 1, got {jobs}.")
+    return executor, jobs
+
+
+def create_executor(executor: str, jobs: int) -> Executor:
+    if executor == "thread":
+        return ThreadPoolExecutor(max_workers=jobs)
+    if executor == "process":
+        # Imported here as it pulls in multiprocessing, which serial runs never need.
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor(max_workers=jobs)
+    raise ValueError(f"Executor '{executor}' does not run in a pool.")
+
+
+def render_in_pool(render: Callable[[str, dict[str, Any], ABCTemplater, str], str],
+                   templater: ABCTemplater,
+                   variables: dict[str, Any],
+                   items: Iterable[tuple[Path, TemplateDocument, str | None]],
+                   executor: str,
+                   jobs: int,
+                   ) -> Generator[tuple[Path, TemplateDocument, str | None], None, None]:
+    """
+    Renders `(target_path, document, filename)` items on a thread or process pool and
+    yields `(target_path, document, content)` triples in input order. Items whose
+    filename is None are static: they are passed through unread with a content of None.
+    At most `2 * jobs` documents are in flight at once.
+
+    Results are consumed in input order, so when several documents fail, the error
+    raised is always the one for the first failing document.
+    """
+    window: deque[tuple[Path, TemplateDocument, Future | None]] = deque()
+    pool = create_executor(executor, jobs)
+    try:
+        for target_path, document, filename in items:
+            future = None
+            if filename is not None:
+                future = pool.submit(render, document.read_text(), variables, templater, filename)
+            window.append((target_path, document, future))
+            while len(window) > 2 * jobs:
+                yield _resolve(window.popleft())
+        while window:
+            yield _resolve(window.popleft())
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _resolve(item: tuple[Path, TemplateDocument, Future | None]) -> tuple[Path, TemplateDocument, str | None]:
+    target_path, document, future = item
+    return target_path, document, future.result() if future is not None else None
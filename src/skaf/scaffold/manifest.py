@@ -0,0 +1,349 @@
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Generator, Iterable, Iterator, TextIO
+
+from ..template_classes.document import TemplateDocument
+from ..templaters.base import ABCTemplater, DEFAULT_STREAM_BUFFER_SIZE
+from .analysis import changed_variables, document_analysis, document_variables
+from .render_cache import RenderedFile
+from .utils import is_templated, output_path
+
+
+MANIFEST_FILENAME = ".skaf-manifest"
+MANIFEST_VERSION = 1
+_CHUNK_SIZE = 1 << 20
+
+
+def content_hash(data: bytes) -> str:
+    return sha256(data).hexdigest()
+
+
+def link_hash(link_target: str) -> str:
+    return content_hash(b"symlink:" + link_target.encode("utf-8"))
+
+
+def file_hash(path: Path) -> str | None:
+    """
+    Returns the hash of the file or symlink at `path` as it would be recorded in a
+    manifest, or None if nothing exists there.
+    """
+    if os.path.islink(path):
+        return link_hash(os.readlink(path))
+    if not os.path.isfile(path):
+        return None
+    digest = sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def variables_hash(variables: dict[str, Any]) -> str:
+    return content_hash(json.dumps(variables, sort_keys=True, default=str).encode("utf-8"))
+
+
+def document_link_target(document: TemplateDocument) -> str | None:
+    """
+    Returns the symlink target of a document, whether it is file-backed or not.
+    """
+    if document.link_target is not None:
+        return document.link_target
+    if document.path is not None and document.path.is_symlink():
+        return os.readlink(document.path)
+    return None
+
+
+def document_mode(document: TemplateDocument) -> int | None:
+    if document.path is not None:
+        return document.path.stat().st_mode & 0o7777
+    return document.mode
+
+
+@dataclass
+class ManifestReport:
+    """
+    The outcome of a manifest-tracked scaffold, as lists of project-relative paths.
+    Conflicted files were modified in the project since the last scaffold and would
+    have been changed or removed by the template; they are left untouched.
+    """
+    added: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    conflicted: list[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    def summary(self) -> str:
+        return (f"{len(self.added)} added, {len(self.changed)} changed, {len(self.removed)} removed, "
+                f"{len(self.conflicted)} conflicted, {self.unchanged} unchanged")
+
+
+class Manifest:
+    """
+    The `.skaf-manifest` file of a scaffolded project: the template it came from, the
+    variables it was rendered with, and, for each generated file, the hash of its
+    template source and of the bytes that were written.
+    """
+
+    def __init__(self,
+                 template_name: str,
+                 templater: str,
+                 variables: dict[str, Any],
+                 files: dict[str, dict[str, Any]] | None = None,
+                 ):
+        self.template_name = template_name
+        self.templater = templater
+        self.variables = variables
+        self.files: dict[str, dict[str, Any]] = files if files is not None else {}
+
+    @property
+    def variables_hash(self) -> str:
+        return variables_hash(self.variables)
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        A hash of every template source and mode recorded in the manifest.
+        """
+        digest = sha256()
+        for relpath in sorted(self.files):
+            entry = self.files[relpath]
+            digest.update(f"{entry['source']}\0{entry['source_hash']}\0{entry.get('mode')}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": MANIFEST_VERSION,
+            "template": self.template_name,
+            "fingerprint": self.fingerprint,
+            "templater": self.templater,
+            "variables": self.variables,
+            "variables_hash": self.variables_hash,
+            "files": dict(sorted(self.files.items())),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Manifest":
+        if data.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest version: {data.get('version')}.")
+        return cls(data["template"], data["templater"], data["variables"], data["files"])
+
+    @classmethod
+    def load(cls, project_path: Path) -> "Manifest | None":
+        """
+        Loads the manifest of the project at `project_path`, or returns None if it has none.
+        """
+        path = Path(project_path) / MANIFEST_FILENAME
+        if not path.is_file():
+            return None
+        with open(path, "r") as file:
+            return cls.from_dict(json.load(file))
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=1, default=str) + "\n"
+
+    def save(self, project_path: Path) -> Path:
+        path = Path(project_path) / MANIFEST_FILENAME
+        fd, tmp_name = tempfile.mkstemp(dir=project_path, prefix=".skaf-manifest-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                file.write(self.to_json())
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+            raise
+        return path
+
+
+@dataclass
+class _Pending:
+    source_hash: str
+    mode: int | None
+    current_hash: str | None
+    previous: dict[str, Any] | None
+    depends_on: list[str] | None
+
+
+class ManifestTracker:
+    """
+    Filters the scaffold pipeline against the project's previous manifest.
+
+    `plan` drops documents whose template source and mode are unchanged, and which
+    depend on none of the variables that changed since the previous manifest, before
+    they are rendered; `filter` drops rendered documents whose bytes already match the
+    project file, and holds back conflicting changes. Files that are skipped are neither
+    rewritten nor touched.
+
+    The variables each file depends on are found by static analysis when it is rendered
+    and recorded in the manifest, so later runs need not analyse unchanged files.
+    Variables named in `changed` are treated as changed whatever their values.
+    `project_path` is None when the project is not written to a directory, such as
+    when it is written to an archive, in which case every file is new.
+    """
+
+    def __init__(self,
+                 project_path: Path | None,
+                 manifest: Manifest,
+                 previous: Manifest | None,
+                 templater: ABCTemplater,
+                 changed: Iterable[str] | None = None,
+                 ):
+        self.project_path = Path(project_path) if project_path is not None else None
+        self.manifest = manifest
+        self.previous = previous
+        self.report = ManifestReport()
+        self.templater = templater
+        self._pending: dict[str, _Pending] = {}
+        self.changed_variables: set[str] | None = None
+        if previous is not None and previous.templater == manifest.templater:
+            self.changed_variables = changed_variables(previous.variables, manifest.variables) | set(changed or ())
+
+    def _unaffected(self, previous: dict[str, Any]) -> bool:
+        """
+        Returns True when none of the variables the previously rendered file depends on changed.
+        """
+        if self.changed_variables is None:
+            return False
+        if not self.changed_variables:
+            return True
+        depends_on = previous.get("depends_on")
+        return depends_on is not None and self.changed_variables.isdisjoint(depends_on)
+
+    def plan(self,
+             targets: Iterable[tuple[Path, TemplateDocument]]
+             ) -> Generator[tuple[Path, TemplateDocument], None, None]:
+        for target_path, document in targets:
+            templated = is_templated(target_path, self.templater)
+            key = output_path(target_path, self.templater).as_posix()
+            if key == MANIFEST_FILENAME:
+                continue
+            link_target = document_link_target(document)
+            if link_target is not None:
+                source_hash = link_hash(link_target)
+            elif document.path is not None:
+                source_hash = document.digest or file_hash(document.path)
+            else:
+                data = document.read_bytes()
+                source_hash = content_hash(data)
+                # Keep the bytes so the document is not loaded a second time to render it.
+                document = TemplateDocument(document.relpath, content=data, mode=document.mode)
+            mode = document_mode(document) if link_target is None else None
+            previous = self.previous.files.get(key) if self.previous is not None else None
+            current_hash = file_hash(self.project_path / key) if self.project_path is not None else None
+            if (
+                previous is not None
+                and previous["source_hash"] == source_hash
+                and previous.get("mode") == mode
+                and (not templated or self._unaffected(previous))
+                and current_hash is not None
+            ):
+                # Neither the template nor the project file changed, or the project file
+                # was edited but the template has nothing new to bring to it.
+                self.manifest.files[key] = previous
+                self.report.unchanged += 1
+                continue
+            if templated and link_target is None:
+                depends_on = document_analysis(document, self.templater, source_hash).variables
+            else:
+                depends_on = document_variables(document.relpath, None, self.templater)
+            self._pending[key] = _Pending(source_hash, mode, current_hash, previous, depends_on)
+            yield target_path, document
+
+    def filter(self,
+               rendered: Iterable[tuple[Path, TemplateDocument, str | Iterator[str] | RenderedFile | None]]
+               ) -> Generator[tuple[Path, TemplateDocument, str | Iterator[str] | RenderedFile | None], None, None]:
+        for target_path, document, content in rendered:
+            key = target_path.as_posix()
+            pending = self._pending.pop(key)
+            spool = None
+            if content is None:
+                new_hash = pending.source_hash
+            elif isinstance(content, str):
+                new_hash = content_hash(content.encode("utf-8"))
+            elif isinstance(content, RenderedFile):
+                new_hash = content.digest
+            else:
+                # Streamed output is spooled to disk to be hashed before deciding to write it.
+                spool, new_hash = _spool(content)
+                content = _read_spool(spool)
+            entry = {
+                "source": document.relpath,
+                "source_hash": pending.source_hash,
+                "hash": new_hash,
+                "mode": pending.mode,
+                "depends_on": pending.depends_on,
+            }
+            current, previous = pending.current_hash, pending.previous
+            if current == new_hash:
+                self.manifest.files[key] = entry
+                self.report.unchanged += 1
+                self._sync_mode(target_path, pending.mode)
+                if spool is not None:
+                    spool.close()
+                continue
+            if current is not None and self.previous is not None and (previous is None or current != previous["hash"]):
+                # The project file was created or edited outside of skaf.
+                if spool is not None:
+                    spool.close()
+                if previous is not None:
+                    self.manifest.files[key] = previous
+                self.report.conflicted.append(key)
+                continue
+            self.manifest.files[key] = entry
+            (self.report.added if current is None else self.report.changed).append(key)
+            yield target_path, document, content
+
+    def remove_stale(self) -> None:
+        """
+        Deletes files recorded in the previous manifest that the template no longer
+        generates, unless they were modified in the project since.
+        """
+        if self.previous is None:
+            return
+        for key, previous in self.previous.files.items():
+            if key in self.manifest.files or key in self.report.conflicted:
+                continue
+            path = self.project_path / key
+            current = file_hash(path)
+            if current is None:
+                continue
+            if current != previous["hash"]:
+                self.report.conflicted.append(key)
+                continue
+            os.unlink(path)
+            self.report.removed.append(key)
+            _remove_empty_parents(path.parent, self.project_path)
+
+    def _sync_mode(self, target_path: Path, mode: int | None) -> None:
+        path = self.project_path / target_path
+        if mode is not None and not path.is_symlink() and path.stat().st_mode & 0o7777 != mode:
+            os.chmod(path, mode)
+
+
+def _spool(chunks: Iterable[str]) -> tuple[TextIO, str]:
+    spool = tempfile.TemporaryFile("w+", encoding="utf-8", newline="")
+    digest = sha256()
+    for chunk in chunks:
+        digest.update(chunk.encode("utf-8"))
+        spool.write(chunk)
+    spool.seek(0)
+    return spool, digest.hexdigest()
+
+
+def _read_spool(spool: TextIO) -> Generator[str, None, None]:
+    with spool:
+        while chunk := spool.read(DEFAULT_STREAM_BUFFER_SIZE):
+            yield chunk
+
+
+def _remove_empty_parents(directory: Path, root: Path) -> None:
+    while directory != root and root in directory.parents:
+        try:
+            directory.rmdir()
+        except OSError:
+            return
+        directory = directory.parent
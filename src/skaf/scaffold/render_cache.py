@@ -0,0 +1,180 @@
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Iterable
+
+from ..cache import cache_enabled, cache_subdir, directory_usage, prune_directory
+from ..templaters.base import ABCTemplater
+
+
+RENDER_CACHE_NAME = "renders"
+RENDER_CACHE_ENV_VAR = "SKAF_RENDER_CACHE"
+RENDER_CACHE_VERSION = 1
+DEFAULT_RENDER_CACHE_MAX_BYTES = int(os.environ.get("SKAF_RENDER_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+_OBJECT_MODE = 0o644
+_CHUNK_SIZE = 1 << 20
+
+_shared_caches: dict[Path, "RenderCache"] = {}
+_shared_lock = threading.Lock()
+
+
+def render_cache_enabled() -> bool:
+    """
+    Returns True when the render cache has been turned on with `SKAF_RENDER_CACHE` and
+    persistent caching is not disabled.
+    """
+    return cache_enabled() and os.environ.get(RENDER_CACHE_ENV_VAR, "").lower() in ("1", "true", "yes")
+
+
+@dataclass(frozen=True)
+class RenderedFile:
+    """
+    Rendered output that is already stored in a file, such as a render cache entry.
+    Sinks materialize it by copying or linking `path` rather than writing text.
+    `digest` is the hash of its bytes, as recorded in manifests.
+    """
+    path: Path
+    digest: str
+    size: int
+
+
+class RenderCache:
+    """
+    A content-addressed store of rendered files in the user cache, shared by every
+    process of the user.
+
+    Rendered bytes are stored once under `objects/`, named by their hash, and each
+    render is recorded under `keys/` by a hash of the template file's source, the
+    templater and its version, and the values of the variables the file depends on.
+    Entries are written to a temporary file and renamed into place, so concurrent
+    processes never see a partial entry, and rendering the same file twice at once
+    simply stores the same object twice. Once the store grows beyond `max_bytes`, the
+    least recently used entries are evicted.
+    """
+
+    def __init__(self, directory: Path | None = None, max_bytes: int = DEFAULT_RENDER_CACHE_MAX_BYTES):
+        self.directory = Path(directory) if directory is not None else cache_subdir(RENDER_CACHE_NAME)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._approximate_size: int | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "RenderCache":
+        """
+        Returns the render cache in the user cache directory, shared by every scaffold
+        of the process so that its size is only measured once.
+        """
+        directory = cache_subdir(RENDER_CACHE_NAME)
+        with _shared_lock:
+            cache = _shared_caches.get(directory)
+            if cache is None:
+                cache = _shared_caches[directory] = cls(directory)
+        return cache
+
+    @staticmethod
+    def key(templater: ABCTemplater,
+            source_hash: str,
+            variables: dict[str, Any],
+            depends_on: Iterable[str] | None,
+            ) -> str:
+        """
+        Returns the cache key of a rendered file. When the variables the file depends
+        on are unknown, every variable is part of the key.
+        """
+        names = sorted(variables) if depends_on is None else sorted(set(depends_on))
+        data = {
+            "version": RENDER_CACHE_VERSION,
+            "templater": templater.cache_tag(),
+            "source": source_hash,
+            "variables": [[name, name in variables, variables.get(name)] for name in names],
+        }
+        return sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _key_path(self, key: str) -> Path:
+        return self.directory / "keys" / key[:2] / key
+
+    def _object_path(self, digest: str) -> Path:
+        return self.directory / "objects" / digest[:2] / digest
+
+    def get(self, key: str) -> RenderedFile | None:
+        """
+        Returns the stored output for `key`, or None on a miss. Hits are marked as
+        recently used.
+
+        Objects may be hardlinked into scaffolded projects, where they can be edited in
+        place, so each hit is hashed again and objects that no longer match their digest
+        are discarded.
+        """
+        try:
+            with open(self._key_path(key), "r") as file:
+                digest, size = file.read().split()
+            path = self._object_path(digest)
+            if os.path.getsize(path) != int(size) or _file_digest(path) != digest:
+                self._discard(path)
+                raise ValueError(f"Render cache object '{path}' has been modified.")
+            os.utime(path)
+            os.utime(self._key_path(key))
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return RenderedFile(path, digest, int(size))
+
+    @staticmethod
+    def _discard(path: Path) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def put(self, key: str, content: str) -> None:
+        data = content.encode("utf-8")
+        digest = sha256(data).hexdigest()
+        path = self._object_path(digest)
+        written = 0
+        if not os.path.exists(path):
+            written += self._write(path, data, _OBJECT_MODE)
+        written += self._write(self._key_path(key), f"{digest} {len(data)}\n".encode("ascii"))
+        if written:
+            self._account(written)
+
+    def _write(self, path: Path, data: bytes, mode: int | None = None) -> int:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        except OSError:
+            return 0
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            if mode is not None:
+                os.chmod(tmp_name, mode)
+            os.replace(tmp_name, path)
+        except OSError:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+            return 0
+        return len(data)
+
+    def _account(self, size: int) -> None:
+        with self._lock:
+            if self._approximate_size is None:
+                self._approximate_size = directory_usage(self.directory)[1]
+            else:
+                self._approximate_size += size
+            if self._approximate_size > self.max_bytes:
+                self._approximate_size = prune_directory(self.directory, self.max_bytes // 2)
+
+
+def _file_digest(path: Path) -> str:
+    digest = sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
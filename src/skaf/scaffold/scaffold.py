@@ -1,13 +1,21 @@
 import os
 import sys
 from pathlib import Path
-import yaml
-from typing import Any
+from typing import Any, BinaryIO, Generator, Iterable, Iterator
 
 from ..template_classes.base import BaseTemplate
+from ..template_classes.document import TemplateDocument
 from ..templaters.base import ABCTemplater
 from .variables import get_variable_values
 from .context import ScaffoldContext
+from .errors import OutputExistsError, RenderError, ScaffoldError, VariableError
+from .executors import resolve_executor, render_in_pool
+from .sinks import OutputSink, create_sink
+from .manifest import MANIFEST_FILENAME, Manifest, ManifestReport, ManifestTracker, content_hash
+from .render_cache import RenderCache, RenderedFile
+from .dedup import Deduplicator
+from .analysis import analyze_template, document_analysis
+from .utils import is_templated, output_path
 
 
 template_lib_dir = Path(__file__).parent / 'template_lib'
@@ -21,14 +29,38 @@ def apply_templating(document: str,
                      ) -> str:
     """
     Applies templating to the given document string using the provided variables
-    using the specified templater.
+    using the specified templater. `document_filename`, the document's relpath in the
+    template, is named in errors.
     """
     try:
+        templated = document_filename is None or document_filename.endswith(templater.suffix)
+        if templated and templater.is_literal(document):
+            return templater.render_literal(document)
         return templater.render(document, variables, template_filename=document_filename)
     except KeyError as e:
-        raise ValueError(f"Missing variable for templating: {e}")
+        raise VariableError(f"Missing variable for templating{_in_file(document_filename)}: {e}")
     except Exception as e:
-        raise RuntimeError(f"Error applying templating: {e}")
+        raise RenderError(f"Error applying templating{_in_file(document_filename)}: {e}")
+
+
+def stream_templating(document: str,
+                      variables: dict[str, Any],
+                      templater: ABCTemplater,
+                      document_filename: str = None
+                      ) -> Generator[str, None, None]:
+    """
+    Like `apply_templating`, but yields the rendered document in chunks as it is rendered.
+    """
+    try:
+        yield from templater.render_stream(document, variables)
+    except KeyError as e:
+        raise VariableError(f"Missing variable for templating{_in_file(document_filename)}: {e}")
+    except Exception as e:
+        raise RenderError(f"Error applying templating{_in_file(document_filename)}: {e}")
+
+
+def _in_file(document_filename: str | None) -> str:
+    return f" in '{document_filename}'" if document_filename else ""
 
 
 def get_package_template_dir(template_name: str) -> Path:
@@ -45,6 +77,7 @@ def get_package_template_dir(template_name: str) -> Path:
 def load_template_properties(template_name) -> dict:
     template_dir = get_package_template_dir(template_name)
     properties_filename = template_dir / TEMPLATE_PROPERTIES_FILENAME
+    import yaml
     with open(properties_filename, 'r') as file:
         properties = yaml.safe_load(file)
     return properties
@@ -55,12 +88,64 @@ def get_template_variable_values(context: ScaffoldContext) -> dict[str, Any]:
         return get_variable_values(context)
     except Exception as e:
         if context._debug:
-            raise
+            if isinstance(e, ScaffoldError):
+                raise
+            raise VariableError(str(e)) from e
         etype = type(e).__name__
         print(f"Error getting variable values: {etype}: {e}")
         sys.exit(1)
 
 
+def validate_template_variables(context: ScaffoldContext, variables: dict[str, Any]) -> None:
+    """
+    Checks that every variable the template's paths and files require has a value,
+    before anything is written.
+    """
+    try:
+        analyze_template(context.template, context.templater).validate(variables)
+    except Exception as e:
+        if context._debug:
+            raise
+        etype = type(e).__name__
+        print(f"Error validating variable values: {etype}: {e}")
+        sys.exit(1)
+
+
+def render_relpath(relpath: str,
+                   variables: dict[str, Any],
+                   templater: ABCTemplater,
+                   rendered_dirs: dict[str, str]
+                   ) -> Path:
+    """
+    Renders a template relpath. Paths without template syntax are returned as-is, and
+    the directory part of each path is rendered once per distinct directory, memoized
+    in `rendered_dirs`.
+    """
+    if templater.is_literal(relpath):
+        return Path(relpath)
+    path = Path(relpath)
+    dirname, basename = str(path.parent), path.name
+    # A template expression spanning a path separator must be rendered as a whole.
+    if templater.find_variables(dirname) is None or templater.find_variables(basename) is None:
+        return Path(apply_templating(relpath, variables, templater))
+    if dirname not in rendered_dirs:
+        rendered_dirs[dirname] = apply_templating(dirname, variables, templater)
+    return Path(rendered_dirs[dirname]) / apply_templating(basename, variables, templater)
+
+
+def iter_paths(context: ScaffoldContext,
+               variables: dict[str, Any]
+               ) -> Generator[tuple[Path, TemplateDocument], None, None]:
+    """
+    Enumerates the template's documents and yields `(relpath, document)` pairs where the
+    relpath has been templated using the provided variables. Document content is not read.
+    """
+    rendered_dirs: dict[str, str] = {}
+    for document in context.template.iter_documents():
+        relpath = render_relpath(document.relpath, variables, context.templater, rendered_dirs)
+        yield relpath, document
+
+
 def map_paths(context: ScaffoldContext,
               variables: dict[str, Any]
               ) -> dict[Path, str]:
@@ -68,14 +153,194 @@ def map_paths(context: ScaffoldContext,
     Using the `template.documents` iterator method, get the `relpath, content` pairs
     and create a new `target_path, content` mapping. Perform templating on the template
     relpath using the provided variables.
+
+    This materializes every document in memory; `scaffold_project` streams documents
+    through `iter_paths` and `render_documents` instead.
+    """
+    return {relpath: document.read_text() for relpath, document in iter_paths(context, variables)}
+
+
+def is_streamed(document: TemplateDocument, context: ScaffoldContext) -> bool:
+    """
+    Returns True when a templated document is large enough to be rendered in chunks.
+    """
+    size = document.size()
+    return size is not None and size > context.stream_threshold
+
+
+def render_cache_key(context: ScaffoldContext,
+                     document: TemplateDocument,
+                     variables: dict[str, Any]
+                     ) -> str | None:
+    """
+    Returns the key a templated document's output is stored under in the render cache
+    (and remembered under when deduplicating), or None when the document's body holds
+    no template syntax, which is cheaper to render than to look up.
+    """
+    source_hash = document.digest or content_hash(document.read_bytes())
+    analysis = document_analysis(document, context.templater, source_hash)
+    if analysis.static_body:
+        return None
+    return RenderCache.key(context.templater, source_hash, variables, analysis.variables)
+
+
+def _reused_output(key: str | None,
+                   document: TemplateDocument,
+                   cache: RenderCache | None,
+                   dedup: Deduplicator | None
+                   ) -> RenderedFile | None:
+    """
+    Returns output for `key` that need not be rendered: a copy already written by the
+    deduplicator, or a render cache entry.
+    """
+    if key is None:
+        return None
+    hit = dedup.lookup(key, document) if dedup is not None else None
+    if hit is None and cache is not None:
+        hit = cache.get(key)
+    return hit
+
+
+def _rendered_output(key: str | None,
+                     document: TemplateDocument,
+                     content: str,
+                     cache: RenderCache | None,
+                     dedup: Deduplicator | None
+                     ) -> str:
+    if key is not None and cache is not None:
+        cache.put(key, content)
+    if dedup is not None:
+        content = dedup.rendered(key, document, content)
+    return content
+
+
+def render_documents(context: ScaffoldContext,
+                     variables: dict[str, Any],
+                     targets: Iterable[tuple[Path, TemplateDocument]]
+                     ) -> Generator[tuple[Path, TemplateDocument, str | Iterator[str] | RenderedFile | None], None, None]:
+    """
+    Reads and renders each templated `(relpath, document)` pair, yielding
+    `(target_path, document, content)` triples in which the templater suffix has been
+    removed from rendered files. Static documents are never read here; they are yielded
+    with a content of None so they can be copied as-is.
+    Rendering is fanned out to a thread or process pool when the context's executor
+    asks for one; results are always yielded in template order.
+
+    Documents larger than the context's `stream_threshold` are not rendered here: their
+    content is an iterator of chunks, rendered as it is written.
+
+    With the context's `render_cache`, output found in the `RenderCache` is not rendered
+    again: its content is the `RenderedFile` holding it, which sinks copy or link into
+    place. Other output is stored in the cache as it is rendered. Likewise, with the
+    context's `dedup`, output the `Deduplicator` has already seen written is not
+    rendered again, and rendered output is hashed for it. Streamed documents bypass
+    both.
+    """
+    cache = RenderCache.shared() if context.render_cache else None
+    dedup = context.dedup
+    executor, jobs = resolve_executor(context.executor, context.jobs)
+    if executor != "serial":
+        streamed: dict[int, str] = {}
+        reused: dict[int, str | RenderedFile] = {}
+        rendered = render_in_pool(
+            apply_templating,
+            context.templater,
+            variables,
+            _pool_items(context, variables, targets, streamed, cache, dedup, reused),
+            executor,
+            jobs
+        )
+        for target_path, document, content in rendered:
+            filename = streamed.pop(id(document), None)
+            if filename is not None:
+                content = stream_templating(document.read_text(), variables, context.templater, filename)
+            entry = reused.pop(id(document), None)
+            if isinstance(entry, RenderedFile):
+                content = entry
+            elif isinstance(content, str):
+                content = _rendered_output(entry, document, content, cache, dedup)
+            yield target_path, document, content
+        return
+    for target_path, document in targets:
+        if not is_templated(target_path, context.templater):
+            yield target_path, document, None
+            continue
+        if is_streamed(document, context):
+            content = stream_templating(document.read_text(), variables, context.templater, document.relpath)
+            yield output_path(target_path, context.templater), document, content
+            continue
+        key = render_cache_key(context, document, variables) if cache is not None or dedup is not None else None
+        content = _reused_output(key, document, cache, dedup)
+        if content is None:
+            content = apply_templating(
+                document.read_text(),
+                variables,
+                context.templater,
+                document.relpath
+            )
+            content = _rendered_output(key, document, content, cache, dedup)
+        yield output_path(target_path, context.templater), document, content
+
+
+def _pool_items(context: ScaffoldContext,
+                variables: dict[str, Any],
+                targets: Iterable[tuple[Path, TemplateDocument]],
+                streamed: dict[int, str],
+                cache: RenderCache | None,
+                dedup: Deduplicator | None,
+                reused: dict[int, str | RenderedFile],
+                ) -> Generator[tuple[Path, TemplateDocument, str | None], None, None]:
+    for target_path, document in targets:
+        if is_templated(target_path, context.templater) and is_streamed(document, context):
+            # Streamed documents bypass the pool and are rendered as they are written.
+            streamed[id(document)] = document.relpath
+            yield output_path(target_path, context.templater), document, None
+        elif is_templated(target_path, context.templater):
+            key = render_cache_key(context, document, variables) if cache is not None or dedup is not None else None
+            hit = _reused_output(key, document, cache, dedup)
+            if hit is not None:
+                # Reused output bypasses the pool; other output is recorded under its key once rendered.
+                reused[id(document)] = hit
+                yield output_path(target_path, context.templater), document, None
+                continue
+            if key is not None:
+                reused[id(document)] = key
+            yield output_path(target_path, context.templater), document, document.relpath
+        else:
+            yield target_path, document, None
+
+
+def get_output_sink(context: ScaffoldContext) -> OutputSink:
+    """
+    Returns the sink the project is written to: its directory, or an archive at the
+    output path (or on the output stream when the output path is `-`).
+    """
+    return create_sink(
+        context.output_sink,
+        context.output_dir,
+        context.project_path,
+        "" if context.no_project_dir else context.project_name,
+        context.link_static,
+        context.output_stream,
+    )
+
+
+def write_documents(sink: OutputSink,
+                    rendered: Iterable[tuple[Path, TemplateDocument, str | Iterator[str] | RenderedFile | None]],
+                    dedup: Deduplicator | None = None
+                    ) -> None:
+    """
+    Writes each rendered `(target_path, document, content)` triple to the sink, relative
+    to the project root. Static documents, whose content is None, are copied or linked
+    byte-for-byte, streamed content is written chunk by chunk, and rendered files are
+    copied or linked from where they are stored. With `dedup`, output already written
+    elsewhere is linked or copied from there instead.
     """
-    targets = {}
-    for relpath, content in context.template.documents():
-        relpath = Path(apply_templating(relpath, variables, context.templater))
-        target_path = context.project_path / relpath
-        target_path.parent.mkdir(parents=True, exist_ok=True)
-        targets[relpath] = content
-    return targets
+    for target_path, document, content in rendered:
+        if dedup is not None:
+            dedup.write(sink, target_path, document, content)
+        else:
+            sink.write(target_path, document, content)
 
 
 def scaffold_project(project_name: str,
@@ -86,12 +351,66 @@ def scaffold_project(project_name: str,
                      auto_use_defaults: bool = True,
                      varfile: str | None = None,
                      no_project_dir: bool = False,
+                     executor: str | None = None,
+                     jobs: int | None = None,
+                     link_static: str = "copy",
+                     variables: dict[str, Any] | None = None,
+                     interactive: bool = True,
+                     manifest: bool = False,
+                     changed_variables: list[str] | None = None,
+                     stream_threshold: int | None = None,
+                     output_sink: str | None = None,
+                     output_stream: BinaryIO | None = None,
+                     render_cache: bool | None = None,
+                     dedup: str | Deduplicator | None = None,
                      _debug: bool = False
-                     ) -> None:
+                     ) -> ManifestReport | None:
     """
     Scaffold a new project based on the provided template and variables.
     Copies files from the template directory to the new project directory,
     replacing placeholders with the provided variable values.
+
+    Documents flow through a generator pipeline (enumerate, render path, read,
+    render body, write), so only one document is held in memory at a time. With a
+    `thread` or `process` executor, up to `2 * jobs` documents are rendered concurrently.
+    Files without the templater suffix are copied byte-for-byte, or hardlinked/reflinked
+    according to `link_static`.
+
+    Variable values given in `variables` take precedence over those in `varfile`. When
+    `interactive` is False, variables without a value or default raise an error instead
+    of prompting.
+
+    With `manifest`, a `.skaf-manifest` recording the template, variables and the hash
+    of every generated file is written into the project. When a project that has one is
+    scaffolded again with `overwrite`, only files whose template source or variables
+    changed are re-rendered, only files whose bytes differ are written, files the
+    template no longer generates are removed, and files edited in the project are left
+    alone as conflicts. A `ManifestReport` is returned in that case, and None otherwise.
+    Files are only rendered again for the variables they depend on, which are found by
+    static analysis; `changed_variables` names variables to treat as changed even if
+    their values did not.
+
+    Templated files larger than `stream_threshold` bytes (by default the
+    `SKAF_STREAM_THRESHOLD` environment variable, or 16 MiB) are rendered and written
+    in chunks, so their output is never held in memory at once.
+
+    The project is written to `output_sink`: a "directory" (the default), or a "zip",
+    "tar" or "tar.gz" archive at `output_dir`, inferred from its suffix when not given.
+    An `output_dir` of `-` writes the archive (a tar by default) to `output_stream`, or
+    to standard output. Archives are written member by member as files are rendered, and
+    an existing archive is only replaced with `overwrite`. With `manifest`, the manifest
+    is written into the archive.
+
+    With `render_cache` (by default, when the `SKAF_RENDER_CACHE` environment variable is
+    set), rendered files are kept in a content-addressed store in the user cache, keyed
+    by their template source, the templater and the values of the variables they depend
+    on, and are copied (or linked, according to `link_static`) from there when the same
+    file is scaffolded again with the same values.
+
+    With `dedup`, a link mode or a `Deduplicator` shared by several scaffolds, rendered
+    files whose output repeats one already written (with the same mode) are hardlinked,
+    reflinked or copied from the first copy, and files rendered from the same source
+    with the same values are not rendered again.
     """
     if output_dir is None:
         output_dir = os.getcwd()
@@ -106,38 +425,64 @@ def scaffold_project(project_name: str,
         auto_use_defaults=auto_use_defaults,
         template=template,
         variables_filepath=Path(varfile) if varfile else None,
+        variables=variables,
+        interactive=interactive,
+        executor=executor,
+        jobs=jobs,
+        link_static=link_static,
+        manifest=manifest,
+        changed_variables=changed_variables,
+        stream_threshold=stream_threshold,
+        output_sink=output_sink,
+        output_stream=output_stream,
+        render_cache=render_cache,
+        dedup=dedup,
         _debug=_debug
     )
+    return run_scaffold(context)
 
-    variables = get_template_variable_values(context)
 
-    path_mapping: dict[Path, str] = map_paths(
-        context,
-        variables
-    )
+def run_scaffold(context: ScaffoldContext) -> ManifestReport | None:
+    """
+    Scaffolds the project described by an already built `context`; see `scaffold_project`.
+    In debug mode, failures are raised as `ScaffoldError` subclasses instead of exiting.
+    """
+    template_variables = get_template_variable_values(context)
+    validate_template_variables(context, template_variables)
 
-    if not context.overwrite:
-        if all([
-            context.project_path.exists(),
-            context.project_path.is_dir(),
-            os.listdir(context.project_path)
-        ]):
-            print(f"Project directory '{context.project_path}' already exists. Set --overwrite to overwrite.")
-            sys.exit(1)
-
-    context.project_path.mkdir(parents=True, exist_ok=True)
-
-    for target_path, content in path_mapping.items():
-        target_filename = target_path.name
-        content = apply_templating(
-            content,
-            variables,
-            context.templater,
-            target_filename
-        )
-        if target_path.suffix == context.templater.suffix:
-            target_path = Path(target_path.parent / target_path.stem)
-        write_path = context.project_path / target_path
-        write_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(write_path, 'w') as file:
-            file.write(content)
+    sink = get_output_sink(context)
+    if not context.overwrite and sink.exists():
+        message = f"{sink.description} already exists. Set --overwrite to overwrite."
+        if context._debug:
+            raise OutputExistsError(message)
+        print(message)
+        sys.exit(1)
+
+    previous_manifest = None
+    if context.overwrite and sink.incremental:
+        previous_manifest = Manifest.load(context.project_path)
+
+    targets = iter_paths(context, template_variables)
+    if not context.manifest and previous_manifest is None:
+        with sink:
+            rendered = render_documents(context, template_variables, targets)
+            write_documents(sink, rendered, context.dedup)
+        return None
+
+    tracker = ManifestTracker(
+        context.project_path if sink.incremental else None,
+        Manifest(context.template.template_name, context.templater_name, template_variables),
+        previous_manifest,
+        context.templater,
+        context.changed_variables,
+    )
+    with sink:
+        rendered = render_documents(context, template_variables, tracker.plan(targets))
+        write_documents(sink, tracker.filter(rendered), context.dedup)
+        if not sink.incremental:
+            manifest_document = TemplateDocument(MANIFEST_FILENAME, content=tracker.manifest.to_json())
+            sink.write(Path(MANIFEST_FILENAME), manifest_document, manifest_document.read_text())
+    if sink.incremental:
+        tracker.remove_stale()
+        tracker.manifest.save(context.project_path)
+    return tracker.report
@@ -0,0 +1,114 @@
+import os
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from ..registry import get_template
+from ..template_classes.base import BaseTemplate
+from ..templaters.registry import get_templater
+from .analysis import TemplateAnalysis, analyze_template, document_analysis
+from .context import DEFAULT_TEMPLATER, ScaffoldContext
+from .dedup import Deduplicator
+from .manifest import ManifestReport
+from .scaffold import run_scaffold
+from .utils import is_templated
+
+
+class Scaffolder:
+    """
+    Scaffolds projects from a single template, for programs that scaffold many projects
+    in one process. The template is resolved, its templater created and the template
+    analysed once, when the scaffolder is created; with `warm`, each templated file is
+    also compiled into the templater's compiled-template cache up front, so the first
+    scaffold does not pay for it either.
+
+    Unlike `scaffold_project`, `scaffold` never prompts or exits: failures are raised as
+    `ScaffoldError` subclasses (`VariableError`, `OutputExistsError` or `RenderError`).
+    A scaffolder holds no per-project state, so it can be reused any number of times
+    and from several threads at once. With `dedup` (a link mode), one `Deduplicator` is
+    shared by all of its scaffolds, so files that repeat across projects are rendered
+    and written once, and linked or copied from the first copy elsewhere.
+    """
+
+    def __init__(self,
+                 template: BaseTemplate | str,
+                 executor: str | None = None,
+                 jobs: int | None = None,
+                 link_static: str = "copy",
+                 stream_threshold: int | None = None,
+                 render_cache: bool | None = None,
+                 dedup: str | None = None,
+                 warm: bool = True,
+                 ):
+        self.template = get_template(template) if isinstance(template, str) else template
+        self.templater_name = self.template.properties.get('templater', DEFAULT_TEMPLATER)
+        self.templater = get_templater(self.templater_name)
+        self.executor = executor
+        self.jobs = jobs
+        self.link_static = link_static
+        self.stream_threshold = stream_threshold
+        self.render_cache = render_cache
+        self.deduplicator = Deduplicator(dedup) if dedup is not None else None
+        self.analysis: TemplateAnalysis = analyze_template(self.template, self.templater)
+        if warm:
+            self.warm()
+
+    @property
+    def template_name(self) -> str:
+        return self.template.template_name
+
+    def warm(self) -> None:
+        """
+        Compiles each templated file of the template, so that scaffolds find them in the
+        templater's compiled-template cache.
+        """
+        for document in self.template.iter_documents():
+            static_body = document_analysis(document, self.templater).static_body
+            if document.link_target is None and is_templated(Path(document.relpath), self.templater) and not static_body:
+                self.templater.compile(document.read_text())
+
+    def scaffold(self,
+                 project_name: str,
+                 variables: dict[str, Any] | None = None,
+                 output: str | Path | None = None,
+                 *,
+                 overwrite: bool = False,
+                 no_project_dir: bool = False,
+                 varfile: str | Path | None = None,
+                 auto_use_defaults: bool = True,
+                 output_format: str | None = None,
+                 output_stream: BinaryIO | None = None,
+                 manifest: bool = False,
+                 changed_variables: list[str] | None = None,
+                 ) -> ManifestReport | None:
+        """
+        Scaffolds a project into `output` (the current directory by default), which is
+        a directory, an archive path or `-` for `output_stream`, as in
+        `scaffold_project`. Variables without a value fall back to their defaults; a
+        required variable that has none raises a `VariableError`.
+        """
+        context = ScaffoldContext(
+            project_name=project_name,
+            template_name=self.template.template_name,
+            output_dir=Path(output if output is not None else os.getcwd()),
+            no_project_dir=no_project_dir,
+            overwrite=overwrite,
+            auto_use_defaults=auto_use_defaults,
+            template=self.template,
+            templater=self.templater,
+            templater_name=self.templater_name,
+            variables_filepath=Path(varfile) if varfile else None,
+            variables=variables,
+            interactive=False,
+            executor=self.executor,
+            jobs=self.jobs,
+            link_static=self.link_static,
+            manifest=manifest,
+            changed_variables=changed_variables,
+            stream_threshold=self.stream_threshold,
+            output_sink=output_format,
+            output_stream=output_stream,
+            render_cache=self.render_cache,
+            dedup=self.deduplicator,
+            _debug=True
+        )
+        return run_scaffold(context)
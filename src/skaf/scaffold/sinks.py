@@ -0,0 +1,389 @@
+import io
+import os
+import shutil
+import stat
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from ..template_classes.document import TemplateDocument
+from .manifest import document_link_target, document_mode
+from .render_cache import RenderedFile
+from .static import materialize_file, write_static_document
+
+
+SINKS = ("directory", "zip", "tar", "tar.gz")
+STDOUT = "-"
+_DEFAULT_FILE_MODE = 0o644
+_CHUNK_SIZE = 1 << 20
+
+
+def infer_sink(output: str | Path) -> str:
+    """
+    Returns the kind of sink an output path names: an archive when it ends in `.zip`,
+    `.tar`, `.tar.gz` or `.tgz`, a tar stream for `-` (standard output), and a
+    directory otherwise.
+    """
+    name = str(output).lower()
+    if name == STDOUT:
+        return "tar"
+    if name.endswith(".zip"):
+        return "zip"
+    if name.endswith((".tar.gz", ".tgz")):
+        return "tar.gz"
+    if name.endswith(".tar"):
+        return "tar"
+    return "directory"
+
+
+class OutputSink(ABC):
+    """
+    The destination scaffolded files are written to. Sinks are used as context managers:
+    files are written with `write` as they are rendered, and the output is only
+    finalized when the block exits without an error.
+    """
+
+    # Whether the sink holds the output of previous scaffolds, so that a project's
+    # manifest can be read back and only its changed files written.
+    incremental = False
+
+    @property
+    @abstractmethod
+    def description(self) -> str:
+        """
+        Names the output in messages, e.g. "Project directory '/path'".
+        """
+
+    @abstractmethod
+    def exists(self) -> bool:
+        """
+        Returns True when writing would replace existing output.
+        """
+
+    def open(self) -> None:
+        pass
+
+    def close(self, ok: bool = True) -> None:
+        pass
+
+    def local_path(self, target_path: Path) -> Path | None:
+        """
+        Returns where the file at `target_path` is written on the filesystem, or None
+        when the sink does not write files there.
+        """
+        return None
+
+    @abstractmethod
+    def write(self,
+              target_path: Path,
+              document: TemplateDocument,
+              content: str | Iterator[str] | RenderedFile | None
+              ) -> None:
+        """
+        Writes one file at `target_path`, relative to the project root. Static documents,
+        whose content is None, are written byte-for-byte; streamed content is written
+        chunk by chunk, and a `RenderedFile` is copied from where it is stored.
+        """
+
+    def __enter__(self) -> "OutputSink":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(ok=exc_type is None)
+
+
+class DirectorySink(OutputSink):
+    """
+    Writes the project into a directory on disk.
+    """
+
+    incremental = True
+
+    def __init__(self, project_path: Path, link_static: str = "copy"):
+        self.project_path = Path(project_path)
+        self.link_static = link_static
+
+    @property
+    def description(self) -> str:
+        return f"Project directory '{self.project_path}'"
+
+    def exists(self) -> bool:
+        return (
+            self.project_path.exists()
+            and self.project_path.is_dir()
+            and bool(os.listdir(self.project_path))
+        )
+
+    def open(self) -> None:
+        self.project_path.mkdir(parents=True, exist_ok=True)
+
+    def local_path(self, target_path: Path) -> Path:
+        return self.project_path / target_path
+
+    def write(self,
+              target_path: Path,
+              document: TemplateDocument,
+              content: str | Iterator[str] | RenderedFile | None
+              ) -> None:
+        write_path = self.project_path / target_path
+        write_path.parent.mkdir(parents=True, exist_ok=True)
+        if content is None:
+            write_static_document(document, write_path, self.link_static)
+            return
+        if isinstance(content, RenderedFile):
+            materialize_file(content.path, write_path, document_mode(document), self.link_static)
+            return
+        if os.path.islink(write_path) or (os.path.exists(write_path) and os.stat(write_path).st_nlink > 1):
+            # Links are replaced rather than written through, which would change the
+            # files they share content with.
+            os.unlink(write_path)
+        with open(write_path, 'w') as file:
+            if isinstance(content, str):
+                file.write(content)
+            else:
+                for chunk in content:
+                    file.write(chunk)
+        if document.path is not None:
+            shutil.copymode(document.path, write_path)
+        elif document.mode is not None:
+            os.chmod(write_path, document.mode)
+
+
+class ArchiveSink(OutputSink):
+    """
+    Writes the project as members of an archive, either to a file at `path`, which is
+    only put in place once the archive is complete, or to a binary `stream` (standard
+    output by default) when `path` is `-`. Unless `root` is empty, members are placed
+    under a `<root>/` directory. Nothing is written to the filesystem besides the archive.
+
+    When scaffolding fails, a stream is left truncated rather than finalized, so that
+    readers see an invalid archive instead of an incomplete project.
+    """
+
+    def __init__(self, path: str | Path, root: str = "", stream: BinaryIO | None = None):
+        self.path = None if str(path) == STDOUT else Path(path)
+        self.prefix = f"{root}/" if root else ""
+        self.stream = stream
+        self.mtime = time.time()
+        self._file: BinaryIO | None = None
+        self._tmp_name: str | None = None
+        self._writer: _AbortableWriter | None = None
+
+    @property
+    def description(self) -> str:
+        return f"Output archive '{self.path if self.path is not None else STDOUT}'"
+
+    def exists(self) -> bool:
+        return self.path is not None and os.path.lexists(self.path)
+
+    def open(self) -> None:
+        if self.path is None:
+            self._file = self.stream if self.stream is not None else sys.stdout.buffer
+            self._writer = _AbortableWriter(self._file)
+            self._open_archive(self._writer)
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}-", suffix=".tmp")
+        self._file = os.fdopen(fd, "wb")
+        self._open_archive(self._file)
+
+    def close(self, ok: bool = True) -> None:
+        if not ok and self._writer is not None:
+            self._writer.aborted = True
+        try:
+            self._close_archive()
+        finally:
+            if self._tmp_name is None:
+                self._file.flush()
+            else:
+                self._file.close()
+                if ok:
+                    os.chmod(self._tmp_name, _DEFAULT_FILE_MODE)
+                    os.replace(self._tmp_name, self.path)
+                else:
+                    os.remove(self._tmp_name)
+                self._tmp_name = None
+
+    def write(self,
+              target_path: Path,
+              document: TemplateDocument,
+              content: str | Iterator[str] | RenderedFile | None
+              ) -> None:
+        name = self.prefix + Path(target_path).as_posix()
+        link_target = document_link_target(document) if content is None else None
+        if link_target is not None:
+            self._add_symlink(name, link_target)
+            return
+        mode = document_mode(document)
+        mode = _DEFAULT_FILE_MODE if mode is None else mode
+        if content is None:
+            if document.path is not None:
+                with open(document.path, "rb") as file:
+                    self._add_file(name, mode, file, os.fstat(file.fileno()).st_size)
+            else:
+                self._add_bytes(name, mode, document.read_bytes())
+        elif isinstance(content, RenderedFile):
+            with open(content.path, "rb") as file:
+                self._add_file(name, mode, file, content.size)
+        elif isinstance(content, str):
+            self._add_bytes(name, mode, content.encode("utf-8"))
+        else:
+            self._add_chunks(name, mode, content)
+
+    @abstractmethod
+    def _open_archive(self, file: BinaryIO) -> None:
+        pass
+
+    @abstractmethod
+    def _close_archive(self) -> None:
+        pass
+
+    @abstractmethod
+    def _add_symlink(self, name: str, link_target: str) -> None:
+        pass
+
+    @abstractmethod
+    def _add_file(self, name: str, mode: int, file: BinaryIO, size: int) -> None:
+        pass
+
+    @abstractmethod
+    def _add_bytes(self, name: str, mode: int, data: bytes) -> None:
+        pass
+
+    @abstractmethod
+    def _add_chunks(self, name: str, mode: int, chunks: Iterator[str]) -> None:
+        pass
+
+
+class TarSink(ArchiveSink):
+    """
+    Writes the project as a tar archive, gzip-compressed when `compression` is "gz".
+    The archive is written as a stream, so it can go to a pipe or socket.
+    """
+
+    def __init__(self, path: str | Path, root: str = "", stream: BinaryIO | None = None, compression: str | None = None):
+        super().__init__(path, root, stream)
+        self.compression = compression
+        self._tar: tarfile.TarFile | None = None
+
+    def _open_archive(self, file: BinaryIO) -> None:
+        self._tar = tarfile.open(fileobj=file, mode=f"w|{self.compression or ''}", format=tarfile.PAX_FORMAT)
+
+    def _close_archive(self) -> None:
+        self._tar.close()
+
+    def _info(self, name: str, mode: int) -> tarfile.TarInfo:
+        info = tarfile.TarInfo(name)
+        info.mode = mode
+        info.mtime = self.mtime
+        return info
+
+    def _add_symlink(self, name: str, link_target: str) -> None:
+        info = self._info(name, 0o777)
+        info.type = tarfile.SYMTYPE
+        info.linkname = link_target
+        self._tar.addfile(info)
+
+    def _add_file(self, name: str, mode: int, file: BinaryIO, size: int) -> None:
+        info = self._info(name, mode)
+        info.size = size
+        self._tar.addfile(info, file)
+
+    def _add_bytes(self, name: str, mode: int, data: bytes) -> None:
+        info = self._info(name, mode)
+        info.size = len(data)
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def _add_chunks(self, name: str, mode: int, chunks: Iterator[str]) -> None:
+        # A tar header holds the member's size, so streamed output is spooled first.
+        with tempfile.TemporaryFile() as spool:
+            for chunk in chunks:
+                spool.write(chunk.encode("utf-8"))
+            size = spool.tell()
+            spool.seek(0)
+            self._add_file(name, mode, spool, size)
+
+
+class ZipSink(ArchiveSink):
+    """
+    Writes the project as a deflate-compressed zip archive. Members are compressed as
+    they are written, without knowing their size in advance.
+    """
+
+    def __init__(self, path: str | Path, root: str = "", stream: BinaryIO | None = None):
+        super().__init__(path, root, stream)
+        self._zip: zipfile.ZipFile | None = None
+
+    def _open_archive(self, file: BinaryIO) -> None:
+        self._zip = zipfile.ZipFile(file, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def _close_archive(self) -> None:
+        self._zip.close()
+
+    def _info(self, name: str, file_type: int, mode: int) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(name, date_time=time.localtime(self.mtime)[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.create_system = 3  # Unix, so that the mode bits are honoured on extraction.
+        info.external_attr = (file_type | mode) << 16
+        return info
+
+    def _add_symlink(self, name: str, link_target: str) -> None:
+        self._zip.writestr(self._info(name, stat.S_IFLNK, 0o777), link_target)
+
+    def _add_file(self, name: str, mode: int, file: BinaryIO, size: int) -> None:
+        with self._zip.open(self._info(name, stat.S_IFREG, mode), "w", force_zip64=size > zipfile.ZIP64_LIMIT) as member:
+            shutil.copyfileobj(file, member, _CHUNK_SIZE)
+
+    def _add_bytes(self, name: str, mode: int, data: bytes) -> None:
+        self._zip.writestr(self._info(name, stat.S_IFREG, mode), data)
+
+    def _add_chunks(self, name: str, mode: int, chunks: Iterator[str]) -> None:
+        with self._zip.open(self._info(name, stat.S_IFREG, mode), "w", force_zip64=True) as member:
+            for chunk in chunks:
+                member.write(chunk.encode("utf-8"))
+
+
+class _AbortableWriter:
+    """
+    Forwards writes to `file` until it is aborted, after which they are dropped.
+    """
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.aborted = False
+
+    def write(self, data: bytes) -> int:
+        if not self.aborted:
+            self.file.write(data)
+        return len(data)
+
+    def flush(self) -> None:
+        if not self.aborted:
+            self.file.flush()
+
+
+def create_sink(kind: str,
+                output_dir: Path,
+                project_path: Path,
+                root: str,
+                link_static: str = "copy",
+                stream: BinaryIO | None = None,
+                ) -> OutputSink:
+    """
+    Creates the sink of the given `kind` (one of `SINKS`). Directory sinks write into
+    `project_path`; archive sinks write the archive at `output_dir`, or to `stream` (or
+    standard output) when `output_dir` is `-`, with members under `root`.
+    """
+    if kind == "directory":
+        return DirectorySink(project_path, link_static)
+    if kind == "zip":
+        return ZipSink(output_dir, root, stream)
+    if kind in ("tar", "tar.gz"):
+        return TarSink(output_dir, root, stream, compression="gz" if kind == "tar.gz" else None)
+    raise ValueError(f"Output sink '{kind}' does not exist. Choose one of: {', '.join(SINKS)}.")
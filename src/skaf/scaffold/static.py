@@ -0,0 +1,124 @@
+import os
+import shutil
+import sys
+from pathlib import Path
+
+from ..template_classes.document import TemplateDocument
+
+
+LINK_MODES = ("copy", "hardlink", "reflink")
+
+# From linux/fs.h: _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+
+
+def write_static_document(document: TemplateDocument, destination: Path, link_mode: str = "copy") -> None:
+    """
+    Writes a static document to `destination` without decoding it. Documents backed by a
+    file are copied or linked with `copy_static_file`; others have their bytes written.
+    """
+    if document.path is not None:
+        copy_static_file(document.path, destination, link_mode)
+        return
+    if os.path.lexists(destination):
+        os.unlink(destination)
+    if document.link_target is not None:
+        os.symlink(document.link_target, destination)
+        return
+    with open(destination, "wb") as file:
+        file.write(document.read_bytes())
+    if document.mode is not None:
+        os.chmod(destination, document.mode)
+
+
+def copy_static_file(source: Path, destination: Path, link_mode: str = "copy") -> None:
+    """
+    Materializes a static template file at `destination` without decoding it.
+
+    Symlinks are recreated as symlinks. Regular files are hardlinked or reflinked when
+    `link_mode` asks for it and the filesystem supports it, and are otherwise copied
+    byte-for-byte with kernel-side copies. File modes are preserved.
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Link mode '{link_mode}' does not exist. Choose one of: {', '.join(LINK_MODES)}.")
+    if os.path.lexists(destination):
+        os.unlink(destination)
+    if source.is_symlink():
+        os.symlink(os.readlink(source), destination)
+        return
+    if link_mode == "hardlink":
+        try:
+            os.link(source, destination)
+            return
+        except OSError:
+            pass
+    if link_mode == "reflink" and _reflink(source, destination):
+        shutil.copymode(source, destination)
+        return
+    copy_file_contents(source, destination)
+    shutil.copymode(source, destination)
+
+
+def materialize_file(source: Path, destination: Path, mode: int | None = None, link_mode: str = "copy") -> None:
+    """
+    Materializes a stored regular file, such as rendered output kept in a cache, at
+    `destination` with the permission `mode`, or with the stored file's mode when None.
+    It is hardlinked only when `link_mode` asks for it and the stored file already has
+    that mode, so that setting the mode never changes the stored file; otherwise it is
+    reflinked or copied like a static file.
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Link mode '{link_mode}' does not exist. Choose one of: {', '.join(LINK_MODES)}.")
+    if os.path.lexists(destination):
+        os.unlink(destination)
+    if link_mode == "hardlink" and (mode is None or os.stat(source).st_mode & 0o7777 == mode):
+        try:
+            os.link(source, destination)
+            return
+        except OSError:
+            pass
+    if not (link_mode == "reflink" and _reflink(source, destination)):
+        copy_file_contents(source, destination)
+    if mode is None:
+        shutil.copymode(source, destination)
+    else:
+        os.chmod(destination, mode)
+
+
+def copy_file_contents(source: Path, destination: Path) -> None:
+    """
+    Copies file content with `copy_file_range` where available, falling back to
+    `shutil.copyfile` (which itself uses `sendfile` on Linux).
+    """
+    copy_file_range = getattr(os, "copy_file_range", None)
+    if copy_file_range is not None:
+        with open(source, "rb") as src, open(destination, "wb") as dst:
+            remaining = os.fstat(src.fileno()).st_size
+            try:
+                while remaining > 0:
+                    copied = copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return
+            except OSError:
+                pass
+    shutil.copyfile(source, destination)
+
+
+def _reflink(source: Path, destination: Path) -> bool:
+    """
+    Attempts a copy-on-write clone of `source`. Returns False when unsupported.
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+    try:
+        with open(source, "rb") as src, open(destination, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        return True
+    except OSError:
+        if os.path.lexists(destination):
+            os.unlink(destination)
+        return False
@@ -1,4 +1,5 @@
 import re
+from pathlib import Path
 
 
 def sanitize_project_name(name: str) -> str:
@@ -12,3 +13,21 @@ def sanitize_project_name(name: str) -> str:
     if sanitized and sanitized[0].isdigit():
         sanitized = "_" + sanitized
     return sanitized
+
+
+def is_templated(relpath: Path, templater) -> bool:
+    """
+    Returns True when the file at `relpath` carries the templater suffix and is rendered.
+    All other files are static and are copied byte-for-byte.
+    """
+    return relpath.name.endswith(templater.suffix)
+
+
+def output_path(relpath: Path, templater) -> Path:
+    """
+    Returns the project path a template file at `relpath` is written to: templated
+    files lose the templater suffix.
+    """
+    if is_templated(relpath, templater):
+        return Path(relpath.parent / relpath.stem)
+    return relpath
@@ -1,8 +1,8 @@
 from typing import Any
 from .context import ScaffoldContext
+from .computed_defaults import resolve_computed_defaults
 import re
 import os
-import yaml
 from pathlib import Path
 
 ENV_VAR_PREFIX = "SKAF_"
@@ -17,6 +17,17 @@ custom_var_type_mapper = {
     'dict': lambda x: dict(item.split('=') for item in x.split(',')),
 }
 
+# Values that already have the variable's type, such as lists read from a varfile or a
+# manifest, are used as-is rather than cast.
+custom_var_type_classes = {
+    'str': str,
+    'int': int,
+    'float': float,
+    'bool': bool,
+    'list': list,
+    'dict': dict,
+}
+
 
 def add_project_name_variables(project_name: str, variables):
     """
@@ -44,6 +55,7 @@ def load_variables_filepath(filepath: Path) -> dict[str, Any]:
     """
     if not filepath.exists():
         raise FileNotFoundError(f"Variables file '{filepath}' does not exist.")
+    import yaml
     with open(filepath, 'r') as file:
         variables = yaml.safe_load(file)
     return variables
@@ -54,13 +66,25 @@ def get_variable_values(context: ScaffoldContext) -> dict[str, Any]:
 
     values_from_file = {}
     if context.variables_filepath:
-        values_from_file = load_variables_filepath(context.variables_filepath)
+        values_from_file = load_variables_filepath(context.variables_filepath) or {}
+    if context.variables:
+        values_from_file = {**values_from_file, **context.variables}
+
+    # Computed defaults are only needed for variables that neither the environment nor
+    # the varfile set, and are all resolved up front, concurrently.
+    computed_defaults = resolve_computed_defaults(
+        context.template.template_name,
+        [
+            custom_var for custom_var in context.template.custom_variables
+            if get_env_variable(custom_var['name']) is None and custom_var['name'] not in values_from_file
+        ],
+    )
 
     for custom_var in context.template.custom_variables:
         varname = custom_var['name']
         vartype = custom_var.get('type', 'str')
         caster = custom_var_type_mapper.get(vartype, str)
-        default = custom_var.get('default')
+        default = computed_defaults.get(varname, custom_var.get('default'))
         if (from_env := get_env_variable(varname)) is not None:
             try:
                 values[varname] = caster(from_env)
@@ -68,16 +92,22 @@ def get_variable_values(context: ScaffoldContext) -> dict[str, Any]:
             except Exception as e:
                 raise type(e)(f"Environment variable {from_env} cannot be used with caster {caster}: {e}")
         if varname in values_from_file:
+            value = values_from_file[varname]
+            if isinstance(value, custom_var_type_classes.get(vartype, str)):
+                values[varname] = value
+                continue
             try:
-                values[varname] = caster(values_from_file[varname])
+                values[varname] = caster(value)
                 continue
             except Exception as e:
                 raise type(e)(f"Variable {varname} cannot be used with caster {caster}: {e}")
-        if context.auto_use_defaults and default is not None:
+        if (context.auto_use_defaults or not context.interactive) and default is not None:
             try:
                 values[varname] = caster(default)
             except Exception as e:
                 raise type(e)(f"Default value for {varname}, {default} cannot be used with caster {caster}: {e}")
+        elif not context.interactive:
+            raise ValueError(f"No value provided for variable '{varname}'.")
         else:
             defaultstr = f" [{default}]" if default else ""
             val = input(f"Enter value for {varname} ({vartype}){defaultstr}: ")
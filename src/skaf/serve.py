@@ -0,0 +1,280 @@
+import json
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterable
+from urllib.parse import unquote
+
+from .registry import available_templates, get_template
+from .scaffold import Scaffolder
+from .scaffold.utils import sanitize_project_name
+from .template_classes.base import BaseTemplate
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_FORMAT = "tar.gz"
+MAX_REQUEST_BYTES = 1 << 20
+
+ARCHIVE_FORMATS = {
+    "tar.gz": ("application/gzip", ".tar.gz"),
+    "tar": ("application/x-tar", ".tar"),
+    "zip": ("application/zip", ".zip"),
+}
+
+
+class ServerMetrics:
+    """
+    Request counters and timings of a scaffold server, safe to update from the
+    handler threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.scaffolds = 0
+        self.failed = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.bytes_sent = 0
+        self.scaffold_seconds = 0.0
+        self.by_template: dict[str, int] = {}
+
+    def start(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def finish(self, template_name: str, seconds: float, bytes_sent: int, ok: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.bytes_sent += bytes_sent
+            if ok:
+                self.scaffolds += 1
+                self.scaffold_seconds += seconds
+                self.by_template[template_name] = self.by_template.get(template_name, 0) + 1
+            else:
+                self.failed += 1
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "uptime_seconds": round(time.time() - self.started, 3),
+                "requests": self.requests,
+                "scaffolds": self.scaffolds,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "in_flight": self.in_flight,
+                "bytes_sent": self.bytes_sent,
+                "mean_scaffold_seconds": round(self.scaffold_seconds / self.scaffolds, 6) if self.scaffolds else None,
+                "scaffolds_by_template": dict(sorted(self.by_template.items())),
+            }
+
+
+class _ChunkedResponse:
+    """
+    A binary stream that sends the response headers on its first write and the body in
+    HTTP/1.1 chunks, so that errors raised before any output can still be reported
+    with a proper status.
+    """
+
+    def __init__(self, handler: BaseHTTPRequestHandler, content_type: str, filename: str):
+        self.handler = handler
+        self.content_type = content_type
+        self.filename = filename
+        self.started = False
+        self.bytes_sent = 0
+
+    def _start(self) -> None:
+        self.handler.send_response(HTTPStatus.OK)
+        self.handler.send_header("Content-Type", self.content_type)
+        self.handler.send_header("Content-Disposition", f'attachment; filename="{self.filename}"')
+        self.handler.send_header("Transfer-Encoding", "chunked")
+        self.handler.end_headers()
+        self.started = True
+
+    def write(self, data: bytes) -> int:
+        if not data:
+            return 0
+        if not self.started:
+            self._start()
+        wfile = self.handler.wfile
+        wfile.write(f"{len(data):x}\r\n".encode("ascii"))
+        wfile.write(data)
+        wfile.write(b"\r\n")
+        self.bytes_sent += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        self.handler.wfile.flush()
+
+    def finish(self) -> None:
+        if not self.started:
+            self._start()
+        self.handler.wfile.write(b"0\r\n\r\n")
+        self.handler.wfile.flush()
+
+
+class ScaffoldRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the scaffold API:
+
+    - `GET /templates`: the names of the templates being served.
+    - `GET /metrics`: request counters and timings, as JSON.
+    - `POST /scaffold/<template>`: scaffolds a project and streams it back as an
+      archive. The JSON body holds `project_name`, and optionally `variables`,
+      `format` ("tar.gz", "tar" or "zip") and `no_project_dir`.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server: "ScaffoldServer"
+
+    def log_message(self, format: str, *args) -> None:
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def send_json(self, status: int, data: Any, headers: dict[str, str] | None = None) -> None:
+        body = json.dumps(data).encode("utf-8") + b"\n"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status: int, message: str) -> None:
+        self.send_json(status, {"error": message})
+
+    def do_GET(self) -> None:
+        self.server.metrics.count("requests")
+        if self.path == "/templates":
+            self.send_json(HTTPStatus.OK, {"templates": sorted(self.server.scaffolders)})
+        elif self.path == "/metrics":
+            self.send_json(HTTPStatus.OK, self.server.metrics.snapshot())
+        else:
+            self.send_error_json(HTTPStatus.NOT_FOUND, f"No such endpoint: {self.path}.")
+
+    def do_POST(self) -> None:
+        self.server.metrics.count("requests")
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0 or length > MAX_REQUEST_BYTES:
+            self.close_connection = True
+            self.send_error_json(HTTPStatus.BAD_REQUEST, "Invalid or too large request body.")
+            return
+        body = self.rfile.read(length)
+        prefix = "/scaffold/"
+        if not self.path.startswith(prefix):
+            self.send_error_json(HTTPStatus.NOT_FOUND, f"No such endpoint: {self.path}.")
+            return
+        template_name = unquote(self.path[len(prefix):])
+        scaffolder = self.server.scaffolders.get(template_name)
+        if scaffolder is None:
+            self.send_error_json(HTTPStatus.NOT_FOUND, f"Template '{template_name}' is not served.")
+            return
+        try:
+            request = json.loads(body or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("The request body must be a JSON object.")
+            project_name = request.get("project_name")
+            if not project_name or not isinstance(project_name, str):
+                raise ValueError("Missing 'project_name' field.")
+            variables = request.get("variables") or {}
+            if not isinstance(variables, dict):
+                raise ValueError("The 'variables' field must be an object.")
+            format = request.get("format") or self.server.default_format
+            if format not in ARCHIVE_FORMATS:
+                raise ValueError(f"Format '{format}' does not exist. Use one of: {', '.join(ARCHIVE_FORMATS)}.")
+        except ValueError as e:
+            self.send_error_json(HTTPStatus.BAD_REQUEST, str(e))
+            return
+
+        if not self.server.slots.acquire(timeout=self.server.queue_timeout):
+            self.server.metrics.count("rejected")
+            self.send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Too many concurrent requests."}, {"Retry-After": "1"})
+            return
+        try:
+            self._scaffold(scaffolder, project_name, variables, format, bool(request.get("no_project_dir")))
+        finally:
+            self.server.slots.release()
+
+    def _scaffold(self, scaffolder: Scaffolder, project_name: str, variables: dict[str, Any], format: str, no_project_dir: bool) -> None:
+        content_type, suffix = ARCHIVE_FORMATS[format]
+        response = _ChunkedResponse(self, content_type, sanitize_project_name(project_name) + suffix)
+        metrics = self.server.metrics
+        metrics.start()
+        started = time.perf_counter()
+        try:
+            scaffolder.scaffold(
+                project_name,
+                variables,
+                "-",
+                no_project_dir=no_project_dir,
+                output_format=format,
+                output_stream=response,
+            )
+        except Exception as e:
+            metrics.finish(scaffolder.template_name, time.perf_counter() - started, response.bytes_sent, ok=False)
+            if response.started:
+                # The archive is left truncated and unterminated; the client sees a broken body.
+                self.log_error("Scaffold of '%s' failed mid-stream: %s", project_name, e)
+                self.close_connection = True
+                return
+            status = HTTPStatus.BAD_REQUEST if isinstance(e, (ValueError, KeyError, TypeError)) else HTTPStatus.INTERNAL_SERVER_ERROR
+            self.send_error_json(status, f"{type(e).__name__}: {e}")
+            return
+        metrics.finish(scaffolder.template_name, time.perf_counter() - started, response.bytes_sent, ok=True)
+        response.finish()
+
+
+class ScaffoldServer(ThreadingHTTPServer):
+    """
+    A long-running HTTP server that scaffolds projects from preloaded templates, with a
+    `Scaffolder` per template that every request for it reuses. Each request runs on
+    its own thread, and at most `max_concurrency` scaffolds run at once; requests wait
+    up to `queue_timeout` seconds for a slot before being turned away with a 503.
+    """
+
+    daemon_threads = True
+
+    def __init__(self,
+                 address: tuple[str, int],
+                 scaffolders: dict[str, Scaffolder],
+                 max_concurrency: int = 4,
+                 queue_timeout: float = 0.0,
+                 default_format: str = DEFAULT_FORMAT,
+                 quiet: bool = False,
+                 ):
+        super().__init__(address, ScaffoldRequestHandler)
+        self.scaffolders = scaffolders
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.queue_timeout = queue_timeout
+        self.default_format = default_format
+        self.metrics = ServerMetrics()
+        self.quiet = quiet
+
+
+def load_served_templates(template_names: Iterable[str] | None = None,
+                          templates: Iterable[BaseTemplate] = (),
+                          warm: bool = True,
+                          ) -> dict[str, Scaffolder]:
+    """
+    Loads the templates to serve, by name from the template registry (every registered
+    template when no names and no `templates` are given) and from already loaded
+    `templates`, and returns a `Scaffolder` for each, by template name. Each one's
+    compiled templates are warmed unless `warm` is False.
+    """
+    templates = list(templates)
+    if template_names is None and not templates:
+        template_names = available_templates()
+    served = {name: get_template(name) for name in template_names or ()}
+    served.update((template.template_name, template) for template in templates)
+    return {name: Scaffolder(template, warm=warm) for name, template in served.items()}
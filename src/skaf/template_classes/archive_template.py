@@ -0,0 +1,285 @@
+import posixpath
+import stat
+import tarfile
+import threading
+import zipfile
+from contextlib import ExitStack, contextmanager
+from pathlib import Path, PurePosixPath
+from typing import Any, Callable, Generator
+
+from .base import BaseTemplate
+from .document import TemplateDocument
+from .helpers import variables_helper_from_source
+
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.zst", ".tar.zstd", ".tzst")
+
+# Compression of each tar suffix, or None for uncompressed tarballs.
+_tar_compression = {
+    ".tar": None,
+    ".tar.gz": "gz",
+    ".tgz": "gz",
+    ".tar.zst": "zst",
+    ".tar.zstd": "zst",
+    ".tzst": "zst",
+}
+
+
+def archive_suffix(path: str | Path) -> str | None:
+    """
+    Returns the archive suffix of `path` (such as `.tar.gz`), or None if `path` does
+    not name a supported template archive.
+    """
+    name = str(path).lower()
+    matches = [suffix for suffix in ARCHIVE_SUFFIXES if name.endswith(suffix)]
+    return max(matches, key=len) if matches else None
+
+
+def is_archive(path: str | Path) -> bool:
+    return archive_suffix(path) is not None
+
+
+def archive_template_name(path: str | Path) -> str:
+    """
+    Returns the name of the template held by an archive: its filename without the
+    archive suffix.
+    """
+    name = Path(path).name
+    suffix = archive_suffix(name)
+    return name[:-len(suffix)] if suffix else name
+
+
+def _open_zstd(file) -> Any:
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "Reading '.tar.zst' templates requires the 'zstandard' package. "
+            "Install it with 'pip install skaf[zstd]'."
+        ) from None
+    return zstandard.ZstdDecompressor().stream_reader(file)
+
+
+class ArchiveTemplate(BaseTemplate):
+    """
+    A template read straight from a `.zip` or `.tar[.gz|.zst]` archive, without
+    extracting it. The archive holds the usual template directory layout
+    (`template_properties.yaml`, an optional `variables_helper.py` and a `template/`
+    tree), either at its root or under a single top-level directory.
+
+    Zip archives and uncompressed tarballs are read with random access: documents are
+    enumerated from the central directory or the tar headers, and each file is read
+    only when it is needed. Compressed tarballs cannot be seeked cheaply, so they are
+    decompressed in a single pass per enumeration, reading each file as it is reached.
+
+    Archives holding absolute or `..` member names, or symlinks that point outside the
+    template, are refused. Zip archives and uncompressed tarballs are checked when they
+    are opened; compressed tarballs as each member is reached. The open archive is
+    released by `close`, or by using the template as a context manager.
+    """
+
+    template_properties_filename = 'template_properties.yaml'
+    variables_helper_filename = 'variables_helper.py'
+
+    def __init__(self, template_name: str | None, archive_path: str | Path):
+        self.archive_path = Path(archive_path)
+        suffix = archive_suffix(self.archive_path)
+        if suffix is None:
+            raise ValueError(f"'{self.archive_path}' is not a supported template archive. "
+                             f"Use one of: {', '.join(ARCHIVE_SUFFIXES)}.")
+        self.is_zip = suffix == ".zip"
+        self.compression = None if self.is_zip else _tar_compression[suffix]
+        self._lock = threading.Lock()
+        self._zip: zipfile.ZipFile | None = None
+        self._tar: tarfile.TarFile | None = None
+        try:
+            if self.is_zip:
+                self._zip = zipfile.ZipFile(self.archive_path)
+                names = self._zip.namelist()
+            elif self.compression is None:
+                self._tar = tarfile.open(self.archive_path, mode="r:")
+                self._members = {_normalize(member.name): member for member in self._tar.getmembers()}
+                names = list(self._members)
+            else:
+                names = None
+            properties_source, helper_source = self._read_root_files(names)
+            if names is not None:
+                # Checks every member name and symlink before anything is scaffolded.
+                for _ in self.iter_documents():
+                    pass
+            import yaml
+            self._init(template_name or archive_template_name(self.archive_path), yaml.safe_load(properties_source))
+            if helper_source is not None:
+                filename = f"{self.archive_path}:{self._root}{self.variables_helper_filename}"
+                self.variables_helper: Callable[[dict], dict] = variables_helper_from_source(helper_source, filename)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """
+        Closes the archive held open for random access, if any.
+        """
+        if self._zip is not None:
+            self._zip.close()
+        if self._tar is not None:
+            self._tar.close()
+
+    def __enter__(self) -> "ArchiveTemplate":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _read_root_files(self, names: list[str] | None) -> tuple[str, str | None]:
+        """
+        Locates the template root in the archive and returns the sources of its
+        properties file and variables helper (or None if it has no helper).
+        """
+        if names is not None:
+            self._root = self._find_root(names)
+            properties = self._read_member(self._root + self.template_properties_filename)
+            helper_name = self._root + self.variables_helper_filename
+            helper = self._read_member(helper_name) if helper_name in self._names(names) else None
+            return properties.decode("utf-8"), None if helper is None else helper.decode("utf-8")
+        # A compressed tarball is scanned until both files are found, or to its end.
+        found: dict[str, bytes] = {}
+        with self._stream() as archive:
+            for member in archive:
+                name = _normalize(member.name)
+                if PurePosixPath(name).name in (self.template_properties_filename, self.variables_helper_filename) and member.isfile():
+                    found[name] = archive.extractfile(member).read()
+                    root = self._find_root(found, required=False)
+                    if root is not None and root + self.variables_helper_filename in found:
+                        break
+        self._root = self._find_root(found)
+        helper = found.get(self._root + self.variables_helper_filename)
+        properties = found[self._root + self.template_properties_filename]
+        return properties.decode("utf-8"), None if helper is None else helper.decode("utf-8")
+
+    @staticmethod
+    def _names(names) -> set[str]:
+        return {_normalize(name) for name in names}
+
+    def _find_root(self, names, required: bool = True) -> str | None:
+        """
+        Returns the archive path prefix of the template: "" when the properties file is at
+        the root of the archive, or "<dir>/" when it is under a single top-level directory.
+        """
+        names = self._names(names)
+        if self.template_properties_filename in names:
+            return ""
+        roots = sorted(
+            name[:-len(self.template_properties_filename)]
+            for name in names
+            if name.endswith("/" + self.template_properties_filename) and name.count("/") == 1
+        )
+        if len(roots) == 1:
+            return roots[0]
+        if not required:
+            return None
+        if roots:
+            raise ValueError(f"Archive '{self.archive_path}' holds several templates: {', '.join(roots)}.")
+        raise FileNotFoundError(f"Template properties file '{self.template_properties_filename}' does not exist in '{self.archive_path}'.")
+
+    def _read_member(self, name: str) -> bytes:
+        if self._zip is not None:
+            return self._zip.read(self._zip_info(name))
+        with self._lock:
+            return self._tar.extractfile(self._members[name]).read()
+
+    def _zip_info(self, name: str) -> zipfile.ZipInfo:
+        try:
+            return self._zip.getinfo(name)
+        except KeyError:
+            return self._zip.getinfo("./" + name)
+
+    @contextmanager
+    def _stream(self) -> Generator[tarfile.TarFile, None, None]:
+        with ExitStack() as stack:
+            file = stack.enter_context(open(self.archive_path, "rb"))
+            if self.compression == "zst":
+                file = stack.enter_context(_open_zstd(file))
+                yield stack.enter_context(tarfile.open(fileobj=file, mode="r|"))
+            else:
+                yield stack.enter_context(tarfile.open(fileobj=file, mode=f"r|{self.compression}"))
+
+    def _relpath(self, name: str) -> str | None:
+        if name.startswith("/") or ".." in PurePosixPath(name).parts:
+            raise ValueError(f"Archive '{self.archive_path}' member '{name}' points outside the template.")
+        prefix = self._root + "template/"
+        name = _normalize(name)
+        if not name.startswith(prefix) or name == prefix:
+            return None
+        return name[len(prefix):]
+
+    def _link(self, relpath: str, link_target: str) -> TemplateDocument:
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(relpath), link_target))
+        if link_target.startswith("/") or target == ".." or target.startswith("../"):
+            raise ValueError(f"Archive '{self.archive_path}' symlink '{relpath}' -> '{link_target}' "
+                             f"points outside the template.")
+        return TemplateDocument(relpath, link_target=link_target)
+
+    def iter_documents(self) -> Generator[TemplateDocument, None, None]:
+        """
+        Yields a `TemplateDocument` for each file and symlink under the archive's
+        `template/` directory. Zip and uncompressed tar members are read lazily; members
+        of compressed tarballs are read as the decompression stream reaches them.
+        """
+        if self._zip is not None:
+            yield from self._iter_zip_documents()
+        elif self._tar is not None:
+            yield from self._iter_tar_documents()
+        else:
+            yield from self._iter_stream_documents()
+
+    def _iter_zip_documents(self) -> Generator[TemplateDocument, None, None]:
+        for info in self._zip.infolist():
+            relpath = self._relpath(info.filename)
+            if relpath is None or info.is_dir():
+                continue
+            unix_mode = info.external_attr >> 16
+            mode = unix_mode & 0o7777 or None
+            if stat.S_ISLNK(unix_mode):
+                yield self._link(relpath, self._zip.read(info).decode("utf-8"))
+            else:
+                yield TemplateDocument(relpath, loader=lambda i=info: self._zip.read(i), mode=mode)
+
+    def _iter_tar_documents(self) -> Generator[TemplateDocument, None, None]:
+        for name, member in self._members.items():
+            relpath = self._relpath(name)
+            if relpath is None:
+                continue
+            if member.issym():
+                yield self._link(relpath, member.linkname)
+            elif member.isfile() or member.islnk():
+                yield TemplateDocument(relpath, loader=lambda n=name: self._read_member(n), mode=member.mode & 0o7777)
+
+    def _iter_stream_documents(self) -> Generator[TemplateDocument, None, None]:
+        with self._stream() as archive:
+            for member in archive:
+                relpath = self._relpath(member.name)
+                if relpath is None:
+                    continue
+                if member.issym():
+                    yield self._link(relpath, member.linkname)
+                elif member.isfile():
+                    # The stream moves on once the next member is requested, so the
+                    # content is read now.
+                    content = archive.extractfile(member).read()
+                    yield TemplateDocument(relpath, content=content, mode=member.mode & 0o7777)
+
+    def documents(self) -> Generator[tuple[str, str], None, None]:
+        """
+        Yields tuples of (relpath, content) for each document in the template.
+        """
+        for document in self.iter_documents():
+            if document.link_target is not None:
+                continue
+            yield document.relpath, document.read_text()
+
+
+def _normalize(name: str) -> str:
+    while name.startswith("./"):
+        name = name[2:]
+    return name
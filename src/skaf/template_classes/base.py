@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from typing import Generator, Callable
 
 from ..properties import TemplateProperties
+from .document import TemplateDocument
 
 
 class ABCTemplate(ABC):
@@ -17,6 +18,14 @@ class ABCTemplate(ABC):
         """
         raise NotImplementedError("Subclasses must implement this method.")
 
+    def iter_documents(self) -> Generator[TemplateDocument, None, None]:
+        """
+        Yields a `TemplateDocument` for each document in the template.
+        Subclasses that can defer reading file content should override this method.
+        """
+        for relpath, content in self.documents():
+            yield TemplateDocument(relpath, content=content)
+
 
 class BaseTemplate(ABCTemplate):
 
@@ -0,0 +1,83 @@
+from pathlib import Path
+from typing import Callable
+
+
+class TemplateDocument:
+    """
+    A single file of a template. Content is only read when `read_text` or `read_bytes`
+    is called, so documents can be enumerated without holding the template in memory.
+
+    Documents that are not backed by a file `path` may carry a permission `mode` and,
+    for symlinks, a `link_target`; file-backed documents take both from the file itself.
+    A `digest`, when the template already knows it, is the hash of the document's bytes
+    as recorded in project manifests. It may also be given as a function, which is only
+    called the first time the digest is asked for.
+    """
+
+    __slots__ = ("relpath", "path", "mode", "link_target", "_digest", "_content", "_loader")
+
+    def __init__(self,
+                 relpath: str,
+                 content: str | bytes | None = None,
+                 path: str | Path | None = None,
+                 loader: Callable[[], str | bytes] | None = None,
+                 mode: int | None = None,
+                 link_target: str | None = None,
+                 digest: str | Callable[[], str | None] | None = None,
+                 ):
+        self.relpath = relpath
+        self.path = Path(path) if path is not None else None
+        self.mode = mode
+        self.link_target = link_target
+        self._digest = digest
+        self._content = content
+        self._loader = loader
+
+    @property
+    def digest(self) -> str | None:
+        if callable(self._digest):
+            self._digest = self._digest()
+        return self._digest
+
+    @digest.setter
+    def digest(self, digest: str | None) -> None:
+        self._digest = digest
+
+    def _load(self) -> str | bytes:
+        if self._content is not None:
+            return self._content
+        if self._loader is not None:
+            return self._loader()
+        if self.path is not None:
+            with open(self.path, 'rb') as file:
+                return file.read()
+        raise ValueError(f"Template document '{self.relpath}' has no content source.")
+
+    def size(self) -> int | None:
+        """
+        Returns the size of the document's content without reading it, or None when it is
+        only known after loading. For in-memory text this is the number of characters.
+        """
+        if self._content is not None:
+            return len(self._content)
+        if self._loader is None and self.path is not None:
+            return self.path.stat().st_size
+        return None
+
+    def read_bytes(self) -> bytes:
+        content = self._load()
+        if isinstance(content, str):
+            return content.encode('utf-8')
+        return content
+
+    def read_text(self) -> str:
+        if self._content is None and self._loader is None and self.path is not None:
+            with open(self.path, 'r') as file:
+                return file.read()
+        content = self._load()
+        if isinstance(content, bytes):
+            return content.decode('utf-8')
+        return content
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.relpath!r})"
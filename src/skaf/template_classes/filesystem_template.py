@@ -1,13 +1,24 @@
 from typing import Generator
 import os
-import yaml
+from functools import partial
 from pathlib import Path
 from typing import Callable
 
+from ..cache import cache_enabled
 from .base import BaseTemplate, TemplateProperties
+from .document import TemplateDocument
+from .helpers import compile_variables_helper, helper_key, variables_helper_from_code
+from .template_index import Stamp, TemplateIndex, file_stamp
 
 
 class FilesystemTemplate(BaseTemplate):
+    """
+    A template read from a directory. Unless `use_index` is False (or caching is
+    disabled), the parsed properties, the compiled variables helper and the file list
+    with content hashes are kept in a `TemplateIndex` in the user cache, so an unchanged
+    template is loaded from stat data alone. Files are hashed the first time their
+    digest is needed, and only again once they change.
+    """
 
     template_properties_filename = 'template_properties.yaml'
     variables_helper_filename = 'variables_helper.py'
@@ -15,48 +26,87 @@ class FilesystemTemplate(BaseTemplate):
     def __init__(self,
                  template_name: str,
                  template_dir: str,
+                 use_index: bool | None = None,
                  ):
         self.template_dir = template_dir
+        if use_index is None:
+            use_index = cache_enabled()
+        self._index = TemplateIndex(template_dir) if use_index else None
         self.properties = self._load_properties()
         self.variables_helper: Callable[[dict], dict] = self._load_variables_helper()
         self.template_name = template_name
 
     def _load_properties(self) -> TemplateProperties:
         properties_filename = Path(self.template_dir) / Path(self.template_properties_filename)
-        if not os.path.exists(properties_filename):
+        stamp = file_stamp(properties_filename)
+        if stamp is None:
             raise FileNotFoundError(f"Template properties file '{properties_filename}' does not exist.")
+        if self._index is not None and (properties := self._index.lookup("properties", stamp)) is not None:
+            return properties
+        import yaml
         with open(properties_filename, 'r') as file:
             properties = yaml.safe_load(file)
         properties = properties or {}
+        if self._index is not None:
+            self._index.store("properties", stamp, properties)
         return properties
 
     def _load_variables_helper(self) -> Callable:
         variables_helper_filename = Path(self.template_dir) / Path(self.variables_helper_filename)
-        if not os.path.exists(variables_helper_filename):
+        stamp = file_stamp(variables_helper_filename)
+        if stamp is None:
             return lambda d: d
+        if self._index is not None and (cached := self._index.lookup("variables_helper", stamp)) is not None:
+            key, code = cached
+            return variables_helper_from_code(code, variables_helper_filename, key)
         with open(variables_helper_filename, 'r') as file:
-            code = file.read()
-        exec_globals = {}
-        exec(code, exec_globals)
-        variables_helper = exec_globals.get('variables_helper')
-        if not callable(variables_helper):
-            raise ValueError(f"Variables helper in '{variables_helper_filename}' is not callable.")
-        return variables_helper
+            source = file.read()
+        key = helper_key(source, str(variables_helper_filename))
+        code = compile_variables_helper(source, variables_helper_filename)
+        if self._index is not None:
+            self._index.store("variables_helper", stamp, (key, code))
+        return variables_helper_from_code(code, variables_helper_filename, key)
 
-
-    def documents(self) -> Generator[tuple[str, str], None, None]:
+    def iter_documents(self) -> Generator[TemplateDocument, None, None]:
         """
-        Yields tuples of (relpath, content) for each document in the template.
+        Yields a `TemplateDocument` for each file in the template without reading its content.
         """
         template_root = Path(self.template_dir) / "template"
         if not os.path.exists(template_root):
             raise FileNotFoundError(f"Template root directory '{template_root}' does not exist.")
+        if self._index is not None:
+            for relpath, stamp in self._index.documents(str(template_root)):
+                path = template_root / relpath
+                yield TemplateDocument(relpath, path=path, digest=partial(self._digest, relpath, path, stamp))
+            return
         for root, dirs, files in os.walk(template_root):
             rel_root = Path(root).relative_to(template_root)
-            for name in files:
+            # Symlinked directories are not descended into; they are reproduced as symlinks.
+            linked_dirs = [name for name in dirs if os.path.islink(os.path.join(root, name))]
+            for name in files + linked_dirs:
                 rel_path_template = rel_root / name
-                abs_path_template = template_root / rel_path_template
-                with open(abs_path_template, 'r') as file:
-                    content = file.read()
-                yield str(rel_path_template), content
-                
+                yield TemplateDocument(str(rel_path_template), path=template_root / rel_path_template)
+
+    def _digest(self, relpath: str, path: Path, stamp: Stamp) -> str | None:
+        digest = self._index.digest(relpath, stamp)
+        if digest is None:
+            digest = _file_hash(path)
+            # A file changed while it was hashed is hashed again next time.
+            if digest is not None and file_stamp(path) == stamp:
+                self._index.store_digest(relpath, stamp, digest)
+        return digest
+
+    def documents(self) -> Generator[tuple[str, str], None, None]:
+        """
+        Yields tuples of (relpath, content) for each document in the template.
+        """
+        for document in self.iter_documents():
+            if document.path.is_dir():
+                continue
+            yield document.relpath, document.read_text()
+
+
+def _file_hash(path: Path) -> str | None:
+    # Imported here: the manifest module imports the scaffold package, which imports this one.
+    from ..scaffold.manifest import file_hash
+    return file_hash(path)
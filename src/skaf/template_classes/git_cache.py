@@ -0,0 +1,190 @@
+import os
+import re
+import shutil
+import tarfile
+import tempfile
+from contextlib import contextmanager
+from hashlib import sha256
+from pathlib import Path
+from typing import Generator
+
+from git import GitCommandError, Repo
+
+from ..cache import cache_subdir
+
+
+GIT_CACHE_NAME = "git"
+_SHA_PATTERN = re.compile(r"^[0-9a-f]{40}$")
+_SCHEME_PATTERN = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*://")
+
+
+class GitCacheError(Exception):
+    """
+    Exception raised when a git template cannot be resolved from the clone cache.
+    """
+    pass
+
+
+def split_git_ref(git_uri: str) -> tuple[str, str | None]:
+    """
+    Splits an optional trailing `@ref` from a git URI, e.g. `https://host/repo.git@v1.2`.
+    The user part of SSH URIs such as `git@host:repo.git` is not mistaken for a ref.
+    """
+    head, sep, ref = git_uri.rpartition("@")
+    if not sep or not ref or ":" in ref:
+        return git_uri, None
+    location = _SCHEME_PATTERN.sub("", head)
+    if "/" not in location and ":" not in location:
+        return git_uri, None
+    return head, ref
+
+
+@contextmanager
+def _locked(lock_path: Path) -> Generator[None, None, None]:
+    """
+    Holds an exclusive advisory lock on `lock_path` where the platform supports it.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class GitMirrorCache:
+    """
+    A persistent cache of bare git mirrors and of template trees extracted from them.
+
+    Mirrors are keyed by URI and fetched incrementally. Extracted trees are keyed by
+    commit SHA and are immutable, so a SHA that has been seen before is served straight
+    from disk without touching the mirror or the remote.
+    """
+
+    def __init__(self, root: Path = None):
+        self.root = Path(root) if root is not None else cache_subdir(GIT_CACHE_NAME)
+
+    def mirror_path(self, git_uri: str) -> Path:
+        digest = sha256(git_uri.encode("utf-8")).hexdigest()[:16]
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", Path(git_uri.rstrip("/")).name.removesuffix(".git"))[:64]
+        return self.root / "mirrors" / f"{name}-{digest}.git"
+
+    def tree_path(self, sha: str) -> Path:
+        return self.root / "trees" / sha
+
+    def mirror(self, git_uri: str, offline: bool = False, partial: bool = False) -> Repo:
+        """
+        Returns the bare mirror of `git_uri`, cloning it on first use and fetching new
+        objects otherwise. In offline mode the remote is never contacted. A `partial`
+        mirror is cloned with `--filter=blob:none`, so file contents are only fetched
+        when they are read; an existing full mirror is reused as-is.
+        """
+        path = self.mirror_path(git_uri)
+        with _locked(path.with_suffix(".lock")):
+            if path.exists():
+                repo = self._open(path, offline)
+                if not offline:
+                    repo.git.fetch("origin", "--prune")
+                    self._update_head(repo)
+                return repo
+            if offline:
+                raise GitCacheError(f"No cached mirror of '{git_uri}' is available in offline mode.")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = Path(tempfile.mkdtemp(dir=path.parent, prefix=".clone-"))
+            try:
+                if partial:
+                    Repo.clone_from(git_uri, tmp_path, mirror=True, filter="blob:none")
+                else:
+                    Repo.clone_from(git_uri, tmp_path, mirror=True)
+                os.rename(tmp_path, path)
+            finally:
+                shutil.rmtree(tmp_path, ignore_errors=True)
+            return self._open(path, offline)
+
+    def open_mirror(self, git_uri: str, offline: bool = False) -> Repo:
+        """
+        Returns the existing mirror of `git_uri` without fetching. In offline mode, git
+        is kept from fetching the blobs a partial mirror lacks, so reading one of them
+        fails instead of contacting the remote.
+        """
+        path = self.mirror_path(git_uri)
+        if not path.exists():
+            raise GitCacheError(f"No cached mirror of '{git_uri}' is available.")
+        return self._open(path, offline)
+
+    @staticmethod
+    def _open(path: Path, offline: bool) -> Repo:
+        repo = Repo(path)
+        if offline:
+            repo.git.update_environment(GIT_NO_LAZY_FETCH="1")
+        return repo
+
+    @staticmethod
+    def _update_head(repo: Repo) -> None:
+        """
+        Points the mirror's HEAD at the remote's default branch, which `git fetch`
+        leaves as it was at clone time.
+        """
+        for line in repo.git.ls_remote("--symref", "origin", "HEAD").splitlines():
+            if line.startswith("ref: ") and line.endswith("\tHEAD"):
+                head = line[len("ref: "):-len("\tHEAD")]
+                if repo.git.symbolic_ref("HEAD") != head:
+                    repo.git.symbolic_ref("HEAD", head)
+                return
+
+    def resolve(self, git_uri: str, ref: str | None = None, offline: bool = False, partial: bool = False) -> str:
+        """
+        Resolves `ref` (default: the remote HEAD) of `git_uri` to a commit SHA.
+        """
+        if ref and _SHA_PATTERN.match(ref) and self.tree_path(ref).is_dir():
+            return ref
+        repo = self.mirror(git_uri, offline=offline, partial=partial)
+        try:
+            return repo.commit(ref or "HEAD").hexsha
+        except Exception as e:
+            etype = type(e).__name__
+            raise GitCacheError(f"Cannot resolve '{ref or 'HEAD'}' in '{git_uri}': {etype}: {e}")
+
+    def checkout(self, git_uri: str, ref: str | None = None, offline: bool = False) -> Path:
+        """
+        Returns a directory holding the tree of `git_uri` at `ref`, extracting it from
+        the mirror if this commit has not been seen before.
+        """
+        sha = self.resolve(git_uri, ref, offline=offline)
+        tree_path = self.tree_path(sha)
+        if tree_path.is_dir():
+            return tree_path
+        repo = self.open_mirror(git_uri, offline=offline)
+        tree_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = Path(tempfile.mkdtemp(dir=tree_path.parent, prefix=".extract-"))
+        try:
+            with tempfile.TemporaryFile() as archive:
+                try:
+                    repo.archive(archive, treeish=sha, format="tar")
+                except GitCommandError as e:
+                    if offline:
+                        raise GitCacheError(
+                            f"The cached mirror of '{git_uri}' lacks file contents of commit {sha}, "
+                            f"which cannot be fetched in offline mode."
+                        ) from e
+                    raise
+                archive.seek(0)
+                with tarfile.open(fileobj=archive) as tar:
+                    if hasattr(tarfile, "data_filter"):
+                        tar.extractall(tmp_path, filter="data")
+                    else:
+                        tar.extractall(tmp_path)
+            try:
+                os.rename(tmp_path, tree_path)
+            except OSError:
+                if not tree_path.is_dir():
+                    raise
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        return tree_path
@@ -1,24 +1,84 @@
 import os
-import yaml
+import stat
+import threading
 from pathlib import Path
 from git import Repo
 import tempfile
 from typing import Generator, Callable
 
 from .base import BaseTemplate, TemplateProperties
+from .document import TemplateDocument
+from .helpers import variables_helper_from_source
+from .filesystem_template import FilesystemTemplate
+from .git_cache import GitCacheError, GitMirrorCache, split_git_ref
+from ..cache import cache_enabled
 
 
 class GitTemplate(BaseTemplate):
     template_properties_filename = 'template_properties.yaml'
     variables_helper_filename = 'variables_helper.py'
 
-    def __init__(self, template_name: str, git_repo_path: str):
+    def __init__(self,
+                 template_name: str,
+                 git_repo_path: str,
+                 ref: str | None = None,
+                 offline: bool = False,
+                 use_cache: bool | None = None,
+                 checkout: bool = True,
+                 ):
+        """
+        Loads a template from a git repository. `git_repo_path` may carry a trailing
+        `@ref` (branch, tag or commit), which is used unless `ref` is given explicitly.
+
+        Unless caching is disabled, the repository is mirrored in the user cache
+        directory, fetched incrementally, and each commit's tree is extracted once and
+        reused. In `offline` mode, only the cache is consulted.
+
+        With `checkout=False`, no tree is written to disk: the template is read straight
+        from the commit's tree objects, fetching blob contents only as `documents()`
+        reaches them. New mirrors and clones are then made with `--filter=blob:none`.
+        """
         self.template_name = template_name
         self._documents = {}
-        
+        self._tree_template: FilesystemTemplate | None = None
+        self._template_tree = None
+        self._clone_dir: tempfile.TemporaryDirectory | None = None
+        self._git_uri = git_repo_path
+        self._offline = offline
+        # GitPython reads objects through one long-running `git cat-file` process per
+        # repository, which concurrent renders must not use at the same time.
+        self._object_lock = threading.Lock()
+        git_repo_path, uri_ref = split_git_ref(git_repo_path)
+        ref = ref or uri_ref
+        if use_cache is None:
+            use_cache = cache_enabled()
+        if offline and not use_cache:
+            raise ValueError("Offline mode requires the git clone cache, which is disabled.")
+
+        if not checkout:
+            if use_cache:
+                cache = GitMirrorCache()
+                sha = cache.resolve(git_repo_path, ref, offline=offline, partial=True)
+                repo = cache.open_mirror(git_repo_path, offline=offline)
+            else:
+                self._clone_dir = tempfile.TemporaryDirectory()
+                repo = Repo.clone_from(git_repo_path, self._clone_dir.name, bare=True, filter="blob:none")
+                sha = repo.commit(ref or "HEAD").hexsha
+            self._load_from_objects(repo, sha)
+            return
+
+        if use_cache:
+            tree_dir = GitMirrorCache().checkout(git_repo_path, ref, offline=offline)
+            self._tree_template = FilesystemTemplate(template_name, tree_dir)
+            self.properties = self._tree_template.properties
+            self.variables_helper: Callable[[dict], dict] = self._tree_template.variables_helper
+            return
+
         # Use TemporaryDirectory as a context manager
         with tempfile.TemporaryDirectory() as temp_dir:
-            Repo.clone_from(git_repo_path, temp_dir)
+            repo = Repo.clone_from(git_repo_path, temp_dir)
+            if ref:
+                repo.git.checkout(ref)
             self.properties = self._load_properties(temp_dir)
             self.variables_helper: Callable[[dict], dict] = self._load_variables_helper(temp_dir)
             self._load_documents(temp_dir)
@@ -27,6 +87,7 @@ class GitTemplate(BaseTemplate):
         properties_filename = Path(temp_dir) / self.template_properties_filename
         if not os.path.exists(properties_filename):
             raise FileNotFoundError(f"Template properties file '{properties_filename}' does not exist.")
+        import yaml
         with open(properties_filename, 'r') as file:
             properties = yaml.safe_load(file)
         return properties or {}
@@ -37,12 +98,7 @@ class GitTemplate(BaseTemplate):
             return lambda d: d
         with open(variables_helper_filename, 'r') as file:
             code = file.read()
-        exec_globals = {}
-        exec(code, exec_globals)
-        variables_helper = exec_globals.get('variables_helper')
-        if not callable(variables_helper):
-            raise ValueError(f"Variables helper in '{variables_helper_filename}' is not callable.")
-        return variables_helper
+        return variables_helper_from_source(code, variables_helper_filename)
 
     def _load_documents(self, temp_dir: str):
         template_root = Path(temp_dir) / "template"
@@ -53,13 +109,85 @@ class GitTemplate(BaseTemplate):
             for name in files:
                 rel_path_template = rel_root / name
                 abs_path_template = template_root / rel_path_template
-                with open(abs_path_template, 'r') as file:
+                with open(abs_path_template, 'rb') as file:
                     content = file.read()
                 self._documents[str(rel_path_template)] = content
 
+    def _load_from_objects(self, repo: Repo, sha: str):
+        """
+        Reads the template properties and variables helper from the tree of commit `sha`
+        and keeps the `template/` tree object for lazy iteration.
+        """
+        tree = repo.commit(sha).tree
+        try:
+            properties_blob = tree / self.template_properties_filename
+        except KeyError:
+            raise FileNotFoundError(f"Template properties file '{self.template_properties_filename}' does not exist in commit {sha}.")
+        import yaml
+        self.properties = yaml.safe_load(self._read_blob(properties_blob)) or {}
+        self.variables_helper = lambda d: d
+        try:
+            helper_blob = tree / self.variables_helper_filename
+        except KeyError:
+            helper_blob = None
+        if helper_blob is not None:
+            code = self._read_blob(helper_blob).decode('utf-8')
+            self.variables_helper = variables_helper_from_source(code, f"{sha}:{self.variables_helper_filename}")
+        try:
+            self._template_tree = tree / "template"
+        except KeyError:
+            raise FileNotFoundError(f"Template root directory 'template' does not exist in commit {sha}.")
+
+    def _read_blob(self, blob) -> bytes:
+        try:
+            with self._object_lock:
+                return blob.data_stream.read()
+        except Exception as e:
+            if not self._offline:
+                raise
+            raise GitCacheError(
+                f"'{blob.path}' is not in the cached mirror of '{self._git_uri}', and its contents "
+                f"cannot be fetched in offline mode."
+            ) from e
+
+    def _iter_object_documents(self) -> Generator[TemplateDocument, None, None]:
+        prefix_length = len(self._template_tree.path) + 1
+        for item in self._template_tree.traverse():
+            if item.type != 'blob':
+                continue
+            relpath = item.path[prefix_length:]
+            if stat.S_ISLNK(item.mode):
+                yield TemplateDocument(relpath, link_target=self._read_blob(item).decode('utf-8'))
+                continue
+            yield TemplateDocument(
+                relpath,
+                loader=lambda blob=item: self._read_blob(blob),
+                mode=stat.S_IMODE(item.mode),
+            )
+
+    def iter_documents(self) -> Generator[TemplateDocument, None, None]:
+        """
+        Yields a `TemplateDocument` for each document: backed by the cached tree when
+        the clone cache is used, reading blobs lazily in checkout-free mode, and holding
+        the raw bytes of each stored document otherwise.
+        """
+        if self._template_tree is not None:
+            yield from self._iter_object_documents()
+            return
+        if self._tree_template is not None:
+            yield from self._tree_template.iter_documents()
+            return
+        for relpath, content in self._documents.items():
+            yield TemplateDocument(relpath, content=content)
+
     def documents(self) -> Generator[tuple[str, str], None, None]:
         """
         Yields stored (relpath, content) tuples from the document dictionary.
         """
-        for relpath, content in self._documents.items():
-            yield relpath, content
+        if self._tree_template is not None:
+            yield from self._tree_template.documents()
+            return
+        for document in self.iter_documents():
+            if document.link_target is not None:
+                continue
+            yield document.relpath, document.read_text()
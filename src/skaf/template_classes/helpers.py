@@ -0,0 +1,132 @@
+import marshal
+import os
+import sys
+import tempfile
+import threading
+from hashlib import sha256
+from types import CodeType, ModuleType
+from typing import Callable
+
+from ..cache import cache_enabled, cache_subdir
+
+
+HELPER_CACHE_NAME = "helpers"
+# Helpers are loaded as modules named after their key, in `sys.modules`.
+HELPER_MODULE_PREFIX = "skaf_variables_helper_"
+
+_modules_lock = threading.Lock()
+
+
+def helper_key(code: str, filename: str) -> str:
+    """
+    Returns the key a `variables_helper.py` source is cached under: a hash of its
+    content and filename, which compiled code objects record for tracebacks.
+    """
+    return sha256(f"{filename}\0{code}".encode("utf-8")).hexdigest()[:32]
+
+
+def _code_cache_path(key: str) -> str:
+    return os.path.join(cache_subdir(HELPER_CACHE_NAME), sys.implementation.cache_tag, f"{key}.code")
+
+
+def _load_cached_code(key: str) -> CodeType | None:
+    try:
+        with open(_code_cache_path(key), "rb") as file:
+            code = marshal.load(file)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return code if isinstance(code, CodeType) else None
+
+
+def _store_cached_code(key: str, code: CodeType) -> None:
+    path = _code_cache_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as file:
+            marshal.dump(code, file)
+        os.replace(tmp_name, path)
+    except OSError:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+
+
+def compile_variables_helper(code: str, filename: str) -> CodeType:
+    """
+    Compiles the source of a `variables_helper.py` file to a code object. Like
+    `__pycache__`, compiled code is kept in the user cache, keyed by the source's
+    `helper_key` and the Python version, unless caching is disabled.
+    """
+    if not cache_enabled():
+        return compile(code, str(filename), 'exec')
+    key = helper_key(code, str(filename))
+    compiled = _load_cached_code(key)
+    if compiled is None:
+        compiled = compile(code, str(filename), 'exec')
+        _store_cached_code(key, compiled)
+    return compiled
+
+
+def _helper_function(module: ModuleType, filename: str) -> Callable[[dict], dict]:
+    variables_helper = getattr(module, 'variables_helper', None)
+    if not callable(variables_helper):
+        raise ValueError(f"Variables helper in '{filename}' is not callable.")
+    return variables_helper
+
+
+def _exec_module(name: str, code: CodeType, filename: str, register: bool) -> ModuleType:
+    module = ModuleType(name)
+    module.__file__ = str(filename)
+    if register:
+        # Registered before running, as the import system does, so that the helper's
+        # own functions can find their module (e.g. for pickling).
+        sys.modules[name] = module
+    try:
+        exec(code, module.__dict__)
+    except BaseException:
+        if register:
+            sys.modules.pop(name, None)
+        raise
+    return module
+
+
+def variables_helper_from_code(code: CodeType, filename: str, key: str | None = None) -> Callable[[dict], dict]:
+    """
+    Executes a compiled `variables_helper.py` as a module and returns its
+    `variables_helper` function.
+
+    When the source's `key` is given, the module is registered in `sys.modules` and
+    reused by later loads of the same source, so the helper's module-level imports
+    and any data it memoizes are only set up once per process.
+    """
+    if key is None:
+        return _helper_function(_exec_module(f"{HELPER_MODULE_PREFIX}anonymous", code, filename, register=False), filename)
+    name = HELPER_MODULE_PREFIX + key
+    with _modules_lock:
+        module = sys.modules.get(name)
+        if module is None:
+            module = _exec_module(name, code, filename, register=True)
+    return _helper_function(module, filename)
+
+
+def variables_helper_from_source(code: str, filename: str) -> Callable[[dict], dict]:
+    """
+    Loads the source of a `variables_helper.py` file as a module, or reuses the module
+    already loaded from the same source, and returns its `variables_helper` function.
+    """
+    key = helper_key(code, str(filename))
+    module = sys.modules.get(HELPER_MODULE_PREFIX + key)
+    if module is not None:
+        return _helper_function(module, filename)
+    return variables_helper_from_code(compile_variables_helper(code, filename), filename, key)
+
+
+def dump_variables_helper(code: str, filename: str) -> bytes:
+    """
+    Returns the marshalled code object of a `variables_helper.py` source. The result is
+    only valid for the Python version that produced it.
+    """
+    return marshal.dumps(compile_variables_helper(code, filename))
@@ -0,0 +1,212 @@
+import importlib.util
+import json
+import marshal
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Generator
+
+from .base import BaseTemplate
+from .document import TemplateDocument
+from .filesystem_template import FilesystemTemplate
+from .helpers import dump_variables_helper, helper_key, variables_helper_from_code, variables_helper_from_source
+
+
+PACK_SUFFIX = ".skafpack"
+PACK_MAGIC = b"SKAFPACK"
+PACK_FORMAT_VERSION = 1
+# magic, format version, index length
+_HEADER = struct.Struct("<8sBQ")
+
+
+class PackFormatError(Exception):
+    """
+    Exception raised when a file is not a readable skaf template pack.
+    """
+    pass
+
+
+def _python_magic() -> str:
+    return importlib.util.MAGIC_NUMBER.hex()
+
+
+def write_pack(template_dir: str | Path,
+               output_path: str | Path,
+               template_name: str | None = None,
+               templater_name: str | None = None,
+               ) -> Path:
+    """
+    Packs the template directory into a single `.skafpack` file holding the file index,
+    template properties, the variables helper (source and bytecode), precompiled
+    templater code for templated files, and the raw bytes of every file.
+
+    A pack consists of a fixed header, a JSON index, and a blob region addressed by
+    `[offset, size]` pairs in the index, so readers can memory-map it and read any
+    file without parsing the others.
+    """
+    from ..templaters.registry import get_templater
+
+    template_dir = Path(template_dir)
+    output_path = Path(output_path)
+    template = FilesystemTemplate(template_name or template_dir.name, template_dir)
+    templater_name = templater_name or template.properties.get('templater') or os.environ.get('SKAF_TEMPLATER', 'jinja2')
+    templater = get_templater(templater_name)
+
+    index: dict[str, Any] = {
+        "format": PACK_FORMAT_VERSION,
+        "template_name": template.template_name,
+        "properties": template.properties,
+        "templater": templater_name,
+        "python_magic": _python_magic(),
+        "compiler_version": _compiler_version(templater_name),
+        "helper": None,
+        "files": [],
+    }
+
+    with tempfile.TemporaryFile() as blobs:
+        def add_blob(data: bytes) -> list[int]:
+            offset = blobs.tell()
+            blobs.write(data)
+            return [offset, len(data)]
+
+        helper_path = template_dir / template.variables_helper_filename
+        if helper_path.exists():
+            helper_source = helper_path.read_text()
+            index["helper"] = {
+                "source": add_blob(helper_source.encode("utf-8")),
+                "code": add_blob(dump_variables_helper(helper_source, helper_path)),
+            }
+
+        for document in template.iter_documents():
+            entry: dict[str, Any] = {"relpath": document.relpath}
+            if document.path.is_symlink():
+                entry["link_target"] = os.readlink(document.path)
+                index["files"].append(entry)
+                continue
+            if document.path.is_dir():
+                raise PackFormatError(f"Cannot pack directory '{document.relpath}'.")
+            content = document.read_bytes()
+            entry["blob"] = add_blob(content)
+            entry["mode"] = document.path.stat().st_mode & 0o7777
+            entry["sha256"] = sha256(content).hexdigest()
+            entry["templated"] = document.relpath.endswith(templater.suffix)
+            if entry["templated"]:
+                code = templater.dump_compiled(content.decode("utf-8"))
+                if code is not None:
+                    entry["code"] = add_blob(code)
+            index["files"].append(entry)
+
+        # YAML values JSON has no type for, such as dates, are stored as strings.
+        index_bytes = json.dumps(index, separators=(",", ":"), default=str).encode("utf-8")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=output_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as output:
+                output.write(_HEADER.pack(PACK_MAGIC, PACK_FORMAT_VERSION, len(index_bytes)))
+                output.write(index_bytes)
+                blobs.seek(0)
+                shutil.copyfileobj(blobs, output)
+            os.replace(tmp_name, output_path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+            raise
+    return output_path
+
+
+def _compiler_version(templater_name: str) -> str | None:
+    if templater_name == "jinja2":
+        from importlib.metadata import version
+        return f"jinja2-{version('jinja2')}"
+    return None
+
+
+class PackTemplate(BaseTemplate):
+    """
+    A template read from a single `.skafpack` file produced by `write_pack`.
+
+    The pack is memory-mapped and each file is sliced out only when it is read.
+    Precompiled templater code and helper bytecode are used when the pack was built by
+    the same Python and templater versions, and ignored in favour of the sources
+    otherwise.
+    """
+
+    def __init__(self, template_name: str | None, pack_path: str | Path):
+        self.pack_path = Path(pack_path)
+        with open(self.pack_path, "rb") as file:
+            try:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise PackFormatError(f"'{self.pack_path}' is not a skaf template pack.")
+        try:
+            magic, version, index_length = _HEADER.unpack_from(self._map, 0)
+        except struct.error:
+            raise PackFormatError(f"'{self.pack_path}' is not a skaf template pack.")
+        if magic != PACK_MAGIC:
+            raise PackFormatError(f"'{self.pack_path}' is not a skaf template pack.")
+        if version != PACK_FORMAT_VERSION:
+            raise PackFormatError(f"'{self.pack_path}' uses unsupported pack format version {version}.")
+        index_start = _HEADER.size
+        self._blob_start = index_start + index_length
+        self.index = json.loads(self._map[index_start:self._blob_start])
+        self._init(template_name or self.index["template_name"], self.index["properties"])
+        self._bytecode_compatible = self.index["python_magic"] == _python_magic()
+        self._templater = None
+        self._templater_compatible = (
+            self._bytecode_compatible
+            and self.index["compiler_version"] is not None
+            and self.index["compiler_version"] == _compiler_version(self.index["templater"])
+        )
+        self.variables_helper = self._load_variables_helper()
+
+    def _blob(self, location: list[int]) -> bytes:
+        offset, size = location
+        start = self._blob_start + offset
+        return self._map[start:start + size]
+
+    def _load_variables_helper(self):
+        helper = self.index["helper"]
+        if helper is None:
+            return lambda d: d
+        filename = f"{self.pack_path}:variables_helper.py"
+        source = self._blob(helper["source"]).decode("utf-8")
+        if self._bytecode_compatible:
+            return variables_helper_from_code(marshal.loads(self._blob(helper["code"])), filename, helper_key(source, filename))
+        return variables_helper_from_source(source, filename)
+
+    def _read_templated(self, entry: dict[str, Any]) -> bytes:
+        content = self._blob(entry["blob"])
+        if self._templater_compatible and "code" in entry:
+            if self._templater is None:
+                from ..templaters.registry import get_templater
+                self._templater = get_templater(self.index["templater"])
+            self._templater.load_compiled(content.decode("utf-8"), self._blob(entry["code"]))
+        return content
+
+    def iter_documents(self) -> Generator[TemplateDocument, None, None]:
+        """
+        Yields a `TemplateDocument` for each file in the pack without reading its content,
+        carrying the digest stored at pack time. Reading a templated file also primes the templater with its precompiled code.
+        """
+        for entry in self.index["files"]:
+            if "link_target" in entry:
+                yield TemplateDocument(entry["relpath"], link_target=entry["link_target"])
+            elif entry.get("templated"):
+                yield TemplateDocument(entry["relpath"], loader=lambda e=entry: self._read_templated(e),
+                                       mode=entry["mode"], digest=entry["sha256"])
+            else:
+                yield TemplateDocument(entry["relpath"], loader=lambda e=entry: self._blob(e["blob"]),
+                                       mode=entry["mode"], digest=entry["sha256"])
+
+    def documents(self) -> Generator[tuple[str, str], None, None]:
+        """
+        Yields tuples of (relpath, content) for each document in the template.
+        """
+        for document in self.iter_documents():
+            if document.link_target is not None:
+                continue
+            yield document.relpath, document.read_text()
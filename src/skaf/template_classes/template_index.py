@@ -0,0 +1,196 @@
+import atexit
+import marshal
+import os
+import sys
+import tempfile
+import threading
+import weakref
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Generator
+
+from ..cache import cache_subdir
+
+
+TEMPLATE_INDEX_CACHE_NAME = "templates"
+INDEX_VERSION = 4
+
+# A file's identity as far as the index is concerned: it is re-read whenever any of
+# these change. The inode change time catches edits that preserve the mtime.
+Stamp = tuple[int, int, int, int]
+
+
+def file_stamp(path: str | Path) -> Stamp | None:
+    """
+    Returns the stamp of the file or symlink at `path`, or None if nothing exists there.
+    """
+    try:
+        return _stamp(os.lstat(path))
+    except FileNotFoundError:
+        return None
+
+
+def _stamp(stat: os.stat_result) -> Stamp:
+    return (stat.st_mtime_ns, stat.st_ctime_ns, stat.st_size, stat.st_ino)
+
+
+def scan_tree(root: str) -> Generator[tuple[str, Stamp], None, None]:
+    """
+    Yields `(relpath, stamp)` for each file below `root`, and for each symlink
+    to a directory, which is not descended into. Entries are yielded in the order
+    `os.walk` lists them, using only the stat data of `os.scandir`.
+    """
+    yield from _scan(root, "")
+
+
+def _scan(directory: str, relpath: str) -> Generator[tuple[str, Stamp], None, None]:
+    with os.scandir(directory) as entries:
+        entries = list(entries)
+    subdirs = []
+    linked_dirs = []
+    for entry in entries:
+        if entry.is_dir():
+            (linked_dirs if entry.is_symlink() else subdirs).append(entry)
+        else:
+            yield os.path.join(relpath, entry.name), _stamp(entry.stat(follow_symlinks=False))
+    for entry in linked_dirs:
+        yield os.path.join(relpath, entry.name), _stamp(entry.stat(follow_symlinks=False))
+    for entry in subdirs:
+        yield from _scan(entry.path, os.path.join(relpath, entry.name))
+
+
+class TemplateIndex:
+    """
+    A persistent index of a template directory, stored in the user cache and keyed by
+    the directory's absolute path and the Python version: the parsed template
+    properties, the compiled variables helper and the content hash of each template
+    file that has been hashed, each stored with the stamp of the file it was derived from.
+
+    Cached values are only returned while that stamp is unchanged, so an unchanged
+    template loads without reading or parsing any file; when files change, only those
+    are read again. Content hashes are computed on demand, and saved when the template
+    is next listed or the process exits, rather than once per file.
+    """
+
+    def __init__(self, template_dir: str | Path, directory: Path | None = None):
+        self.template_dir = os.path.abspath(template_dir)
+        directory = Path(directory) if directory is not None else cache_subdir(TEMPLATE_INDEX_CACHE_NAME)
+        key = sha256(self.template_dir.encode("utf-8")).hexdigest()[:32]
+        self.path = directory / f"{key}-{sys.implementation.cache_tag}.idx"
+        self._data = self._load()
+        if not isinstance(self._data.get("digests"), dict):
+            self._data["digests"] = {}
+        self._digests: dict[str, tuple[Stamp, str]] = self._data["digests"]
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._flush_at_exit = False
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            with open(self.path, "rb") as file:
+                data = marshal.load(file)
+        except (OSError, EOFError, ValueError, TypeError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION or data.get("template_dir") != self.template_dir:
+            return {}
+        return data
+
+    def save(self) -> None:
+        with self._lock:
+            data = {**self._data, "version": INDEX_VERSION, "template_dir": self.template_dir}
+            self._dirty = False
+            try:
+                payload = marshal.dumps(data)
+            except ValueError:
+                return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}-", suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(payload)
+            os.replace(tmp_name, self.path)
+        except OSError:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+
+    def lookup(self, key: str, stamp: Stamp | None) -> Any:
+        """
+        Returns the value stored under `key` if it was derived from a file whose stamp
+        was `stamp`, or None.
+        """
+        entry = self._data.get(key)
+        if entry is None or stamp is None or tuple(entry[0]) != stamp:
+            return None
+        return entry[1]
+
+    def store(self, key: str, stamp: Stamp | None, value: Any) -> None:
+        """
+        Stores `value`, derived from a file whose stamp is `stamp`, and saves the index.
+        Values that cannot be marshalled, such as YAML dates, are not stored.
+        """
+        if stamp is None:
+            return
+        try:
+            marshal.dumps(value)
+        except ValueError:
+            return
+        with self._lock:
+            self._data[key] = (stamp, value)
+            self.save()
+
+    def documents(self, template_root: str) -> list[tuple[str, Stamp]]:
+        """
+        Returns the relpath and stamp of each document below `template_root`, in the
+        order `os.walk` lists them, from directory listings alone. No file is read:
+        documents are only hashed when a consumer asks for their digest. Hashes of
+        files that no longer exist are dropped, and new ones saved.
+        """
+        entries = list(scan_tree(template_root))
+        with self._lock:
+            listed = {relpath for relpath, _ in entries}
+            for relpath in [relpath for relpath in self._digests if relpath not in listed]:
+                del self._digests[relpath]
+                self._dirty = True
+            if self._dirty:
+                self.save()
+        return entries
+
+    def digest(self, relpath: str, stamp: Stamp) -> str | None:
+        """
+        Returns the content hash stored for the document at `relpath` if it was
+        computed while the document's stamp was `stamp`, or None.
+        """
+        entry = self._digests.get(relpath)
+        if entry is None or tuple(entry[0]) != stamp:
+            return None
+        return entry[1]
+
+    def store_digest(self, relpath: str, stamp: Stamp, digest: str) -> None:
+        """
+        Stores the content hash of the document at `relpath`, computed while its stamp
+        was `stamp`. It is saved with the index when the template is next listed or at
+        exit.
+        """
+        with self._lock:
+            self._digests[relpath] = (stamp, digest)
+            self._dirty = True
+            if not self._flush_at_exit:
+                self._flush_at_exit = True
+                atexit.register(_flush_index, weakref.ref(self))
+
+    def flush(self) -> None:
+        """
+        Saves the index if content hashes were stored since it was last saved.
+        """
+        with self._lock:
+            if self._dirty:
+                self.save()
+
+
+def _flush_index(index_ref: "weakref.ref[TemplateIndex]") -> None:
+    index = index_ref()
+    if index is not None:
+        index.flush()
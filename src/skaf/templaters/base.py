@@ -1,4 +1,25 @@
 from abc import ABC, abstractmethod
+from typing import Any, Generator, Iterable, Iterator
+
+
+DEFAULT_STREAM_BUFFER_SIZE = 1 << 16
+
+
+def buffer_chunks(chunks: Iterable[str], buffer_size: int = DEFAULT_STREAM_BUFFER_SIZE) -> Generator[str, None, None]:
+    """
+    Joins small chunks of output into chunks of at least `buffer_size` characters
+    (except the last), so that writing them does not cost one call per chunk.
+    """
+    buffer: list[str] = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
 
 
 class ABCTemplater(ABC):
@@ -6,6 +27,8 @@ class ABCTemplater(ABC):
     Abstract base class for all templaters.
 
     All templaters should inherit from this class and implement the `render` method.
+    Templaters that can reuse parsed templates should also override `compile` and
+    `render_compiled`, which let callers parse a source once and render it many times.
     """
 
     suffix: str
@@ -24,3 +47,86 @@ class ABCTemplater(ABC):
         """
         pass
 
+    def cache_tag(self) -> str:
+        """
+        Identifies the templater, and the version of the engine behind it, in the keys of
+        cached output, so that output rendered by one version is not reused by another.
+        Defaults to the templater's class.
+        """
+        return f"{type(self).__module__}.{type(self).__qualname__}"
+
+    def compile(self, template: str) -> Any:
+        """
+        Compile a template source into an object accepted by `render_compiled`.
+
+        The default implementation performs no compilation and returns the source.
+        """
+        return template
+
+    def render_compiled(self, compiled: Any, context: dict) -> str:
+        """
+        Render a template previously returned by `compile` with the given context.
+        """
+        return self.render(compiled, context)
+
+    def dump_compiled(self, template: str) -> bytes | None:
+        """
+        Serialize the compiled form of a template source so it can be shipped and
+        restored with `load_compiled`. Returns None when the templater has nothing
+        worth serializing, which is the default.
+        """
+        return None
+
+    def load_compiled(self, template: str, data: bytes) -> Any:
+        """
+        Restore a compiled template produced by `dump_compiled` for the given source.
+        The default implementation ignores `data` and compiles the source.
+        """
+        return self.compile(template)
+
+    def find_variables(self, template: str) -> set[str] | None:
+        """
+        Returns the names of the variables a template source refers to, found by static
+        analysis, or None when they cannot be determined. The default implementation
+        cannot determine them.
+        """
+        return None
+
+    def find_required_variables(self, template: str) -> set[str] | None:
+        """
+        Returns the variables a template source cannot be rendered without, or None when
+        they cannot be determined. Defaults to all variables found by `find_variables`.
+        """
+        return self.find_variables(template)
+
+    def is_literal(self, template: str) -> bool:
+        """
+        Returns True when a template source contains no template syntax at all, so that
+        `render_literal` gives the same result as rendering it. The default is False.
+        """
+        return False
+
+    def render_literal(self, template: str) -> str:
+        """
+        Returns the output of a template source for which `is_literal` is True, without
+        compiling it.
+        """
+        return self.render(template, {})
+
+    def render_stream(self,
+                      template: str,
+                      context: dict,
+                      buffer_size: int = DEFAULT_STREAM_BUFFER_SIZE
+                      ) -> Iterator[str]:
+        """
+        Renders a template with the given context as an iterator of chunks of about
+        `buffer_size` characters, so the output never needs to be held in memory at once.
+        The default implementation renders the whole output and yields it in one piece.
+        """
+        yield self.render_compiled(self.compile(template), context)
+
+    def render_many(self, templates: Iterable[str], context: dict) -> list[str]:
+        """
+        Render several template sources with the same context, compiling each once.
+        """
+        return [self.render_compiled(self.compile(template), context) for template in templates]
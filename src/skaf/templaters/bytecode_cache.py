@@ -0,0 +1,74 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import jinja2
+from jinja2.bccache import Bucket, BytecodeCache
+
+from ..cache import cache_subdir, prune_directory, directory_usage
+
+
+BYTECODE_CACHE_NAME = "bytecode"
+DEFAULT_BYTECODE_CACHE_MAX_BYTES = int(os.environ.get("SKAF_BYTECODE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+
+class ContentHashBytecodeCache(BytecodeCache):
+    """
+    A persistent jinja2 bytecode cache keyed by template content hash.
+
+    Entries live in a directory namespaced by the jinja2 and Python versions, so an
+    upgrade of either never loads stale bytecode. Once the directory grows beyond
+    `max_bytes`, the least recently used entries are evicted.
+    """
+
+    def __init__(self, directory: Path = None, max_bytes: int = DEFAULT_BYTECODE_CACHE_MAX_BYTES):
+        if directory is None:
+            directory = cache_subdir(BYTECODE_CACHE_NAME) / self.version_tag()
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._approximate_size = None
+
+    @staticmethod
+    def version_tag() -> str:
+        return f"jinja2-{jinja2.__version__}-{sys.implementation.cache_tag}"
+
+    def _get_cache_filename(self, bucket: Bucket) -> Path:
+        return self.directory / f"{bucket.key}.cache"
+
+    def load_bytecode(self, bucket: Bucket) -> None:
+        filename = self._get_cache_filename(bucket)
+        try:
+            with open(filename, "rb") as file:
+                bucket.load_bytecode(file)
+            os.utime(filename)
+        except (FileNotFoundError, OSError):
+            return
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        filename = self._get_cache_filename(bucket)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmpname = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                bucket.write_bytecode(file)
+            os.replace(tmpname, filename)
+        except OSError:
+            return
+        self._account(os.path.getsize(filename))
+
+    def _account(self, size: int) -> None:
+        if self._approximate_size is None:
+            self._approximate_size = directory_usage(self.directory)[1]
+        else:
+            self._approximate_size += size
+        if self._approximate_size > self.max_bytes:
+            self._approximate_size = prune_directory(self.directory, self.max_bytes // 2)
+
+    def clear(self) -> None:
+        if not self.directory.is_dir():
+            return
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".cache"):
+                os.remove(entry.path)
+        self._approximate_size = 0
@@ -0,0 +1,69 @@
+from collections import OrderedDict
+from hashlib import sha256
+from threading import Lock
+from typing import Any, Callable
+import os
+
+
+DEFAULT_COMPILED_CACHE_SIZE = int(os.environ.get('SKAF_COMPILED_CACHE_SIZE', 512))
+
+
+def source_hash(source: str) -> str:
+    """
+    Returns a stable hex digest for a template source string.
+    """
+    return sha256(source.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+class CompiledTemplateCache:
+    """
+    A bounded, thread-safe LRU mapping of template source hashes to compiled templates.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_COMPILED_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._lock = Lock()
+
+    def get_or_compile(self, source: str, compile_fn: Callable[[str], Any]) -> Any:
+        """
+        Returns the compiled template for `source`, compiling and storing it on a miss.
+        """
+        key = source_hash(source)
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+        compiled = compile_fn(source)
+        self.put(key, compiled)
+        return compiled
+
+    def put(self, key: str, compiled: Any) -> None:
+        with self._lock:
+            self._entries[key] = compiled
+            self._entries.move_to_end(key)
+            while self.maxsize >= 0 and len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, source: str) -> Any:
+        """
+        Removes and returns the entry for `source`, or None when there is none.
+        """
+        with self._lock:
+            return self._entries.pop(source_hash(source), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, source: str) -> bool:
+        return source_hash(source) in self._entries
@@ -1,6 +1,17 @@
+import marshal
+import re
+from threading import Lock
+
 import jinja2
 
-from .base import ABCTemplater
+from .base import ABCTemplater, DEFAULT_STREAM_BUFFER_SIZE, buffer_chunks
+from .cache import CompiledTemplateCache, source_hash
+from .bytecode_cache import ContentHashBytecodeCache
+from ..cache import cache_enabled
+
+
+# The line breaks recognized by jinja2's lexer.
+_newline_pattern = re.compile(r"(\r\n|\r|\n)")
 
 
 class Jinja2Templater(ABCTemplater):
@@ -8,9 +19,206 @@ class Jinja2Templater(ABCTemplater):
     environment_parameters = {
         "undefined": jinja2.StrictUndefined
     }
-    
+
     suffix = ".jinja"
 
+    _environment: jinja2.Environment = None
+    _environment_lock = Lock()
+    compiled_cache = CompiledTemplateCache()
+    # Sources parsed for analysis, kept until they are compiled so they are parsed once.
+    parsed_cache = CompiledTemplateCache()
+
+    def __init_subclass__(cls, **kwargs):
+        # Subclasses may change `environment_parameters`, so they get their own caches.
+        super().__init_subclass__(**kwargs)
+        cls._environment = None
+        cls.compiled_cache = CompiledTemplateCache()
+        cls.parsed_cache = CompiledTemplateCache()
+
+    @classmethod
+    def environment(cls) -> jinja2.Environment:
+        """
+        Returns the jinja2 environment shared by all instances of this templater class.
+        Unless caching is disabled, the environment persists compiled bytecode in the
+        user cache directory so unchanged templates skip compilation across runs.
+        """
+        if cls._environment is None:
+            with cls._environment_lock:
+                if cls._environment is None:
+                    parameters = dict(cls.environment_parameters)
+                    if cache_enabled():
+                        parameters.setdefault('bytecode_cache', ContentHashBytecodeCache())
+                    cls._environment = jinja2.Environment(**parameters)
+        return cls._environment
+
+    @classmethod
+    def reset_environment(cls) -> None:
+        """
+        Discards the shared environment and compiled templates so they are rebuilt on next use.
+        """
+        with cls._environment_lock:
+            cls._environment = None
+        cls.compiled_cache.clear()
+        cls.parsed_cache.clear()
+
+    def _parse(self, source: str) -> "jinja2.nodes.Template":
+        """
+        Parses a template source for analysis. The tree is kept until the source is
+        compiled, which then starts from it instead of parsing the source again.
+        """
+        return self.parsed_cache.get_or_compile(source, self.environment().parse)
+
+    def _compile_source(self, source: str) -> jinja2.Template:
+        environment = self.environment()
+        parsed = self.parsed_cache.pop(source)
+        bytecode_cache = environment.bytecode_cache
+        if bytecode_cache is None:
+            code = environment.compile(parsed or source)
+            return environment.template_class.from_code(environment, code, environment.make_globals(None), None)
+        bucket = bytecode_cache.get_bucket(environment, source_hash(source), None, source)
+        code = bucket.code
+        if code is None:
+            code = environment.compile(parsed or source)
+            bucket.code = code
+            bytecode_cache.set_bucket(bucket)
+        return environment.template_class.from_code(environment, code, environment.make_globals(None), None)
+
+    def cache_tag(self) -> str:
+        return f"{super().cache_tag()}-jinja2-{jinja2.__version__}"
+
+    def compile(self, template: str) -> jinja2.Template:
+        """
+        Compile a template source, reusing a cached compiled template for identical sources.
+        """
+        return self.compiled_cache.get_or_compile(template, self._compile_source)
+
+    def dump_compiled(self, template: str) -> bytes:
+        """
+        Returns the marshalled Python code object jinja2 compiles the template source to.
+        The result is only valid for the same jinja2 and Python versions.
+        """
+        return marshal.dumps(self.environment().compile(template))
+
+    def load_compiled(self, template: str, data: bytes) -> jinja2.Template:
+        """
+        Builds a template from code produced by `dump_compiled` and stores it in the
+        compiled-template cache, so rendering the same source skips compilation.
+        """
+        environment = self.environment()
+        code = marshal.loads(data)
+        compiled = environment.template_class.from_code(environment, code, environment.make_globals(None), None)
+        self.compiled_cache.put(source_hash(template), compiled)
+        return compiled
+
+    def find_variables(self, template: str) -> set[str] | None:
+        """
+        Returns the undeclared variables of a template source, or None if it cannot be parsed.
+        """
+        from jinja2 import meta
+        try:
+            ast = self._parse(template)
+        except jinja2.TemplateSyntaxError:
+            return None
+        return meta.find_undeclared_variables(ast)
+
+    def find_required_variables(self, template: str) -> set[str] | None:
+        """
+        Returns the undeclared variables a template source uses wherever it is
+        rendered, leaving out environment globals, variables only tested with
+        `is defined` or passed to `default`, and variables only used in the body of an
+        `if` or `for` block, a macro or a conditional expression, which may never be
+        evaluated.
+        """
+        from jinja2 import meta, nodes
+        try:
+            ast = self._parse(template)
+        except jinja2.TemplateSyntaxError:
+            return None
+        unconditional = set()
+        pending = [ast]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, nodes.Name) and node.ctx == "load":
+                unconditional.add(node.name)
+            elif isinstance(node, nodes.If):
+                pending.append(node.test)
+            elif isinstance(node, nodes.For):
+                pending.append(node.iter)
+            elif isinstance(node, nodes.CondExpr):
+                pending.append(node.test)
+            elif isinstance(node, nodes.CallBlock):
+                pending.append(node.call)
+            elif not isinstance(node, nodes.Macro):
+                pending.extend(node.iter_child_nodes())
+        optional = set(self.environment().globals)
+        for test in ast.find_all(nodes.Test):
+            if test.name in ("defined", "undefined") and isinstance(test.node, nodes.Name):
+                optional.add(test.node.name)
+        for filter_ in ast.find_all(nodes.Filter):
+            if filter_.name in ("default", "d") and isinstance(filter_.node, nodes.Name):
+                optional.add(filter_.node.name)
+        return (meta.find_undeclared_variables(ast) & unconditional) - optional
+
+    def is_literal(self, template: str) -> bool:
+        environment = self.environment()
+        if environment.line_statement_prefix or environment.line_comment_prefix:
+            return False
+        return not any(marker in template for marker in (
+            environment.block_start_string,
+            environment.variable_start_string,
+            environment.comment_start_string,
+        ))
+
+    def render_literal(self, template: str) -> str:
+        """
+        Reproduces what jinja2 makes of a template without syntax: line breaks are
+        normalized and, unless `keep_trailing_newline` is set, one trailing newline is removed.
+        """
+        environment = self.environment()
+        lines = _newline_pattern.split(template)[::2]
+        if not environment.keep_trailing_newline and lines[-1] == "":
+            del lines[-1]
+        return environment.newline_sequence.join(lines)
+
+    def render_compiled(self, compiled: jinja2.Template, context: dict) -> str:
+        return compiled.render(**context)
+
+    def render_stream(self,
+                      template: str,
+                      context: dict,
+                      buffer_size: int = DEFAULT_STREAM_BUFFER_SIZE
+                      ):
+        """
+        Renders a template with jinja2's `generate`, joining its output into chunks of
+        about `buffer_size` characters. Sources without template syntax are sliced as
+        they are yielded. Streamed templates are large, so they are compiled without
+        being kept in the compiled-template cache.
+        """
+        if self.is_literal(template):
+            return self._stream_literal(template, buffer_size)
+        return buffer_chunks(self._compile_source(template).generate(**context), buffer_size)
+
+    def _stream_literal(self, template: str, buffer_size: int):
+        """
+        Yields what `render_literal` makes of a template in slices of about
+        `buffer_size` characters, without building the whole output.
+        """
+        environment = self.environment()
+        end = len(template)
+        if not environment.keep_trailing_newline:
+            end -= len(next((newline for newline in ("\r\n", "\n", "\r") if template.endswith(newline)), ""))
+        start = 0
+        while start < end:
+            stop = min(start + buffer_size, end)
+            if stop < end and template[stop - 1] == "\r":
+                # Keeps a "\r\n" pair in one slice.
+                stop += 1
+            chunk = template[start:stop]
+            if "\r" in chunk or environment.newline_sequence != "\n":
+                chunk = _newline_pattern.sub(environment.newline_sequence, chunk)
+            yield chunk
+            start = stop
+
     def render(self, template: str, context: dict, template_filename: str = None) -> str:
         """
         Render a template with the given context using Jinja2 templating.
@@ -25,6 +233,4 @@ class Jinja2Templater(ABCTemplater):
         if template_filename:
             if not template_filename.endswith(self.suffix):
                 return template
-        environment = jinja2.Environment(**self.environment_parameters)
-        template: jinja2.environment.Template = environment.from_string(template)
-        return template.render(**context)
+        return self.render_compiled(self.compile(template), context)
@@ -1,12 +1,77 @@
 from string import Template
 
-from .base import ABCTemplater
+from .base import ABCTemplater, DEFAULT_STREAM_BUFFER_SIZE, buffer_chunks
+from .cache import CompiledTemplateCache
 
 
 class PystringTemplater(ABCTemplater):
 
     suffix = ".template"
 
+    compiled_cache = CompiledTemplateCache()
+
+    def compile(self, template: str) -> Template:
+        """
+        Wrap a template source in a `string.Template`, reusing one for identical sources.
+        """
+        return self.compiled_cache.get_or_compile(template, Template)
+
+    def render_compiled(self, compiled: Template, context: dict) -> str:
+        return compiled.safe_substitute(context)
+
+    def find_variables(self, template: str) -> set[str]:
+        """
+        Returns the names of the `$name` and `${name}` placeholders in a template source.
+        """
+        names = set()
+        for match in Template.pattern.finditer(template):
+            name = match.group("named") or match.group("braced")
+            if name:
+                names.add(name)
+        return names
+
+    def find_required_variables(self, template: str) -> set[str]:
+        """
+        Placeholders without a value are left as-is by `safe_substitute`, so no variable
+        is required.
+        """
+        return set()
+
+    def is_literal(self, template: str) -> bool:
+        return "$" not in template
+
+    def render_literal(self, template: str) -> str:
+        return template
+
+    def render_stream(self,
+                      template: str,
+                      context: dict,
+                      buffer_size: int = DEFAULT_STREAM_BUFFER_SIZE
+                      ):
+        """
+        Substitutes placeholders one at a time with the same rules as `safe_substitute`,
+        yielding the output in chunks of about `buffer_size` characters. Sources without
+        placeholders are sliced as they are yielded.
+        """
+        if self.is_literal(template):
+            return (template[i:i + buffer_size] for i in range(0, len(template), buffer_size))
+        return buffer_chunks(self._substitute_pieces(template, context), buffer_size)
+
+    @staticmethod
+    def _substitute_pieces(template: str, context: dict):
+        position = 0
+        for match in Template.pattern.finditer(template):
+            yield template[position:match.start()]
+            name = match.group("named") or match.group("braced")
+            if name is not None:
+                yield str(context[name]) if name in context else match.group()
+            elif match.group("escaped") is not None:
+                yield Template.delimiter
+            else:
+                yield match.group()
+            position = match.end()
+        yield template[position:]
+
     def render(self, template: str, context: dict, template_filename: str = None) -> str:
         """
         Render a template with the given context using Python string templating.
@@ -21,5 +86,4 @@ class PystringTemplater(ABCTemplater):
         if template_filename:
             if not template_filename.endswith(self.suffix):
                 return template
-        pystring_template = Template(template)
-        return pystring_template.safe_substitute(context)
+        return self.render_compiled(self.compile(template), context)
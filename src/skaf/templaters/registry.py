@@ -1,12 +1,36 @@
+from importlib import import_module
+from typing import Iterator, Mapping
+
 from .base import ABCTemplater
-from .pystring import PystringTemplater
-from .jinja import Jinja2Templater
 
 
-_templaters: dict[str, ABCTemplater] = {
-    "pystring": PystringTemplater,
-    "jinja2": Jinja2Templater,
-}
+class _LazyTemplaterMapping(Mapping):
+    """
+    Maps templater names to templater classes, importing each templater's module (and
+    so its engine) only when the templater is looked up.
+    """
+
+    def __init__(self, paths: dict[str, str]):
+        self._paths = paths
+        self._classes: dict[str, type[ABCTemplater]] = {}
+
+    def __getitem__(self, name: str) -> type[ABCTemplater]:
+        if name not in self._classes:
+            module_name, class_name = self._paths[name].split(":")
+            self._classes[name] = getattr(import_module(module_name, __package__), class_name)
+        return self._classes[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+
+_templaters: Mapping[str, type[ABCTemplater]] = _LazyTemplaterMapping({
+    "pystring": ".pystring:PystringTemplater",
+    "jinja2": ".jinja:Jinja2Templater",
+})
 
 
 def get_templater(template_name: str, **kwargs) -> ABCTemplater:
@@ -15,9 +39,11 @@ def get_templater(template_name: str, **kwargs) -> ABCTemplater:
     If the template does not exist, raises a KeyError.
     """
     try:
-        return _templaters[template_name](**kwargs)
+        templater_class = _templaters[template_name]
     except KeyError:
         raise KeyError(f"Templater '{template_name}' does not exist.")
+    try:
+        return templater_class(**kwargs)
     except Exception as e:
         etype = type(e).__name__
         raise RuntimeError(f"Error getting templater: {etype}: {e}")
@@ -13,6 +13,21 @@ from skaf.templaters.pystring import PystringTemplater
 from skaf import registry as reg
 
 
+@pytest.fixture(autouse=True)
+def isolated_user_cache(tmp_path_factory, monkeypatch) -> Path:
+    """Point skaf's persistent user cache at a temporary directory for every test."""
+    cache_dir = tmp_path_factory.getbasetemp() / "skaf_cache"
+    monkeypatch.setenv("SKAF_CACHE_DIR", str(cache_dir))
+    monkeypatch.delenv("SKAF_NO_CACHE", raising=False)
+    return cache_dir
+
+
+@pytest.fixture(autouse=True)
+def no_daemon(monkeypatch):
+    """Keep CLI calls in-process, even if a skaf daemon is running on this machine."""
+    monkeypatch.setenv("SKAF_NO_DAEMON", "1")
+
+
 @pytest.fixture
 def temp_dir() -> Generator[Path, None, None]:
     """Create a temporary directory for test files."""
@@ -159,3 +174,30 @@ def jinja2_templater() -> Jinja2Templater:
 def pystring_templater() -> PystringTemplater:
     """Create a PystringTemplater instance for testing."""
     return PystringTemplater()
+
+
+@pytest.fixture
+def git_template_repo(temp_dir, sample_template_dir) -> Path:
+    """Create a local git repository holding the sample template, tagged 'v1'."""
+    from git import Repo, Actor
+
+    repo_dir = temp_dir / "git_template_repo"
+    shutil.copytree(sample_template_dir, repo_dir)
+    repo = Repo.init(repo_dir, initial_branch="main")
+    actor = Actor("Test Author", "test@example.com")
+    repo.git.add(A=True)
+    repo.index.commit("Initial template", author=actor, committer=actor)
+    repo.create_tag("v1")
+    return repo_dir
+
+
+def commit_file(repo_dir: Path, relpath: str, content: str) -> str:
+    """Write a file into a git repository and commit it, returning the new commit SHA."""
+    from git import Repo, Actor
+
+    repo = Repo(repo_dir)
+    (repo_dir / relpath).parent.mkdir(parents=True, exist_ok=True)
+    (repo_dir / relpath).write_text(content)
+    actor = Actor("Test Author", "test@example.com")
+    repo.git.add(A=True)
+    return repo.index.commit(f"Update {relpath}", author=actor, committer=actor).hexsha
@@ -0,0 +1,152 @@
+import jinja2
+import pytest
+from unittest.mock import patch
+
+from skaf.scaffold import scaffold_project
+from skaf.scaffold.analysis import DependencyIndex, analyze_template, changed_variables, document_variables
+from skaf.template_classes.dict_template import DictTemplate
+from skaf.template_classes.filesystem_template import FilesystemTemplate
+from skaf.templaters.jinja import Jinja2Templater
+from skaf.templaters.pystring import PystringTemplater
+
+
+class TestFindVariables:
+    def test_jinja(self):
+        source = "{{ a }} {% for x in items %}{{ x.name }}{% endfor %}{% set y = 1 %}{{ y }}"
+        assert Jinja2Templater().find_variables(source) == {"a", "items"}
+
+    def test_jinja_syntax_error(self):
+        assert Jinja2Templater().find_variables("{% if %}") is None
+
+    def test_pystring(self):
+        assert PystringTemplater().find_variables("$a ${b} $$c ${a}") == {"a", "b"}
+
+
+class TestLiterals:
+    @pytest.mark.parametrize("source", ["", "\n", "a\n", "a\r\nb\r\n", "a\rb\n\n", "x }} %} #}", "a\n\r\n"])
+    def test_jinja_literal_matches_render(self, source):
+        templater = Jinja2Templater()
+        assert templater.is_literal(source)
+        assert templater.render_literal(source) == templater.render(source, {})
+
+    def test_jinja_syntax_is_not_literal(self):
+        templater = Jinja2Templater()
+        assert not templater.is_literal("{{ a }}")
+        assert not templater.is_literal("{% raw %}{% endraw %}")
+        assert not templater.is_literal("{# comment #}")
+
+    def test_pystring(self):
+        templater = PystringTemplater()
+        assert templater.is_literal("plain text")
+        assert not templater.is_literal("$$ escaped")
+
+    def test_required_variables(self):
+        source = "{% if x is defined %}{{ x }}{% endif %}{{ y | default(1) }}{{ z }}{{ range(3) }}"
+        assert Jinja2Templater().find_required_variables(source) == {"z"}
+        source = ("{% if use_x == 'yes' %}{{ x }}{% else %}{{ w }}{% endif %}"
+                  "{% for i in items %}{{ i }}{{ v }}{% endfor %}{{ a if b else c }}")
+        assert Jinja2Templater().find_required_variables(source) == {"use_x", "items", "b"}
+        assert PystringTemplater().find_required_variables("${a}") == set()
+
+
+class TestDocumentVariables:
+    def test_path_and_source(self):
+        names = document_variables("src/{{ pkg }}/x.py.jinja", "{{ version }}", Jinja2Templater())
+        assert names == ["pkg", "version"]
+
+    def test_static_file_depends_on_path_only(self):
+        assert document_variables("src/{{ pkg }}/logo.png", None, Jinja2Templater()) == ["pkg"]
+
+    def test_unparseable_source(self):
+        assert document_variables("x.jinja", "{% if %}", Jinja2Templater()) is None
+
+
+class TestChangedVariables:
+    def test_changed_added_and_removed(self):
+        previous = {"a": 1, "b": [1, 2], "c": "x"}
+        current = {"a": 1, "b": [1, 3], "d": "y"}
+        assert changed_variables(previous, current) == {"b", "c", "d"}
+
+    def test_values_compare_in_json_form(self):
+        assert changed_variables({"a": [1, 2]}, {"a": (1, 2)}) == set()
+
+
+class TestDependencyIndex:
+    def test_from_template(self, filesystem_template, jinja2_templater):
+        index = DependencyIndex.from_template(filesystem_template, jinja2_templater)
+
+        assert index.dependents(["version"]) == {"pyproject.toml.jinja"}
+        assert index.dependents(["author"]) == {"pyproject.toml.jinja", "README.md.jinja"}
+        assert "src/{{ project_name }}/main.py" in index.dependents(["project_name"])
+
+    def test_unresolved_files_depend_on_everything(self):
+        index = DependencyIndex()
+        index.add("a", ["x"])
+        index.add("b", None)
+        assert index.dependents(["y"]) == {"b"}
+        assert index.dependents(["x"]) == {"a", "b"}
+
+    def test_from_entries(self):
+        index = DependencyIndex.from_entries({
+            "a": {"depends_on": ["x"]},
+            "b": {"depends_on": []},
+        })
+        assert index.dependents(["x"]) == {"a"}
+
+
+
+class TestAnalyzeTemplate:
+    def test_classification(self):
+        template = DictTemplate("t", {}, {
+            "README.md.jinja": "plain",
+            "src/{{ pkg }}/main.py.jinja": "{{ version }}",
+            "LICENSE": "{{ not rendered }}",
+        })
+        analysis = analyze_template(template, Jinja2Templater())
+
+        readme = analysis.documents["README.md.jinja"]
+        assert readme.static_path and readme.static_body
+        main = analysis.documents["src/{{ pkg }}/main.py.jinja"]
+        assert not main.static_path and not main.static_body
+        assert main.required == {"pkg", "version"}
+        license_ = analysis.documents["LICENSE"]
+        assert license_.static_path and license_.static_body is None and license_.required == set()
+        assert analysis.missing_variables({"pkg": "x"}) == {"version": ["src/{{ pkg }}/main.py.jinja"]}
+        with pytest.raises(ValueError):
+            analysis.validate({})
+
+    def test_unchanged_sources_are_not_analysed_again(self):
+        template = DictTemplate("t", {}, {"a.txt.jinja": "{{ unchanged_value }}"})
+        templater = Jinja2Templater()
+        first = analyze_template(template, templater).documents["a.txt.jinja"]
+        with patch.object(Jinja2Templater, "find_required_variables") as find_required:
+            assert analyze_template(template, templater).documents["a.txt.jinja"] is first
+        find_required.assert_not_called()
+
+    def test_edited_source_is_analysed_again(self, temp_dir):
+        template_dir = temp_dir / "edited"
+        (template_dir / "template").mkdir(parents=True)
+        (template_dir / "template_properties.yaml").write_text("templater: jinja2\n")
+        source = template_dir / "template" / "a.txt.jinja"
+        source.write_text("{{ first_value }}")
+        templater = Jinja2Templater()
+        template = FilesystemTemplate("edited", str(template_dir))
+        assert set(analyze_template(template, templater).required_variables) == {"first_value"}
+        source.write_text("{{ second_value }}")
+        assert set(analyze_template(template, templater).required_variables) == {"second_value"}
+
+    def test_analysis_parse_is_reused_to_compile(self):
+        templater = Jinja2Templater()
+        source = "{{ parsed_once }} and {{ parsed_once | upper }}"
+        template = DictTemplate("t", {}, {"a.txt.jinja": source})
+        with patch.object(jinja2.Environment, "_parse", wraps=templater.environment()._parse) as parse:
+            analyze_template(template, templater)
+            assert templater._compile_source(source).render(parsed_once="x") == "x and X"
+        assert parse.call_count == 1
+
+    def test_conditional_use_is_optional(self, temp_dir):
+        template = DictTemplate("conditional", {"custom_variables": [{"name": "use_x", "default": "no"}]}, {
+            "out.txt.jinja": '{% if use_x == "yes" %}{{ x }}{% endif %}ok',
+        })
+        scaffold_project("proj", template=template, output_dir=str(temp_dir))
+        assert (temp_dir / "proj" / "out.txt").read_text() == "ok"
@@ -0,0 +1,147 @@
+import io
+import os
+import sys
+import tarfile
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from skaf.cli import get_filesystem_template
+from skaf.scaffold import scaffold_project
+from skaf.template_classes.archive_template import ArchiveTemplate, archive_suffix, archive_template_name
+
+
+def make_zip(template_dir: Path, archive_path: Path, prefix: str = "") -> Path:
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        for path in sorted(template_dir.rglob("*")):
+            if path.is_file():
+                archive.write(path, prefix + path.relative_to(template_dir).as_posix())
+    return archive_path
+
+
+def make_tar(template_dir: Path, archive_path: Path, mode: str = "w", prefix: str = "") -> Path:
+    with tarfile.open(archive_path, mode) as archive:
+        for path in sorted(template_dir.rglob("*")):
+            archive.add(path, prefix + path.relative_to(template_dir).as_posix(), recursive=False)
+    return archive_path
+
+
+@pytest.fixture(params=["zip", "tar", "tar.gz"])
+def archive_path(request, sample_template_dir, temp_dir) -> Path:
+    path = temp_dir / f"test_template.{request.param}"
+    if request.param == "zip":
+        return make_zip(sample_template_dir, path)
+    return make_tar(sample_template_dir, path, "w:gz" if request.param == "tar.gz" else "w")
+
+
+class TestArchiveTemplate:
+    def test_matches_directory(self, archive_path, filesystem_template):
+        template = ArchiveTemplate(None, archive_path)
+
+        assert template.template_name == "test_template"
+        assert template.properties == filesystem_template.properties
+        assert dict(template.documents()) == dict(filesystem_template.documents())
+        assert template.variables_helper({})["from_helper"] == "HelperValue"
+
+    def test_scaffold_from_archive(self, archive_path, temp_dir):
+        output_dir = temp_dir / "output"
+        template = get_filesystem_template(str(archive_path))
+        assert isinstance(template, ArchiveTemplate)
+        scaffold_project(project_name="archived", template=template, output_dir=str(output_dir))
+
+        project_dir = output_dir / "archived"
+        assert 'name = "archived"' in (project_dir / "pyproject.toml").read_text()
+        assert (project_dir / "src" / "archived" / "main.py").exists()
+
+    @pytest.mark.parametrize("kind", ["zip", "tar.gz"])
+    def test_top_level_directory(self, kind, sample_template_dir, temp_dir, filesystem_template):
+        path = temp_dir / f"wrapped.{kind}"
+        if kind == "zip":
+            make_zip(sample_template_dir, path, prefix="test_template/")
+        else:
+            make_tar(sample_template_dir, path, "w:gz", prefix="test_template/")
+        template = ArchiveTemplate(None, path)
+        assert template.template_name == "wrapped"
+        assert dict(template.documents()) == dict(filesystem_template.documents())
+
+    def test_zip_documents_are_read_lazily(self, sample_template_dir, temp_dir):
+        template = ArchiveTemplate(None, make_zip(sample_template_dir, temp_dir / "t.zip"))
+        with patch.object(template._zip, "read", wraps=template._zip.read) as read:
+            documents = list(template.iter_documents())
+            assert read.call_count == 0
+            documents[0].read_bytes()
+            assert read.call_count == 1
+
+    def test_tar_preserves_mode_and_symlinks(self, sample_template_dir, temp_dir):
+        script = sample_template_dir / "template" / "run.sh"
+        script.write_text("#!/bin/sh\n")
+        os.chmod(script, 0o755)
+        os.symlink("run.sh", sample_template_dir / "template" / "link.sh")
+        template = ArchiveTemplate(None, make_tar(sample_template_dir, temp_dir / "t.tar"))
+
+        scaffold_project(project_name="modes", template=template, output_dir=str(temp_dir / "out"))
+        project_dir = temp_dir / "out" / "modes"
+        assert (project_dir / "run.sh").stat().st_mode & 0o777 == 0o755
+        assert os.readlink(project_dir / "link.sh") == "run.sh"
+
+    def test_missing_properties(self, temp_dir):
+        path = temp_dir / "empty.zip"
+        with zipfile.ZipFile(path, "w") as archive:
+            archive.writestr("template/a.txt", "a")
+        with pytest.raises(FileNotFoundError):
+            ArchiveTemplate(None, path)
+
+    @pytest.mark.parametrize("name", ["template/../../evil.txt", "/template/evil.txt", "../evil.txt"])
+    def test_unsafe_member_names(self, sample_template_dir, temp_dir, name):
+        path = make_zip(sample_template_dir, temp_dir / "t.zip")
+        with zipfile.ZipFile(path, "a") as archive:
+            archive.writestr(name, "evil")
+        with pytest.raises(ValueError, match="points outside the template"):
+            ArchiveTemplate(None, path)
+
+    @pytest.mark.parametrize("mode", ["w", "w:gz"])
+    def test_symlink_outside_template(self, sample_template_dir, temp_dir, mode):
+        path = make_tar(sample_template_dir, temp_dir / ("t.tar" if mode == "w" else "t.tar.gz"), mode)
+        with tarfile.open(path, "r") as archive:
+            members = [(member, archive.extractfile(member).read() if member.isfile() else None) for member in archive]
+        link = tarfile.TarInfo("template/src/passwd")
+        link.type, link.linkname = tarfile.SYMTYPE, "../../../etc/passwd"
+        with tarfile.open(path, mode) as archive:
+            for member, data in [*members, (link, None)]:
+                archive.addfile(member, io.BytesIO(data) if data is not None else None)
+        with pytest.raises(ValueError, match="points outside the template"):
+            with ArchiveTemplate(None, path) as template:
+                # Compressed tarballs are checked as they are read.
+                list(template.iter_documents())
+
+    def test_close(self, archive_path):
+        with ArchiveTemplate(None, archive_path) as template:
+            assert dict(template.documents())
+        if template._zip is not None:
+            assert template._zip.fp is None
+        if template._tar is not None:
+            assert template._tar.closed
+
+    def test_zstd_requires_zstandard(self, sample_template_dir, temp_dir):
+        path = temp_dir / "t.tar.zst"
+        path.write_bytes(b"")
+        with patch.dict(sys.modules, {"zstandard": None}):
+            with pytest.raises(ImportError, match="zstandard"):
+                ArchiveTemplate(None, path)
+
+    def test_zstd(self, sample_template_dir, temp_dir, filesystem_template):
+        zstandard = pytest.importorskip("zstandard")
+        tar_path = make_tar(sample_template_dir, temp_dir / "t.tar")
+        path = temp_dir / "t.tar.zst"
+        path.write_bytes(zstandard.ZstdCompressor().compress(tar_path.read_bytes()))
+        template = ArchiveTemplate(None, path)
+        assert dict(template.documents()) == dict(filesystem_template.documents())
+
+    def test_suffixes(self):
+        assert archive_suffix("a/b.tar.gz") == ".tar.gz"
+        assert archive_suffix("b.TGZ") == ".tgz"
+        assert archive_suffix("b.tar") == ".tar"
+        assert archive_suffix("b.txt") is None
+        assert archive_template_name("/x/my_template.tar.zst") == "my_template"
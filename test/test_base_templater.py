@@ -31,3 +31,14 @@ class TestBaseTemplater:
         result = templater.render("test template", {"var": "value"})
         
         assert result == "Rendered: test template with {'var': 'value'}"
+
+    def test_abc_templater_default_compile_protocol(self):
+        class ConcreteTemplater(ABCTemplater):
+            def render(self, template, context, template_filename=None):
+                return template.format(**context)
+
+        templater = ConcreteTemplater()
+        compiled = templater.compile("{greeting}")
+        assert compiled == "{greeting}"
+        assert templater.render_compiled(compiled, {"greeting": "hi"}) == "hi"
+        assert templater.render_many(["{greeting}", "{greeting}!"], {"greeting": "hi"}) == ["hi", "hi!"]
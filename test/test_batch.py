@@ -0,0 +1,113 @@
+import json
+import sys
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from skaf.batch import iter_variable_sets, run_batch, detect_batch_format
+from skaf.cli import main
+from skaf.template_classes.dict_template import DictTemplate
+
+
+@pytest.fixture
+def service_template() -> DictTemplate:
+    return DictTemplate(
+        "service",
+        {
+            "custom_variables": [
+                {"name": "port", "type": "int"},
+                {"name": "owner", "type": "str", "default": "platform"},
+            ]
+        },
+        {"config.yaml.jinja": "name: {{ project_name }}\nport: {{ port }}\nowner: {{ owner }}"},
+    )
+
+
+class TestIterVariableSets:
+    def test_jsonl(self, temp_dir):
+        path = temp_dir / "sets.jsonl"
+        path.write_text('{"project_name": "a", "port": 1}\n\n{"project_name": "b", "port": 2}\n')
+        assert list(iter_variable_sets(path)) == [
+            {"project_name": "a", "port": 1},
+            {"project_name": "b", "port": 2},
+        ]
+
+    def test_yaml_documents_and_lists(self, temp_dir):
+        path = temp_dir / "sets.yaml"
+        path.write_text("project_name: a\n---\n- project_name: b\n- project_name: c\n")
+        assert [r["project_name"] for r in iter_variable_sets(path)] == ["a", "b", "c"]
+
+    def test_csv(self, temp_dir):
+        path = temp_dir / "sets.csv"
+        path.write_text("project_name,port\na,1\nb,2\n")
+        assert list(iter_variable_sets(path)) == [
+            {"project_name": "a", "port": "1"},
+            {"project_name": "b", "port": "2"},
+        ]
+
+    def test_is_streamed(self, temp_dir):
+        path = temp_dir / "sets.jsonl"
+        path.write_text('{"project_name": "a"}\nnot json\n')
+        records = iter_variable_sets(path)
+        assert next(records) == {"project_name": "a"}
+        with pytest.raises(json.JSONDecodeError):
+            next(records)
+
+    def test_unknown_format(self, temp_dir):
+        with pytest.raises(ValueError):
+            detect_batch_format(temp_dir / "sets.txt")
+
+
+class TestRunBatch:
+    @pytest.mark.parametrize("jobs", [1, 4])
+    def test_scaffolds_each_project(self, service_template, temp_dir, jobs):
+        variable_sets = [{"project_name": f"svc_{i}", "port": 8000 + i} for i in range(10)]
+        results = list(run_batch(service_template, variable_sets, temp_dir, jobs=jobs))
+
+        assert [r.project_name for r in results] == [f"svc_{i}" for i in range(10)]
+        assert all(r.ok for r in results)
+        assert (temp_dir / "svc_3" / "config.yaml").read_text() == "name: svc_3\nport: 8003\nowner: platform"
+
+    def test_reports_failures_per_project(self, service_template, temp_dir):
+        (temp_dir / "existing").mkdir()
+        (temp_dir / "existing" / "file.txt").touch()
+        variable_sets = [
+            {"project_name": "good", "port": 1},
+            {"project_name": "no_port"},
+            {"project_name": "existing", "port": 2},
+            {"port": 3},
+        ]
+        results = list(run_batch(service_template, variable_sets, temp_dir))
+
+        assert [r.ok for r in results] == [True, False, False, False]
+        assert results[1].error == "VariableError: No value provided for variable 'port'."
+        assert "already exists" in results[2].error
+        assert results[3].error == "Missing 'project_name' field."
+        assert not (temp_dir / "no_port").exists()
+
+
+class TestBatchCommand:
+    def test_batch_command(self, sample_template_dir, temp_dir, monkeypatch):
+        varsets = temp_dir / "sets.jsonl"
+        varsets.write_text('{"project_name": "one", "author": "A"}\n{"project_name": "two"}\n')
+        output = temp_dir / "out"
+        monkeypatch.setattr(sys, "argv", ["skaf", "batch", str(varsets), "-p", str(sample_template_dir), "-o", str(output), "-j", "2"])
+
+        with patch('builtins.print') as mock_print:
+            main()
+
+        mock_print.assert_any_call("ok      one")
+        mock_print.assert_any_call("ok      two")
+        mock_print.assert_any_call("Scaffolded 2 of 2 projects using the 'test_template' template (0 failed).")
+        assert "A project by A." in (output / "one" / "README.md").read_text()
+        assert "A project by Test Author." in (output / "two" / "README.md").read_text()
+
+    def test_batch_command_failure_exit_code(self, service_template, temp_dir, monkeypatch):
+        varsets = temp_dir / "sets.csv"
+        varsets.write_text("project_name\nbroken\n")
+        monkeypatch.setattr(sys, "argv", ["skaf", "batch", str(varsets), "-t", "service", "-o", str(temp_dir)])
+
+        with patch('skaf.cli.get_template', return_value=service_template), patch('builtins.print'):
+            with pytest.raises(SystemExit) as excinfo:
+                main()
+        assert excinfo.value.code == 1
@@ -0,0 +1,126 @@
+import os
+import pytest
+from pathlib import Path
+
+from skaf.cache import (
+    user_cache_dir,
+    cache_enabled,
+    disable_cache,
+    cache_stats,
+    clear_cache,
+    prune_directory,
+)
+from skaf.templaters.bytecode_cache import ContentHashBytecodeCache
+from skaf.templaters.jinja import Jinja2Templater
+
+
+class TestUserCache:
+    def test_user_cache_dir_from_env(self, monkeypatch, temp_dir):
+        monkeypatch.setenv("SKAF_CACHE_DIR", str(temp_dir / "explicit"))
+        assert user_cache_dir() == temp_dir / "explicit"
+
+    def test_user_cache_dir_from_xdg(self, monkeypatch, temp_dir):
+        monkeypatch.delenv("SKAF_CACHE_DIR")
+        monkeypatch.setenv("XDG_CACHE_HOME", str(temp_dir))
+        assert user_cache_dir() == temp_dir / "skaf"
+
+    def test_disable_cache(self):
+        assert cache_enabled()
+        disable_cache()
+        assert not cache_enabled()
+
+    def test_stats_and_clear(self, monkeypatch, temp_dir):
+        monkeypatch.setenv("SKAF_CACHE_DIR", str(temp_dir))
+        (temp_dir / "bytecode").mkdir()
+        (temp_dir / "bytecode" / "a.cache").write_bytes(b"1234")
+        (temp_dir / "other").mkdir()
+        assert cache_stats() == {"bytecode": (1, 4), "other": (0, 0)}
+        (temp_dir / "renders").mkdir()
+        assert clear_cache(["bytecode", "renders"]) == ["bytecode", "renders"]
+        assert not (temp_dir / "bytecode").exists()
+        assert clear_cache() == ["other"]
+
+    def test_clear_rejects_paths_outside_the_cache(self, monkeypatch, temp_dir):
+        root = temp_dir / "cache"
+        (root / "bytecode").mkdir(parents=True)
+        (temp_dir / "precious").mkdir()
+        monkeypatch.setenv("SKAF_CACHE_DIR", str(root))
+        for name in ("../precious", "..", "/tmp", "bytecode/..", "precious"):
+            with pytest.raises(ValueError, match="not a cache area"):
+                clear_cache([name])
+        # Nothing is removed when any name is rejected.
+        with pytest.raises(ValueError):
+            clear_cache(["bytecode", "../precious"])
+        assert (temp_dir / "precious").is_dir()
+        assert (root / "bytecode").is_dir()
+
+    def test_cli_clear_reports_invalid_names(self, monkeypatch, temp_dir, capsys):
+        from skaf.cli import cache_main
+        monkeypatch.setenv("SKAF_CACHE_DIR", str(temp_dir / "cache"))
+        (temp_dir / "precious").mkdir()
+        with pytest.raises(SystemExit) as exit_info:
+            cache_main(["clear", "../precious"])
+        assert exit_info.value.code == 1
+        assert "'../precious' is not a cache area" in capsys.readouterr().out
+        assert (temp_dir / "precious").is_dir()
+
+    def test_prune_directory_removes_oldest(self, temp_dir):
+        for i, name in enumerate(["old", "mid", "new"]):
+            path = temp_dir / name
+            path.write_bytes(b"x" * 10)
+            os.utime(path, ns=(i * 10**9, i * 10**9))
+        remaining = prune_directory(temp_dir, 20)
+        assert remaining == 20
+        assert sorted(p.name for p in temp_dir.iterdir()) == ["mid", "new"]
+
+
+class TestBytecodeCache:
+    def test_bytecode_persisted_and_reused(self, temp_dir):
+        bytecode_cache = ContentHashBytecodeCache(temp_dir / "bytecode")
+
+        class CachedTemplater(Jinja2Templater):
+            environment_parameters = {**Jinja2Templater.environment_parameters, "bytecode_cache": bytecode_cache}
+
+        source = "Hello {{ name }} from the bytecode cache"
+        CachedTemplater.reset_environment()
+        assert CachedTemplater().render(source, {"name": "A"}) == "Hello A from the bytecode cache"
+        cached_files = list((temp_dir / "bytecode").iterdir())
+        assert len(cached_files) == 1
+
+        CachedTemplater.reset_environment()
+        environment = CachedTemplater.environment()
+        bucket = bytecode_cache.get_bucket(environment, "unused", None, source)
+        assert bucket.code is None  # keyed by content hash, not by name
+        assert CachedTemplater().render(source, {"name": "B"}) == "Hello B from the bytecode cache"
+        assert list((temp_dir / "bytecode").iterdir()) == cached_files
+        CachedTemplater.reset_environment()
+
+    def test_bytecode_cache_evicts_when_over_size(self, temp_dir):
+        bytecode_cache = ContentHashBytecodeCache(temp_dir / "bytecode", max_bytes=1)
+
+        class TinyCacheTemplater(Jinja2Templater):
+            environment_parameters = {**Jinja2Templater.environment_parameters, "bytecode_cache": bytecode_cache}
+
+        TinyCacheTemplater.reset_environment()
+        TinyCacheTemplater().render("first {{ a }}", {"a": 1})
+        TinyCacheTemplater().render("second {{ a }}", {"a": 2})
+        assert len(list((temp_dir / "bytecode").iterdir())) <= 1
+        TinyCacheTemplater.reset_environment()
+
+    def test_default_environment_uses_user_cache(self, isolated_user_cache):
+        Jinja2Templater.reset_environment()
+        try:
+            Jinja2Templater().render("default {{ a }}", {"a": 1})
+            directory = Jinja2Templater.environment().bytecode_cache.directory
+            assert directory.parent == isolated_user_cache / "bytecode"
+            assert any(directory.iterdir())
+        finally:
+            Jinja2Templater.reset_environment()
+
+    def test_no_cache_environment(self):
+        Jinja2Templater.reset_environment()
+        disable_cache()
+        try:
+            assert Jinja2Templater.environment().bytecode_cache is None
+        finally:
+            Jinja2Templater.reset_environment()
@@ -86,8 +86,16 @@ class TestMain:
         mock_args.auto_use_defaults = None
         mock_args.debug = False
         mock_args.no_project_dir = False
+        mock_args.executor = None
+        mock_args.jobs = None
+        mock_args.link_static = "copy"
+        mock_args.manifest = False
+        mock_args.output_format = None
+        mock_args.render_cache = None
+        mock_args.dedup = None
         mock_get_args.return_value = mock_args
         mock_args.git = None
+        mock_scaffold.return_value = None
         
         # Call function
         with patch('builtins.print') as mock_print:
@@ -103,6 +111,14 @@ class TestMain:
             template=None,
             auto_use_defaults=None,
             varfile=None,
+            executor=None,
+            jobs=None,
+            link_static="copy",
+            manifest=False,
+            output_sink=None,
+            output_stream=None,
+            render_cache=None,
+            dedup=None,
             _debug = False
         )
         mock_print.assert_called_once_with(
@@ -125,11 +141,19 @@ class TestMain:
         mock_args.git = None
         mock_args.varfile = None
         mock_args.no_project_dir = False
+        mock_args.executor = None
+        mock_args.jobs = None
+        mock_args.link_static = "copy"
+        mock_args.manifest = False
+        mock_args.output_format = None
+        mock_args.render_cache = None
+        mock_args.dedup = None
         mock_get_args.return_value = mock_args
         
         mock_template = MagicMock()
         mock_template.template_name = 'custom_template'
         mock_get_template.return_value = mock_template
+        mock_scaffold.return_value = None
         
         # Call function
         with patch('builtins.print') as mock_print:
@@ -146,6 +170,14 @@ class TestMain:
             template=mock_template,
             auto_use_defaults=True,
             varfile=None,
+            executor=None,
+            jobs=None,
+            link_static="copy",
+            manifest=False,
+            output_sink=None,
+            output_stream=None,
+            render_cache=None,
+            dedup=None,
             _debug=False
         )
         mock_print.assert_called_once_with(
@@ -166,6 +198,13 @@ class TestMain:
         mock_args.debug = False
         mock_args.varfile = None
         mock_args.no_project_dir = False
+        mock_args.executor = None
+        mock_args.jobs = None
+        mock_args.link_static = "copy"
+        mock_args.manifest = False
+        mock_args.output_format = None
+        mock_args.render_cache = None
+        mock_args.dedup = None
         mock_get_args.return_value = mock_args
         mock_args.git = None
         
@@ -196,6 +235,13 @@ class TestMain:
         mock_args.debug = True
         mock_args.varfile = None
         mock_args.no_project_dir = False
+        mock_args.executor = None
+        mock_args.jobs = None
+        mock_args.link_static = "copy"
+        mock_args.manifest = False
+        mock_args.output_format = None
+        mock_args.render_cache = None
+        mock_args.dedup = None
         mock_get_args.return_value = mock_args
         mock_args.git = None
         
@@ -206,3 +252,60 @@ class TestMain:
             main()
         
         assert "Test error" in str(excinfo.value)
+
+
+class TestCacheCommand:
+
+    def test_cache_stats(self, monkeypatch, temp_dir):
+        monkeypatch.setenv("SKAF_CACHE_DIR", str(temp_dir))
+        (temp_dir / "bytecode").mkdir()
+        (temp_dir / "bytecode" / "entry.cache").write_bytes(b"x" * 2048)
+        monkeypatch.setattr(sys, "argv", ["skaf", "cache", "stats"])
+
+        with patch('builtins.print') as mock_print:
+            main()
+
+        mock_print.assert_any_call(f"Cache directory: {temp_dir}")
+        mock_print.assert_any_call("bytecode: 1 files, 2.0 KiB")
+
+    def test_cache_clear(self, monkeypatch, temp_dir):
+        monkeypatch.setenv("SKAF_CACHE_DIR", str(temp_dir))
+        (temp_dir / "bytecode").mkdir()
+        monkeypatch.setattr(sys, "argv", ["skaf", "cache", "clear"])
+
+        with patch('builtins.print') as mock_print:
+            main()
+
+        mock_print.assert_called_once_with("Cleared cache: bytecode")
+        assert not (temp_dir / "bytecode").exists()
+
+
+class TestSubcommandNames:
+
+    @pytest.mark.parametrize("argv", [["-o", "{out}", "-p", "{template}", "cache"],
+                                      ["-o", "{out}", "-p", "{template}", "--", "list"]])
+    def test_project_named_like_a_subcommand(self, argv, monkeypatch, sample_template_dir, temp_dir):
+        out = temp_dir / "out"
+        argv = [arg.format(out=out, template=sample_template_dir) for arg in argv]
+        monkeypatch.setattr(sys, "argv", ["skaf", "--auto-use-defaults", *argv])
+        main()
+        assert (out / argv[-1] / "pyproject.toml").exists()
+
+
+class TestListCommand:
+
+    @patch('skaf.cli.available_templates', return_value=("alpha", "beta"))
+    @patch('skaf.cli.get_template')
+    def test_list_does_not_load_templates(self, mock_get_template, mock_available_templates, monkeypatch):
+        monkeypatch.setattr(sys, "argv", ["skaf", "list"])
+
+        with patch('builtins.print') as mock_print:
+            main()
+
+        mock_get_template.assert_not_called()
+        assert [c.args for c in mock_print.call_args_list] == [("alpha",), ("beta",)]
+
+    def test_list_includes_packaged_templates(self, monkeypatch, capsys):
+        monkeypatch.setattr(sys, "argv", ["skaf", "list"])
+        main()
+        assert "setuptools_pyproject" in capsys.readouterr().out.split()
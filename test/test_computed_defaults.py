@@ -0,0 +1,119 @@
+import sys
+import time
+
+import pytest
+
+from skaf.scaffold import Scaffolder
+from skaf.scaffold.computed_defaults import compute_default, resolve_computed_defaults
+from skaf.template_classes.dict_template import DictTemplate
+
+
+def python_command(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+def counting_command(counter_file, output: str) -> list[str]:
+    return python_command(f"open({str(counter_file)!r}, 'a').write('x'); print({output!r})")
+
+
+class TestComputeDefault:
+    def test_command(self):
+        assert compute_default({"command": python_command("print(' 3.11 ')")}) == "3.11"
+
+    def test_command_string(self):
+        assert compute_default({"command": f"{sys.executable} -c 'print(42)'"}) == "42"
+
+    def test_failing_command(self):
+        assert compute_default({"command": python_command("raise SystemExit(1)")}) is None
+        assert compute_default({"command": ["skaf-no-such-command"]}) is None
+
+    def test_callable(self):
+        assert compute_default({"callable": "platform:python_version"}) == sys.version.split()[0]
+
+    def test_env(self, monkeypatch):
+        monkeypatch.setenv("COMPUTED_DEFAULT_TEST", "from env")
+        assert compute_default({"env": "COMPUTED_DEFAULT_TEST"}) == "from env"
+
+    def test_invalid_spec(self):
+        with pytest.raises(ValueError, match="exactly one"):
+            compute_default({"env": "A", "command": "true"})
+
+
+class TestResolveComputedDefaults:
+    def test_resolved_concurrently(self, request):
+        custom_variables = [
+            {"name": f"slow_{i}", "computed_default": {"command": python_command(f"import time; time.sleep(0.5); print({i})")}}
+            for i in range(4)
+        ]
+        started = time.perf_counter()
+        values = resolve_computed_defaults(request.node.nodeid, custom_variables)
+        assert time.perf_counter() - started < 1.5
+        assert values == {f"slow_{i}": str(i) for i in range(4)}
+
+    def test_cached_until_ttl(self, request, temp_dir):
+        counter = temp_dir / "count"
+        custom_variables = [{"name": "v", "computed_default": {"command": counting_command(counter, "value")}}]
+        for _ in range(3):
+            assert resolve_computed_defaults(request.node.nodeid, custom_variables) == {"v": "value"}
+        assert counter.read_text() == "x"
+
+    def test_zero_ttl_is_not_cached(self, request, temp_dir):
+        counter = temp_dir / "count"
+        custom_variables = [{"name": "v", "computed_default": {"command": counting_command(counter, "value"), "ttl": 0}}]
+        resolve_computed_defaults(request.node.nodeid, custom_variables)
+        resolve_computed_defaults(request.node.nodeid, custom_variables)
+        assert counter.read_text() == "xx"
+
+    def test_cached_across_processes(self, request, temp_dir, monkeypatch):
+        counter = temp_dir / "count"
+        custom_variables = [{"name": "v", "computed_default": {"command": counting_command(counter, "value")}}]
+        resolve_computed_defaults(request.node.nodeid, custom_variables)
+        # A new process starts with an empty in-memory cache.
+        monkeypatch.setattr("skaf.scaffold.computed_defaults._memory_cache", {})
+        assert resolve_computed_defaults(request.node.nodeid, custom_variables) == {"v": "value"}
+        assert counter.read_text() == "x"
+
+    def test_failures_are_left_out(self, request):
+        custom_variables = [{"name": "v", "computed_default": {"command": python_command("raise SystemExit(1)")}}]
+        assert resolve_computed_defaults(request.node.nodeid, custom_variables) == {}
+
+
+class TestComputedDefaultPrecedence:
+    @pytest.fixture
+    def template(self, request) -> DictTemplate:
+        return DictTemplate(
+            request.node.nodeid,
+            {
+                "custom_variables": [
+                    {"name": "email", "default": "static@example.com",
+                     "computed_default": {"command": python_command("print('computed@example.com')")}},
+                    {"name": "port", "type": "int", "computed_default": {"env": "COMPUTED_PORT"}, "default": 80},
+                ]
+            },
+            {"out.txt.jinja": "{{ email }} {{ port }}"},
+        )
+
+    def test_computed_default_beats_static_default(self, template, temp_dir, monkeypatch):
+        monkeypatch.setenv("COMPUTED_PORT", "8080")
+        Scaffolder(template).scaffold("proj", {}, temp_dir)
+        assert (temp_dir / "proj" / "out.txt").read_text() == "computed@example.com 8080"
+
+    def test_static_default_when_not_computed(self, template, temp_dir, monkeypatch):
+        monkeypatch.delenv("COMPUTED_PORT", raising=False)
+        Scaffolder(template).scaffold("proj", {}, temp_dir)
+        assert (temp_dir / "proj" / "out.txt").read_text() == "computed@example.com 80"
+
+    def test_env_and_varfile_beat_computed_default(self, template, temp_dir, monkeypatch):
+        monkeypatch.setenv("SKAF_email", "env@example.com")
+        monkeypatch.setenv("COMPUTED_PORT", "8080")
+        Scaffolder(template).scaffold("proj", {"port": 1}, temp_dir)
+        assert (temp_dir / "proj" / "out.txt").read_text() == "env@example.com 1"
+
+    def test_prompt_offers_computed_default(self, template, temp_dir, monkeypatch):
+        from skaf.scaffold import scaffold_project
+        prompts = []
+        monkeypatch.setattr("builtins.input", lambda prompt: prompts.append(prompt) or "")
+        monkeypatch.setenv("COMPUTED_PORT", "8080")
+        scaffold_project("proj", template=template, output_dir=str(temp_dir), auto_use_defaults=False)
+        assert prompts[0] == "Enter value for email (str) [computed@example.com]: "
+        assert (temp_dir / "proj" / "out.txt").read_text() == "computed@example.com 8080"
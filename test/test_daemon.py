@@ -0,0 +1,117 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from skaf.daemon import daemon_request, environment_fingerprint, serve_daemon
+
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "send_fds"), reason="requires Unix socket descriptor passing")
+
+FORWARD = (
+    "import sys\n"
+    "from skaf.daemon import forward_to_daemon\n"
+    "code = forward_to_daemon(sys.argv[1:])\n"
+    "print(f'forwarded={code}', file=sys.stderr)\n"
+)
+
+
+@pytest.fixture
+def daemon_env(temp_dir):
+    env = dict(os.environ)
+    env.pop("SKAF_NO_DAEMON", None)
+    env["SKAF_DAEMON_SOCKET"] = str(temp_dir / "d.sock")
+    return env
+
+
+@pytest.fixture
+def daemon(daemon_env, temp_dir):
+    process = subprocess.Popen(
+        [sys.executable, "-c", "from skaf.cli import main; main()", "daemon", "--quiet"],
+        env=daemon_env, cwd=temp_dir,
+    )
+    socket_path = temp_dir / "d.sock"
+    deadline = time.monotonic() + 30
+    while daemon_request("status", socket_path) is None:
+        assert process.poll() is None, "the daemon exited"
+        assert time.monotonic() < deadline, "the daemon did not start"
+        time.sleep(0.05)
+    try:
+        yield socket_path
+    finally:
+        daemon_request("stop", socket_path)
+        process.wait(timeout=10)
+        assert not socket_path.exists()
+
+
+def run(args, env, cwd, input=None, code=FORWARD):
+    return subprocess.run([sys.executable, "-c", code, *args], env=env, cwd=cwd,
+                          input=input, capture_output=True, text=True, timeout=30)
+
+
+class TestDaemon:
+    def test_status(self, daemon):
+        reply = daemon_request("status", daemon)
+        assert "setuptools_pyproject" in reply["templates"]
+        assert reply["socket"] == str(daemon)
+
+    def test_forwards_output_and_exit_code(self, daemon, daemon_env, temp_dir):
+        result = run(["list"], daemon_env, temp_dir)
+        assert "forwarded=0" in result.stderr
+        assert "setuptools_pyproject" in result.stdout
+
+        result = run(["proj", "-t", "missing_template"], daemon_env, temp_dir)
+        assert "forwarded=1" in result.stderr
+        assert "Template 'missing_template' not found" in result.stdout
+
+    def test_prompts_use_client_stdin(self, daemon, daemon_env, sample_template_dir, temp_dir):
+        (sample_template_dir / "template_properties.yaml").write_text(
+            "custom_variables:\n  - name: author\n    type: str\n  - name: version\n    type: str\n"
+        )
+        result = run(["proj", "-p", str(sample_template_dir), "-o", "out"], daemon_env, temp_dir, input="Ada\n1.0\n")
+        assert "forwarded=0" in result.stderr
+        assert "Enter value for author" in result.stdout
+        assert "A project by Ada." in (temp_dir / "out" / "proj" / "README.md").read_text()
+
+    def test_falls_back_when_environment_differs(self, daemon, daemon_env, temp_dir):
+        daemon_env["SKAF_TEMPLATER"] = "pystring"
+        assert "forwarded=None" in run(["list"], daemon_env, temp_dir).stderr
+
+    def test_falls_back_when_installation_differs(self, daemon, daemon_env, temp_dir):
+        code = "import skaf.daemon\nskaf.daemon.runtime_fingerprint = lambda: {'skaf': 'other'}\n" + FORWARD
+        assert "forwarded=None" in run(["list"], daemon_env, temp_dir, code=code).stderr
+
+    def test_refuses_socket_in_shared_directory(self, daemon, daemon_env, temp_dir):
+        os.chmod(temp_dir, 0o755)
+        try:
+            assert "forwarded=None" in run(["list"], daemon_env, temp_dir).stderr
+        finally:
+            os.chmod(temp_dir, 0o700)
+        assert "forwarded=0" in run(["list"], daemon_env, temp_dir).stderr
+
+    def test_main_runs_in_process_without_daemon(self, daemon_env, temp_dir):
+        result = run(["list"], daemon_env, temp_dir, code="from skaf.cli import main; main()")
+        assert result.returncode == 0
+        assert "setuptools_pyproject" in result.stdout
+        assert "forwarded=None" in run(["list"], daemon_env, temp_dir).stderr
+
+    def test_no_daemon_env_var(self, daemon, daemon_env, temp_dir):
+        daemon_env["SKAF_NO_DAEMON"] = "1"
+        assert "forwarded=None" in run(["list"], daemon_env, temp_dir).stderr
+
+
+def test_serve_refuses_shared_directory(temp_dir):
+    shared = temp_dir / "shared"
+    shared.mkdir(mode=0o777)
+    os.chmod(shared, 0o777)
+    with pytest.raises(PermissionError, match="mode 0700"):
+        serve_daemon(shared / "d.sock", warm=False, quiet=True)
+    assert not (shared / "d.sock").exists()
+
+
+def test_environment_fingerprint():
+    env = {"SKAF_TEMPLATER": "jinja2", "SKAF_DAEMON_SOCKET": "/s", "SKAF_NO_DAEMON": "", "PATH": "/bin", "HOME": "/h"}
+    assert environment_fingerprint(env) == {"HOME": "/h", "SKAF_TEMPLATER": "jinja2"}
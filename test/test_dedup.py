@@ -0,0 +1,133 @@
+import os
+import zipfile
+from unittest.mock import patch
+
+import pytest
+
+from skaf.batch import run_batch
+from skaf.scaffold import Deduplicator, Scaffolder, scaffold_project
+from skaf.template_classes.dict_template import DictTemplate
+from skaf.template_classes.filesystem_template import FilesystemTemplate
+
+
+LICENSE = "MIT License\n\nCopyright {{ author }}\n" * 20
+
+
+@pytest.fixture
+def template(request) -> DictTemplate:
+    return DictTemplate(
+        request.node.nodeid,
+        {"custom_variables": [{"name": "author", "default": "Jane"}]},
+        {
+            "LICENSE.jinja": LICENSE,
+            "docs/LICENSE.jinja": LICENSE,
+            "README.md.jinja": "# {{ project_name }}\n",
+            "ci.yml": "static: true\n",
+        },
+    )
+
+
+def inode(path) -> int:
+    return os.stat(path).st_ino
+
+
+def only_readme_rendered():
+    def render(document, variables, templater, filename=None):
+        if filename != "README.md.jinja":
+            raise AssertionError(f"rendered {filename}")
+        return templater.render(document, variables)
+    return patch("skaf.scaffold.scaffold.apply_templating", side_effect=render)
+
+
+class TestDeduplicator:
+    def test_repeats_within_a_project_are_linked(self, template, temp_dir):
+        dedup = Deduplicator("hardlink")
+        scaffold_project("proj", template=template, output_dir=str(temp_dir), dedup=dedup)
+        project = temp_dir / "proj"
+        assert inode(project / "LICENSE") == inode(project / "docs" / "LICENSE")
+        assert (project / "docs" / "LICENSE").read_text().startswith("MIT License\n\nCopyright Jane")
+        assert dedup.files == 1
+        assert dedup.bytes_saved == len((project / "LICENSE").read_bytes())
+
+    def test_repeats_across_projects_are_rendered_once(self, template, temp_dir):
+        scaffolder = Scaffolder(template, dedup="hardlink")
+        scaffolder.scaffold("one", {}, temp_dir)
+        with only_readme_rendered():
+            scaffolder.scaffold("two", {}, temp_dir)
+        assert inode(temp_dir / "two" / "LICENSE") == inode(temp_dir / "one" / "LICENSE")
+        assert (temp_dir / "two" / "README.md").read_text() == "# two"
+        assert scaffolder.deduplicator.files == 3
+
+    def test_different_values_are_not_shared(self, template, temp_dir):
+        scaffolder = Scaffolder(template, dedup="hardlink")
+        scaffolder.scaffold("one", {}, temp_dir)
+        scaffolder.scaffold("two", {"author": "Joe"}, temp_dir)
+        assert inode(temp_dir / "two" / "LICENSE") != inode(temp_dir / "one" / "LICENSE")
+        assert "Copyright Joe" in (temp_dir / "two" / "LICENSE").read_text()
+
+    def test_different_modes_are_not_linked(self, temp_dir):
+        template_dir = temp_dir / "template_dir"
+        (template_dir / "template").mkdir(parents=True)
+        (template_dir / "template_properties.yaml").write_text("templater: jinja2\n")
+        for name, mode in (("a.sh.jinja", 0o755), ("b.sh.jinja", 0o644)):
+            (template_dir / "template" / name).write_text("echo {{ project_name }}")
+            os.chmod(template_dir / "template" / name, mode)
+        template = FilesystemTemplate("modes", str(template_dir))
+        scaffold_project("proj", template=template, output_dir=str(temp_dir), dedup="hardlink")
+        project = temp_dir / "proj"
+        assert inode(project / "a.sh") != inode(project / "b.sh")
+        assert os.stat(project / "a.sh").st_mode & 0o777 == 0o755
+        assert os.stat(project / "b.sh").st_mode & 0o777 == 0o644
+
+    def test_copy_mode(self, template, temp_dir):
+        dedup = Deduplicator("copy")
+        scaffold_project("proj", template=template, output_dir=str(temp_dir), dedup=dedup)
+        project = temp_dir / "proj"
+        assert inode(project / "LICENSE") != inode(project / "docs" / "LICENSE")
+        assert (project / "LICENSE").read_text() == (project / "docs" / "LICENSE").read_text()
+        assert dedup.files == 1
+
+    def test_overwriting_a_linked_file_leaves_its_twin(self, template, temp_dir):
+        scaffolder = Scaffolder(template, dedup="hardlink")
+        scaffolder.scaffold("one", {}, temp_dir)
+        scaffolder.scaffold("two", {}, temp_dir)
+        scaffolder.scaffold("two", {"author": "Joe"}, temp_dir, overwrite=True)
+        assert "Copyright Jane" in (temp_dir / "one" / "LICENSE").read_text()
+        assert "Copyright Joe" in (temp_dir / "two" / "LICENSE").read_text()
+
+    def test_archives_are_written_in_full(self, template, temp_dir):
+        dedup = Deduplicator("hardlink")
+        scaffold_project("proj", template=template, output_dir=str(temp_dir / "proj.zip"), dedup=dedup)
+        with zipfile.ZipFile(temp_dir / "proj.zip") as archive:
+            assert archive.read("proj/LICENSE") == archive.read("proj/docs/LICENSE")
+        assert dedup.files == 0
+
+    def test_batch(self, template, temp_dir):
+        scaffolder = Scaffolder(template, dedup="hardlink")
+        results = list(run_batch(scaffolder, [{"project_name": f"pkg{i}"} for i in range(5)], temp_dir, jobs=2))
+        assert all(result.ok for result in results)
+        assert len({inode(temp_dir / f"pkg{i}" / "LICENSE") for i in range(5)}) == 1
+        assert scaffolder.deduplicator.files == 9
+
+    def test_remembered_outputs_are_bounded(self, template, temp_dir):
+        dedup = Deduplicator("hardlink", maxsize=2)
+        for i in range(4):
+            scaffold_project(f"proj{i}", template=template, output_dir=str(temp_dir), dedup=dedup,
+                             variables={"author": f"Author {i}"})
+        assert len(dedup._written) == len(dedup._written_paths) == 2
+        assert len(dedup._digests) == 2
+        assert not dedup._rendered
+        assert set(dedup._written_paths) == set(dedup._written.values())
+
+    def test_evicted_output_is_written_again(self, template, temp_dir):
+        scaffolder = Scaffolder(template, dedup="hardlink")
+        scaffolder.deduplicator.maxsize = 1
+        scaffolder.scaffold("one", {}, temp_dir)
+        scaffolder.scaffold("two", {}, temp_dir)
+        assert inode(temp_dir / "two" / "LICENSE") != inode(temp_dir / "one" / "LICENSE")
+        assert (temp_dir / "two" / "LICENSE").read_text() == (temp_dir / "one" / "LICENSE").read_text()
+        assert inode(temp_dir / "two" / "LICENSE") == inode(temp_dir / "two" / "docs" / "LICENSE")
+
+    def test_invalid_link_mode(self):
+        with pytest.raises(ValueError, match="Link mode"):
+            Deduplicator("symlink")
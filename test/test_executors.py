@@ -0,0 +1,71 @@
+import pytest
+from pathlib import Path
+
+from skaf.scaffold.executors import resolve_executor
+from skaf.scaffold.scaffold import scaffold_project
+from skaf.template_classes.dict_template import DictTemplate
+
+
+def _template(count: int = 20, failing: tuple[int, ...] = ()) -> DictTemplate:
+    templates = {"static.txt": "{{ untouched }}"}
+    for i in range(count):
+        # Failures only surface while rendering, past the up-front variable validation.
+        body = "{{ [][%d] }}" % i if i in failing else "module %d of {{ project_name }}" % i
+        templates[f"pkg/mod_{i}.py.jinja"] = body
+    return DictTemplate("generated", {"custom_variables": []}, templates)
+
+
+class TestResolveExecutor:
+    def test_defaults(self):
+        assert resolve_executor(None, None) == ("serial", 1)
+        assert resolve_executor(None, 1) == ("serial", 1)
+        assert resolve_executor(None, 4) == ("thread", 4)
+        assert resolve_executor("process", 2) == ("process", 2)
+        assert resolve_executor("serial", 8) == ("serial", 1)
+        assert resolve_executor("thread", None)[1] >= 1
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            resolve_executor("gpu", 2)
+        with pytest.raises(ValueError):
+            resolve_executor("thread", 0)
+
+
+class TestParallelScaffold:
+    @pytest.mark.parametrize("executor", ["serial", "thread", "process"])
+    def test_executors_render_identically(self, executor, temp_dir):
+        scaffold_project(
+            project_name="proj",
+            template=_template(),
+            output_dir=str(temp_dir),
+            executor=executor,
+            jobs=3,
+        )
+        project_dir = temp_dir / "proj"
+        assert (project_dir / "static.txt").read_text() == "{{ untouched }}"
+        for i in range(20):
+            assert (project_dir / "pkg" / f"mod_{i}.py").read_text() == f"module {i} of proj"
+
+    @pytest.mark.parametrize("executor", ["serial", "thread", "process"])
+    def test_first_failing_document_is_reported(self, executor, temp_dir):
+        with pytest.raises(RuntimeError) as excinfo:
+            scaffold_project(
+                project_name="proj",
+                template=_template(failing=(7, 15)),
+                output_dir=str(temp_dir),
+                executor=executor,
+                jobs=4,
+            )
+        assert str(excinfo.value) == "Error applying templating in 'pkg/mod_7.py.jinja': list object has no element 7"
+
+    @pytest.mark.parametrize("executor", ["serial", "thread", "process"])
+    def test_streamed_failure_names_the_document(self, executor, temp_dir):
+        with pytest.raises(RuntimeError, match="in 'pkg/mod_3.py.jinja'"):
+            scaffold_project(
+                project_name="proj",
+                template=_template(count=5, failing=(3,)),
+                output_dir=str(temp_dir),
+                executor=executor,
+                jobs=2,
+                stream_threshold=0,
+            )
@@ -0,0 +1,192 @@
+import pytest
+from pathlib import Path
+
+from conftest import commit_file
+from skaf.template_classes.git_cache import GitMirrorCache, GitCacheError, split_git_ref
+from skaf.template_classes.git_template import GitTemplate
+
+
+class TestSplitGitRef:
+    @pytest.mark.parametrize("uri, expected", [
+        ("https://github.com/org/repo.git", ("https://github.com/org/repo.git", None)),
+        ("https://github.com/org/repo.git@v1.2", ("https://github.com/org/repo.git", "v1.2")),
+        ("https://host/repo@feature/x", ("https://host/repo", "feature/x")),
+        ("git@github.com:org/repo.git", ("git@github.com:org/repo.git", None)),
+        ("git@github.com:org/repo.git@main", ("git@github.com:org/repo.git", "main")),
+        ("ssh://git@host/repo.git", ("ssh://git@host/repo.git", None)),
+        ("file:///tmp/repo@abc123", ("file:///tmp/repo", "abc123")),
+        ("/tmp/repo@main", ("/tmp/repo", "main")),
+    ])
+    def test_split(self, uri, expected):
+        assert split_git_ref(uri) == expected
+
+
+class TestGitMirrorCache:
+    def test_checkout_extracts_tree_once(self, git_template_repo, temp_dir):
+        cache = GitMirrorCache(temp_dir / "git_cache")
+        uri = git_template_repo.as_uri()
+
+        tree = cache.checkout(uri)
+        assert (tree / "template_properties.yaml").exists()
+        assert (tree / "template" / "README.md.jinja").exists()
+        assert cache.mirror_path(uri).is_dir()
+        assert cache.checkout(uri, offline=True) == tree
+
+    def test_fetches_new_commits_incrementally(self, git_template_repo, temp_dir):
+        cache = GitMirrorCache(temp_dir / "git_cache")
+        uri = git_template_repo.as_uri()
+        first = cache.resolve(uri)
+
+        new_sha = commit_file(git_template_repo, "template/NEW.md", "new")
+
+        assert cache.resolve(uri, offline=True) == first
+        assert cache.resolve(uri) == new_sha
+        assert (cache.checkout(uri) / "template" / "NEW.md").read_text() == "new"
+        assert cache.resolve(uri, "v1") == first
+
+    def test_known_sha_is_served_without_remote(self, git_template_repo, temp_dir):
+        cache = GitMirrorCache(temp_dir / "git_cache")
+        uri = git_template_repo.as_uri()
+        sha = cache.resolve(uri)
+        tree = cache.checkout(uri, sha)
+        assert cache.checkout("file:///does/not/exist", sha, offline=True) == tree
+
+    def test_offline_without_mirror(self, temp_dir):
+        cache = GitMirrorCache(temp_dir / "git_cache")
+        with pytest.raises(GitCacheError):
+            cache.resolve("file:///does/not/exist", offline=True)
+
+    def test_mirror_follows_remote_default_branch(self, git_template_repo, temp_dir):
+        from git import Repo
+
+        cache = GitMirrorCache(temp_dir / "git_cache")
+        uri = git_template_repo.as_uri()
+        cache.resolve(uri)
+        repo = Repo(git_template_repo)
+        repo.git.checkout("-b", "next")
+        new_sha = commit_file(git_template_repo, "template/NEW.md", "new")
+        repo.git.checkout("main")
+        repo.git.symbolic_ref("HEAD", "refs/heads/next")
+
+        assert cache.resolve(uri) == new_sha
+        assert cache.resolve(uri, "main") != new_sha
+
+    def test_unknown_ref(self, git_template_repo, temp_dir):
+        cache = GitMirrorCache(temp_dir / "git_cache")
+        with pytest.raises(GitCacheError):
+            cache.resolve(git_template_repo.as_uri(), "no-such-branch")
+
+
+class TestGitTemplate:
+    def test_cached_git_template(self, git_template_repo):
+        template = GitTemplate("repo", git_template_repo.as_uri())
+        assert template.properties["templater"] == "jinja2"
+        assert template.variables_helper({})["from_helper"] == "HelperValue"
+        paths = {relpath for relpath, _ in template.documents()}
+        assert "src/{{ project_name }}/main.py" in paths
+
+    def test_ref_in_uri(self, git_template_repo):
+        commit_file(git_template_repo, "template/NEW.md", "new")
+        at_tag = GitTemplate("repo", git_template_repo.as_uri() + "@v1")
+        at_head = GitTemplate("repo", git_template_repo.as_uri())
+        assert "NEW.md" not in {d.relpath for d in at_tag.iter_documents()}
+        assert "NEW.md" in {d.relpath for d in at_head.iter_documents()}
+
+    def test_offline_reuses_cache(self, git_template_repo):
+        GitTemplate("repo", git_template_repo.as_uri())
+        template = GitTemplate("repo", git_template_repo.as_uri(), offline=True)
+        assert len(list(template.documents())) == 4
+
+    def test_without_cache(self, git_template_repo):
+        template = GitTemplate("repo", git_template_repo.as_uri() + "@v1", use_cache=False)
+        documents = dict(template.documents())
+        assert "# {{ project_name }}" in documents["README.md.jinja"]
+        with pytest.raises(ValueError):
+            GitTemplate("repo", git_template_repo.as_uri(), offline=True, use_cache=False)
+
+
+class TestCheckoutFreeGitTemplate:
+    @pytest.fixture
+    def filterable_repo(self, git_template_repo):
+        from git import Repo
+
+        with Repo(git_template_repo).config_writer() as config:
+            config.set_value("uploadpack", "allowFilter", "true")
+        return git_template_repo
+
+    @pytest.mark.parametrize("use_cache", [True, False])
+    def test_reads_documents_from_objects(self, filterable_repo, use_cache, monkeypatch, temp_dir):
+        from git import Repo
+
+        monkeypatch.setenv("SKAF_CACHE_DIR", str(temp_dir / "cache"))
+        template = GitTemplate("repo", filterable_repo.as_uri(), use_cache=use_cache, checkout=False)
+        assert template.properties["templater"] == "jinja2"
+        assert template.variables_helper({})["from_helper"] == "HelperValue"
+        documents = dict(template.documents())
+        assert set(documents) == {
+            "pyproject.toml.jinja",
+            "README.md.jinja",
+            "src/{{ project_name }}/__init__.py",
+            "src/{{ project_name }}/main.py",
+        }
+        assert "A project by {{ author }}." in documents["README.md.jinja"]
+        sha = Repo(filterable_repo).head.commit.hexsha
+        assert not GitMirrorCache().tree_path(sha).exists()
+
+    def test_partial_mirror(self, filterable_repo):
+        from git import Repo
+
+        cache = GitMirrorCache()
+        GitTemplate("repo", filterable_repo.as_uri(), checkout=False)
+        mirror = Repo(cache.mirror_path(filterable_repo.as_uri()))
+        assert mirror.git.config("remote.origin.partialclonefilter") == "blob:none"
+
+    def test_documents_are_lazy(self, filterable_repo):
+        template = GitTemplate("repo", filterable_repo.as_uri(), checkout=False)
+        documents = {document.relpath: document for document in template.iter_documents()}
+        assert documents["src/{{ project_name }}/main.py"].read_text().startswith("def main():")
+
+    def test_offline_does_not_fetch_missing_blobs(self, filterable_repo):
+        GitTemplate("repo", filterable_repo.as_uri(), checkout=False)
+        template = GitTemplate("repo", filterable_repo.as_uri(), checkout=False, offline=True)
+        documents = {document.relpath: document for document in template.iter_documents()}
+        with pytest.raises(GitCacheError, match="offline mode"):
+            documents["README.md.jinja"].read_text()
+        online = GitTemplate("repo", filterable_repo.as_uri(), checkout=False)
+        assert "A project by" in dict(online.documents())["README.md.jinja"]
+
+    def test_concurrent_reads(self, filterable_repo):
+        from concurrent.futures import ThreadPoolExecutor
+
+        template = GitTemplate("repo", filterable_repo.as_uri(), checkout=False, use_cache=False)
+        documents = list(template.iter_documents()) * 20
+        pool = ThreadPoolExecutor(max_workers=8)
+        try:
+            # Interleaved reads of the shared cat-file process hang rather than fail.
+            contents = list(pool.map(lambda document: document.read_bytes(), documents, timeout=30))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        expected = {document.relpath: document.read_bytes() for document in documents}
+        assert contents == [expected[document.relpath] for document in documents]
+
+    def test_preserves_modes_and_symlinks(self, git_template_repo, temp_dir):
+        import os
+        from git import Repo, Actor
+        from skaf.scaffold.scaffold import scaffold_project
+
+        script = git_template_repo / "template" / "run.sh"
+        script.write_text("#!/bin/sh\n")
+        script.chmod(0o755)
+        os.symlink("run.sh", git_template_repo / "template" / "run-link.sh")
+        repo = Repo(git_template_repo)
+        repo.git.add(A=True)
+        actor = Actor("Test Author", "test@example.com")
+        repo.index.commit("Add script", author=actor, committer=actor)
+
+        template = GitTemplate("repo", git_template_repo.as_uri(), checkout=False)
+        scaffold_project(project_name="proj", template=template, output_dir=str(temp_dir / "out"))
+
+        project_dir = temp_dir / "out" / "proj"
+        assert os.access(project_dir / "run.sh", os.X_OK)
+        assert os.readlink(project_dir / "run-link.sh") == "run.sh"
+        assert (project_dir / "README.md").read_text().startswith("# proj")
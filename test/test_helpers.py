@@ -0,0 +1,85 @@
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from skaf.template_classes import helpers
+from skaf.template_classes.filesystem_template import FilesystemTemplate
+from skaf.template_classes.helpers import (
+    HELPER_MODULE_PREFIX,
+    compile_variables_helper,
+    helper_key,
+    variables_helper_from_source,
+)
+
+
+COUNTING_HELPER = """
+LOADS = []
+LOADS.append(1)
+
+def variables_helper(variables):
+    variables["loads"] = len(LOADS)
+    return variables
+"""
+
+
+@pytest.fixture
+def unique_source(request) -> str:
+    # Helper modules live for the whole process, so each test uses its own source.
+    return COUNTING_HELPER + f"# {request.node.nodeid}\n"
+
+
+class TestVariablesHelperModules:
+    def test_module_is_registered_and_reused(self, unique_source):
+        first = variables_helper_from_source(unique_source, "helper.py")
+        second = variables_helper_from_source(unique_source, "helper.py")
+        assert first is second
+        assert second({})["loads"] == 1
+        module = sys.modules[HELPER_MODULE_PREFIX + helper_key(unique_source, "helper.py")]
+        assert module.variables_helper is first
+        assert module.__file__ == "helper.py"
+
+    def test_changed_source_gets_a_new_module(self, unique_source):
+        first = variables_helper_from_source(unique_source, "helper.py")
+        second = variables_helper_from_source(unique_source + "\n", "helper.py")
+        assert first is not second
+
+    def test_failing_helper_is_not_registered(self):
+        source = "raise RuntimeError('broken helper')\n"
+        with pytest.raises(RuntimeError):
+            variables_helper_from_source(source, "broken.py")
+        assert HELPER_MODULE_PREFIX + helper_key(source, "broken.py") not in sys.modules
+
+    def test_missing_function(self):
+        with pytest.raises(ValueError, match="not callable"):
+            variables_helper_from_source("variables_helper = 1\n", "not_callable.py")
+
+    def test_templates_share_the_helper_module(self, sample_template_dir):
+        first = FilesystemTemplate("test_template", str(sample_template_dir))
+        second = FilesystemTemplate("test_template", str(sample_template_dir), use_index=False)
+        assert first.variables_helper is second.variables_helper
+
+
+class TestCompiledCodeCache:
+    def test_code_is_compiled_once(self, unique_source):
+        compile_variables_helper(unique_source, "helper.py")
+        assert os.path.exists(helpers._code_cache_path(helper_key(unique_source, "helper.py")))
+        with patch.object(helpers, "compile", side_effect=AssertionError("compiled"), create=True):
+            code = compile_variables_helper(unique_source, "helper.py")
+        assert code.co_filename == "helper.py"
+
+    def test_corrupt_entry_is_recompiled(self, unique_source):
+        path = helpers._code_cache_path(helper_key(unique_source, "helper.py"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(b"garbage")
+        code = compile_variables_helper(unique_source, "helper.py")
+        namespace = {}
+        exec(code, namespace)
+        assert namespace["variables_helper"]({})["loads"] == 1
+
+    def test_disabled_cache(self, unique_source, monkeypatch):
+        monkeypatch.setenv("SKAF_NO_CACHE", "1")
+        compile_variables_helper(unique_source, "helper.py")
+        assert not os.path.exists(helpers._code_cache_path(helper_key(unique_source, "helper.py")))
@@ -0,0 +1,57 @@
+import subprocess
+import sys
+from pathlib import Path
+
+
+HEAVY_MODULES = {"git", "jinja2", "yaml", "importlib.metadata"}
+
+
+def imported_modules(code: str, cwd: Path | None = None) -> set[str]:
+    """
+    Runs `code` in a fresh interpreter with `-X importtime` and returns the names of
+    every module it imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=cwd,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    return {
+        line.rsplit("|", 1)[1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "|" in line
+    }
+
+
+class TestColdStartImports:
+    def test_cli_import_is_light(self):
+        modules = imported_modules("import skaf.cli")
+        assert "skaf.cli" in modules
+        assert not modules & HEAVY_MODULES
+
+    def test_help_does_not_import_engines(self):
+        modules = imported_modules(
+            "import sys; sys.argv = ['skaf', '--help']\n"
+            "from skaf.cli import main\n"
+            "try:\n"
+            "    main()\n"
+            "except SystemExit:\n"
+            "    pass\n"
+        )
+        assert not modules & HEAVY_MODULES
+
+    def test_pystring_scaffold_skips_git_and_jinja(self, sample_pystring_template_dir, temp_dir):
+        modules = imported_modules(
+            "import sys\n"
+            f"sys.argv = ['skaf', 'proj', '-p', {str(sample_pystring_template_dir)!r}, '-o', {str(temp_dir)!r}, '--auto-use-defaults']\n"
+            "from skaf.cli import main\n"
+            "main()\n"
+        )
+        assert (temp_dir / "proj").is_dir()
+        assert "yaml" in modules
+        assert not modules & {"git", "jinja2", "skaf.templaters.jinja"}
+
+    def test_jinja_is_imported_when_selected(self):
+        modules = imported_modules("from skaf.templaters.registry import get_templater; get_templater('jinja2')")
+        assert "jinja2" in modules
+        assert "git" not in modules
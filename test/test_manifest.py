@@ -0,0 +1,195 @@
+import json
+import os
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from skaf.cli import rerender_main
+from skaf.scaffold import scaffold_project
+from skaf.scaffold import scaffold as scaffold_module
+from skaf.scaffold.manifest import MANIFEST_FILENAME, Manifest, file_hash
+from skaf.template_classes.filesystem_template import FilesystemTemplate
+
+
+OLD_TIME = 1_000_000_000
+
+
+def scaffold(template_dir: Path, output_dir: Path, overwrite: bool = False, **kwargs):
+    template = FilesystemTemplate("test_template", template_dir)
+    return scaffold_project(
+        project_name="test_project",
+        template=template,
+        output_dir=str(output_dir),
+        overwrite=overwrite,
+        **kwargs
+    )
+
+
+def age_files(project_dir: Path):
+    for root, dirs, files in os.walk(project_dir):
+        for name in files:
+            os.utime(Path(root) / name, (OLD_TIME, OLD_TIME))
+
+
+def touched(project_dir: Path) -> set[str]:
+    return {
+        (Path(root) / name).relative_to(project_dir).as_posix()
+        for root, dirs, files in os.walk(project_dir)
+        for name in files
+        if name != MANIFEST_FILENAME and (Path(root) / name).stat().st_mtime != OLD_TIME
+    }
+
+
+@pytest.fixture
+def project(sample_template_dir, temp_dir) -> Path:
+    output_dir = temp_dir / "output"
+    report = scaffold(sample_template_dir, output_dir, manifest=True)
+    assert sorted(report.added) == ["README.md", "pyproject.toml", "src/test_project/__init__.py", "src/test_project/main.py"]
+    project_dir = output_dir / "test_project"
+    age_files(project_dir)
+    return project_dir
+
+
+class TestManifest:
+    def test_manifest_is_written(self, project):
+        manifest = Manifest.load(project)
+        assert manifest.template_name == "test_template"
+        assert manifest.variables["project_name"] == "test_project"
+        entry = manifest.files["README.md"]
+        assert entry["source"] == "README.md.jinja"
+        assert entry["hash"] == file_hash(project / "README.md")
+        data = json.loads((project / MANIFEST_FILENAME).read_text())
+        assert data["fingerprint"] == manifest.fingerprint
+
+    def test_no_manifest_by_default(self, sample_template_dir, temp_dir):
+        assert scaffold(sample_template_dir, temp_dir) is None
+        assert not (temp_dir / "test_project" / MANIFEST_FILENAME).exists()
+
+    def test_rescaffold_without_changes_touches_nothing(self, sample_template_dir, project):
+        report = scaffold(sample_template_dir, project.parent, overwrite=True)
+
+        assert report.unchanged == 4
+        assert not (report.added or report.changed or report.removed or report.conflicted)
+        assert touched(project) == set()
+
+    def test_only_changed_sources_are_rewritten(self, sample_template_dir, project):
+        (sample_template_dir / "template" / "README.md.jinja").write_text("# {{ project_name }}\n\nUpdated.\n")
+
+        report = scaffold(sample_template_dir, project.parent, overwrite=True)
+
+        assert report.changed == ["README.md"]
+        assert touched(project) == {"README.md"}
+        assert "Updated." in (project / "README.md").read_text()
+
+    def test_changed_variables_only_write_differing_files(self, sample_template_dir, project):
+        report = scaffold(sample_template_dir, project.parent, overwrite=True, variables={"version": "2.0.0"}, executor="thread", jobs=2)
+
+        assert report.changed == ["pyproject.toml"]
+        assert touched(project) == {"pyproject.toml"}
+
+    def test_added_and_removed_files(self, sample_template_dir, project):
+        (sample_template_dir / "template" / "NEW.md").write_text("new")
+        (sample_template_dir / "template" / "src" / "{{ project_name }}" / "main.py").unlink()
+
+        report = scaffold(sample_template_dir, project.parent, overwrite=True)
+
+        assert report.added == ["NEW.md"]
+        assert report.removed == ["src/test_project/main.py"]
+        assert not (project / "src" / "test_project" / "main.py").exists()
+        assert "src/test_project/main.py" not in Manifest.load(project).files
+
+    def test_local_edits_are_conflicts(self, sample_template_dir, project):
+        (project / "README.md").write_text("my readme")
+        (project / "src" / "test_project" / "main.py").write_text("my main")
+        (sample_template_dir / "template" / "README.md.jinja").write_text("# changed")
+        (sample_template_dir / "template" / "src" / "{{ project_name }}" / "main.py").unlink()
+
+        report = scaffold(sample_template_dir, project.parent, overwrite=True)
+
+        assert sorted(report.conflicted) == ["README.md", "src/test_project/main.py"]
+        assert (project / "README.md").read_text() == "my readme"
+        assert (project / "src" / "test_project" / "main.py").read_text() == "my main"
+
+    def test_local_edit_without_template_change_is_kept(self, sample_template_dir, project):
+        (project / "README.md").write_text("my readme")
+
+        report = scaffold(sample_template_dir, project.parent, overwrite=True)
+
+        assert not report.conflicted
+        assert (project / "README.md").read_text() == "my readme"
+
+    def test_deleted_file_is_restored(self, sample_template_dir, project):
+        (project / "README.md").unlink()
+
+        report = scaffold(sample_template_dir, project.parent, overwrite=True)
+
+        assert report.added == ["README.md"]
+        assert (project / "README.md").exists()
+
+    def test_first_manifest_run_over_existing_project(self, sample_template_dir, temp_dir):
+        scaffold(sample_template_dir, temp_dir)
+        project_dir = temp_dir / "test_project"
+        age_files(project_dir)
+
+        report = scaffold(sample_template_dir, temp_dir, overwrite=True, manifest=True)
+
+        assert report.unchanged == 4
+        assert touched(project_dir) == set()
+        assert (project_dir / MANIFEST_FILENAME).exists()
+
+
+class TestDependencyTracking:
+    def test_dependencies_are_recorded(self, project):
+        files = Manifest.load(project).files
+        assert files["pyproject.toml"]["depends_on"] == ["author", "project_name", "version"]
+        assert files["src/test_project/main.py"]["depends_on"] == ["project_name"]
+
+    def test_only_dependent_files_are_rendered(self, sample_template_dir, project):
+        with patch.object(scaffold_module, "apply_templating", wraps=scaffold_module.apply_templating) as render:
+            report = scaffold(sample_template_dir, project.parent, overwrite=True, variables={"version": "2.0.0"})
+
+        rendered = [c.args[3] for c in render.call_args_list if len(c.args) > 3]
+        assert rendered == ["pyproject.toml.jinja"]
+        assert report.changed == ["pyproject.toml"]
+
+    def test_forced_variable_renders_dependents_without_writing(self, sample_template_dir, project):
+        with patch.object(scaffold_module, "apply_templating", wraps=scaffold_module.apply_templating) as render:
+            report = scaffold(sample_template_dir, project.parent, overwrite=True, changed_variables=["author"])
+
+        rendered = sorted(c.args[3] for c in render.call_args_list if len(c.args) > 3)
+        assert rendered == ["README.md.jinja", "pyproject.toml.jinja"]
+        assert report.unchanged == 4
+        assert touched(project) == set()
+
+
+class TestRerenderCommand:
+    def test_rerender_with_new_value(self, sample_template_dir, project, capsys):
+        rerender_main([str(project), "-p", str(sample_template_dir), "--set", "version=3.1.0"])
+
+        assert 'version = "3.1.0"' in (project / "pyproject.toml").read_text()
+        assert touched(project) == {"pyproject.toml"}
+        assert Manifest.load(project).variables["version"] == "3.1.0"
+        out = capsys.readouterr().out
+        assert "changed   pyproject.toml" in out
+        assert "1 changed" in out
+
+    def test_rerender_with_new_project_name(self, sample_template_dir, project):
+        rerender_main([str(project), "-p", str(sample_template_dir), "--set", "project_name=renamed"])
+
+        assert (project / "src" / "renamed" / "main.py").exists()
+        assert not (project / "src" / "test_project").exists()
+        assert 'name = "renamed"' in (project / "pyproject.toml").read_text()
+        assert Manifest.load(project).variables["project_name"] == "renamed"
+
+    def test_rerender_with_varfile(self, sample_template_dir, project, temp_dir):
+        varfile = temp_dir / "vars.yaml"
+        varfile.write_text("author: Someone Else\n")
+
+        rerender_main([str(project), "-p", str(sample_template_dir), "--varfile", str(varfile)])
+
+        assert touched(project) == {"pyproject.toml", "README.md"}
+
+    def test_rerender_without_manifest(self, temp_dir, capsys):
+        with pytest.raises(SystemExit):
+            rerender_main([str(temp_dir)])
+        assert "has no manifest" in capsys.readouterr().out
@@ -0,0 +1,111 @@
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from skaf.cli import get_filesystem_template, pack_main
+from skaf.scaffold import scaffold_project
+from skaf.scaffold.analysis import analyze_template
+from skaf.scaffold.manifest import content_hash
+from skaf.template_classes.pack_template import PACK_SUFFIX, PackFormatError, PackTemplate, write_pack
+from skaf.templaters.jinja import Jinja2Templater
+
+
+@pytest.fixture
+def pack_path(sample_template_dir, temp_dir) -> Path:
+    return write_pack(sample_template_dir, temp_dir / f"test_template{PACK_SUFFIX}")
+
+
+class TestPackTemplate:
+    def test_round_trip(self, pack_path, filesystem_template):
+        template = PackTemplate(None, pack_path)
+
+        assert template.template_name == "test_template"
+        assert template.properties == filesystem_template.properties
+        assert dict(template.documents()) == dict(filesystem_template.documents())
+        assert template.variables_helper({})["from_helper"] == "HelperValue"
+
+    def test_scaffold_from_pack(self, pack_path, temp_dir):
+        output_dir = temp_dir / "output"
+        template = PackTemplate(None, pack_path)
+        scaffold_project(project_name="packed", template=template, output_dir=str(output_dir))
+
+        project_dir = output_dir / "packed"
+        assert 'name = "packed"' in (project_dir / "pyproject.toml").read_text()
+        assert (project_dir / "src" / "packed" / "main.py").exists()
+
+    def test_documents_are_read_lazily(self, pack_path):
+        template = PackTemplate(None, pack_path)
+        with patch.object(PackTemplate, "_blob", wraps=template._blob) as blob:
+            documents = list(template.iter_documents())
+            assert blob.call_count == 0
+            documents[0].read_bytes()
+            assert blob.call_count >= 1
+
+    def test_reading_seeds_compiled_cache(self, pack_path):
+        Jinja2Templater.reset_environment()
+        template = PackTemplate(None, pack_path)
+        readme = next(d for d in template.iter_documents() if d.relpath == "README.md.jinja")
+        source = readme.read_text()
+        assert source in Jinja2Templater.compiled_cache
+        assert Jinja2Templater().render(source, {"project_name": "x", "author": "y"}).startswith("# x")
+
+    def test_incompatible_pack_falls_back_to_source(self, pack_path):
+        Jinja2Templater.reset_environment()
+        template = PackTemplate(None, pack_path)
+        template._bytecode_compatible = False
+        template._templater_compatible = False
+        readme = next(d for d in template.iter_documents() if d.relpath == "README.md.jinja")
+        source = readme.read_text()
+        assert source not in Jinja2Templater.compiled_cache
+        assert template._load_variables_helper()({})["from_helper"] == "HelperValue"
+
+    def test_documents_carry_stored_digest(self, pack_path):
+        template = PackTemplate(None, pack_path)
+        with patch.object(PackTemplate, "_blob", wraps=template._blob) as blob:
+            documents = [d for d in template.iter_documents() if d.link_target is None]
+            digests = [d.digest for d in documents]
+            assert blob.call_count == 0
+        assert digests == [content_hash(d.read_bytes()) for d in documents]
+
+    def test_unchanged_files_are_not_read_to_analyse(self, pack_path):
+        template = PackTemplate(None, pack_path)
+        analysis = analyze_template(template, Jinja2Templater())
+        with patch.object(PackTemplate, "_blob", wraps=template._blob) as blob:
+            assert analyze_template(template, Jinja2Templater()).required_variables == analysis.required_variables
+            assert blob.call_count == 0
+
+    def test_non_json_properties(self, sample_template_dir, temp_dir):
+        properties = sample_template_dir / "template_properties.yaml"
+        properties.write_text(properties.read_text() + "released: 2024-05-01\n")
+        template = PackTemplate(None, write_pack(sample_template_dir, temp_dir / "t.skafpack"))
+        assert template.properties["released"] == "2024-05-01"
+
+    def test_preserves_mode(self, sample_template_dir, temp_dir):
+        script = sample_template_dir / "template" / "run.sh"
+        script.write_text("#!/bin/sh\n")
+        script.chmod(0o755)
+        template = PackTemplate(None, write_pack(sample_template_dir, temp_dir / "t.skafpack"))
+        document = next(d for d in template.iter_documents() if d.relpath == "run.sh")
+        assert document.mode == 0o755
+
+    @pytest.mark.parametrize("content", [b"", b"NOTAPACK" + bytes(16)])
+    def test_invalid_pack(self, temp_dir, content):
+        path = temp_dir / "bad.skafpack"
+        path.write_bytes(content)
+        with pytest.raises(PackFormatError):
+            PackTemplate(None, path)
+
+
+class TestPackCli:
+    def test_pack_main(self, sample_template_dir, temp_dir, capsys):
+        output = temp_dir / "out.skafpack"
+        pack_main([str(sample_template_dir), "-o", str(output), "--name", "renamed"])
+
+        assert "packed into" in capsys.readouterr().out
+        template = get_filesystem_template(str(output))
+        assert isinstance(template, PackTemplate)
+        assert template.template_name == "renamed"
+
+    def test_pack_main_invalid_dir(self, temp_dir):
+        with pytest.raises(SystemExit):
+            pack_main([str(temp_dir / "missing")])
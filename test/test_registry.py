@@ -1,13 +1,19 @@
 import pytest
+import warnings
 from unittest.mock import patch, MagicMock
 
 from skaf.registry import (
     register_template,
+    register_template_factory,
     get_template,
+    available_templates,
+    invalidate_template_index,
     load_and_register_packaged_templates,
+    load_and_register_template_plugins,
     RegisterTemplateError,
     LoadTemplateError
 )
+from skaf import registry
 from skaf.template_classes.base import BaseTemplate
 
 
@@ -58,6 +64,114 @@ class TestTemplateRegistry:
         with pytest.raises(LoadTemplateError):
             get_template("none")
 
+    def test_factory_is_resolved_on_first_get(self):
+        factory = MagicMock(return_value=MockTemplate("lazy_template"))
+        register_template_factory("lazy_template", factory)
+
+        assert "lazy_template" in available_templates()
+        factory.assert_not_called()
+        assert get_template("lazy_template") is get_template("lazy_template")
+        factory.assert_called_once()
+
+    def test_factory_returning_non_template(self):
+        register_template_factory("bad_factory_template", lambda: "not a template")
+        with pytest.raises(LoadTemplateError):
+            get_template("bad_factory_template")
+
+    def test_duplicate_factory(self):
+        register_template_factory("duplicate_factory", lambda: MockTemplate("duplicate_factory"))
+        with pytest.raises(RegisterTemplateError):
+            register_template(MockTemplate("duplicate_factory"))
+
+    def test_index_is_cached_and_invalidated(self):
+        index = available_templates()
+        assert available_templates() is index
+        invalidate_template_index()
+        assert available_templates() == index
+        register_template(MockTemplate("indexed_template"))
+        assert "indexed_template" in available_templates()
+
+
+@patch('importlib.metadata.entry_points')
+def test_plugins_are_not_loaded_until_requested(mock_entry_points):
+    entry_point = MagicMock()
+    entry_point.name = "plugin_template"
+    entry_point.load.return_value = MockTemplate("plugin_template")
+    mock_entry_points.return_value = [entry_point]
+
+    load_and_register_template_plugins()
+
+    assert "plugin_template" in available_templates()
+    entry_point.load.assert_not_called()
+    assert get_template("plugin_template").template_name == "plugin_template"
+    entry_point.load.assert_called_once()
+
+
+class TestDiscovery:
+    @pytest.fixture(autouse=True)
+    def undiscovered(self, monkeypatch):
+        monkeypatch.setattr(registry, "_discovered", False)
+        monkeypatch.setattr(registry, "_templates", {})
+        monkeypatch.setattr(registry, "_template_factories", {})
+        monkeypatch.setattr(registry, "_template_index", None)
+        monkeypatch.setattr(registry, "_discovered_sources", {})
+        monkeypatch.setattr(registry, "_plugin_names", set())
+
+    @staticmethod
+    def entry_point(name, template_name=None):
+        entry_point = MagicMock()
+        entry_point.name = name
+        entry_point.value = f"plugin:{name}"
+        entry_point.load.return_value = MockTemplate(template_name or name)
+        return entry_point
+
+    def test_explicit_loading_is_not_repeated(self):
+        with patch("importlib.metadata.entry_points", return_value=[self.entry_point("some_plugin")]):
+            load_and_register_packaged_templates()
+            load_and_register_template_plugins()
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                load_and_register_packaged_templates()
+                assert get_template("some_plugin").template_name == "some_plugin"
+                assert "setuptools_pyproject" in available_templates()
+
+    def test_plugin_found_by_template_name(self):
+        entry_points = [self.entry_point("entry_name", "plugin_template")]
+        with patch("importlib.metadata.entry_points", return_value=entry_points):
+            assert available_templates() == ("entry_name", "setuptools_pyproject")
+            template = get_template("plugin_template")
+        assert template.template_name == "plugin_template"
+        assert get_template("entry_name") is template
+        with pytest.raises(LoadTemplateError):
+            get_template("missing_template")
+
+    def test_conflicting_plugin_does_not_block_others(self):
+        register_template(MockTemplate("setuptools_pyproject"))
+        entry_points = [self.entry_point("setuptools_pyproject"), self.entry_point("other_plugin")]
+        with patch("importlib.metadata.entry_points", return_value=entry_points), \
+             pytest.warns(UserWarning, match="already registered"):
+            names = available_templates()
+        assert "other_plugin" in names
+        assert get_template("other_plugin").template_name == "other_plugin"
+
+    def test_failed_discovery_is_retried(self):
+        with patch("importlib.metadata.entry_points", return_value=[self.entry_point("late_plugin")]), \
+             patch.object(registry, "template_lib_dir") as template_lib_dir:
+            template_lib_dir.iterdir.side_effect = OSError("unreadable")
+            with pytest.raises(OSError):
+                available_templates()
+            template_lib_dir.iterdir.side_effect = None
+            template_lib_dir.iterdir.return_value = []
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                assert "late_plugin" in available_templates()
+
+    def test_unlistable_plugins_are_reported(self):
+        with patch("importlib.metadata.entry_points", side_effect=RuntimeError("broken metadata")), \
+             pytest.warns(UserWarning, match="broken metadata"):
+            names = available_templates()
+        assert "setuptools_pyproject" in names
+
 
 @patch('skaf.registry.FilesystemTemplate')
 @patch('skaf.registry.template_lib_dir')
@@ -86,12 +200,15 @@ class TestLoadTemplates:
         # Run the function
         load_and_register_packaged_templates()
         
-        # Check that the templates were created and registered
-        assert mock_filesystem_template.call_count == 2
+        # Templates are registered without being created
+        assert mock_filesystem_template.call_count == 0
+        assert {"template1", "template2"} <= set(available_templates())
         
-        # Should be able to get the templates
+        # Should be able to get the templates, each created once
         assert get_template("template1") == mock_template1
         assert get_template("template2") == mock_template2
+        assert get_template("template1") == mock_template1
+        assert mock_filesystem_template.call_count == 2
     
     def test_load_templates_with_error(self, mock_template_lib_dir, mock_filesystem_template):
         # Setup mock to raise an exception
@@ -103,6 +220,7 @@ class TestLoadTemplates:
         
         mock_filesystem_template.side_effect = Exception("Test error")
         
-        # Run the function - should raise LoadTemplateError
+        # Loading is deferred, so the error is raised when the template is requested
+        load_and_register_packaged_templates()
         with pytest.raises(LoadTemplateError):
-            load_and_register_packaged_templates()
+            get_template("error_template")
@@ -0,0 +1,176 @@
+import json
+import os
+import zipfile
+from unittest.mock import patch
+
+import pytest
+
+from skaf.scaffold import Scaffolder
+from skaf.scaffold.manifest import MANIFEST_FILENAME, file_hash
+from skaf.scaffold.render_cache import RenderCache
+from skaf.template_classes.dict_template import DictTemplate
+from skaf.template_classes.filesystem_template import FilesystemTemplate
+from skaf.templaters.jinja import Jinja2Templater
+from skaf.templaters.pystring import PystringTemplater
+
+
+def not_rendered():
+    """Fails if a file with template syntax is rendered; literal files are always rendered."""
+    def render(document, variables, templater, filename=None):
+        if not templater.is_literal(document):
+            raise AssertionError("rendered")
+        return templater.render_literal(document)
+    return patch("skaf.scaffold.scaffold.apply_templating", side_effect=render)
+
+
+@pytest.fixture
+def template(request) -> DictTemplate:
+    # The render cache is shared by the whole session, so each test renders its own sources.
+    return DictTemplate(
+        request.node.nodeid,
+        {"custom_variables": [{"name": "greeting", "default": "hello"}, {"name": "unused", "default": "x"}]},
+        {
+            "README.md.jinja": f"# {{{{ project_name }}}}\n<!-- {request.node.nodeid} -->\n",
+            "greeting.txt.jinja": "{{ greeting }}!",
+            "literal.txt.jinja": "no template syntax",
+            "static.txt": "copied",
+        },
+    )
+
+
+class TestRenderCache:
+    def test_round_trip(self, temp_dir):
+        cache = RenderCache(temp_dir)
+        key = cache.key(Jinja2Templater(), "source", {"a": 1}, ["a"])
+        assert cache.get(key) is None
+        cache.put(key, "rendered")
+        hit = cache.get(key)
+        assert hit.path.read_text() == "rendered"
+        assert hit.digest == file_hash(hit.path)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_key_depends_only_on_used_variables(self):
+        templater = Jinja2Templater()
+        key = RenderCache.key(templater, "source", {"a": 1, "b": 2}, ["a"])
+        assert key == RenderCache.key(templater, "source", {"a": 1, "b": 3}, ["a"])
+        assert key != RenderCache.key(templater, "source", {"a": 2, "b": 2}, ["a"])
+        assert key != RenderCache.key(templater, "other source", {"a": 1, "b": 2}, ["a"])
+        assert key != RenderCache.key(PystringTemplater(), "source", {"a": 1, "b": 2}, ["a"])
+        # Without known dependencies, every variable is part of the key.
+        assert RenderCache.key(templater, "source", {"a": 1, "b": 2}, None) != RenderCache.key(templater, "source", {"a": 1, "b": 3}, None)
+
+    def test_identical_output_is_stored_once(self, temp_dir):
+        cache = RenderCache(temp_dir)
+        cache.put("a" * 64, "same")
+        cache.put("b" * 64, "same")
+        assert cache.get("a" * 64).path == cache.get("b" * 64).path
+
+    def test_modified_object_is_a_miss(self, temp_dir):
+        cache = RenderCache(temp_dir)
+        cache.put("a" * 64, "rendered")
+        cache.get("a" * 64).path.write_text("edited in place")
+        assert cache.get("a" * 64) is None
+
+    def test_object_edited_in_place_is_a_miss(self, temp_dir):
+        cache = RenderCache(temp_dir)
+        cache.put("a" * 64, "rendered")
+        path = cache.get("a" * 64).path
+        path.write_text("RENDERED")
+        assert cache.get("a" * 64) is None
+        assert not path.exists()
+
+    def test_pruned_when_over_size_limit(self, temp_dir):
+        cache = RenderCache(temp_dir, max_bytes=1000)
+        for i in range(20):
+            cache.put(f"{i:064x}", f"{i}" * 100)
+        assert sum(file.stat().st_size for file in temp_dir.rglob("*") if file.is_file()) <= 1000
+        assert cache.get(f"{19:064x}") is not None
+
+
+class TestScaffoldWithRenderCache:
+    def test_hits_are_not_rendered(self, template, temp_dir):
+        scaffolder = Scaffolder(template, render_cache=True)
+        scaffolder.scaffold("proj", {}, temp_dir / "first")
+        with not_rendered():
+            scaffolder.scaffold("proj", {"unused": "changed"}, temp_dir / "second")
+        for name in ("README.md", "greeting.txt", "literal.txt", "static.txt"):
+            assert (temp_dir / "second" / "proj" / name).read_text() == (temp_dir / "first" / "proj" / name).read_text()
+
+    def test_changed_variable_is_rendered_again(self, template, temp_dir):
+        scaffolder = Scaffolder(template, render_cache=True)
+        scaffolder.scaffold("proj", {}, temp_dir / "first")
+        scaffolder.scaffold("proj", {"greeting": "bye"}, temp_dir / "second")
+        assert (temp_dir / "second" / "proj" / "greeting.txt").read_text() == "bye!"
+
+    def test_thread_executor(self, template, temp_dir):
+        scaffolder = Scaffolder(template, render_cache=True, executor="thread", jobs=2)
+        scaffolder.scaffold("proj", {}, temp_dir / "first")
+        with not_rendered():
+            scaffolder.scaffold("proj", {}, temp_dir / "second")
+        assert (temp_dir / "second" / "proj" / "greeting.txt").read_text() == "hello!"
+
+    def test_archive_output(self, template, temp_dir):
+        scaffolder = Scaffolder(template, render_cache=True)
+        scaffolder.scaffold("proj", {}, temp_dir / "first")
+        with not_rendered():
+            scaffolder.scaffold("proj", {}, temp_dir / "proj.zip")
+        with zipfile.ZipFile(temp_dir / "proj.zip") as archive:
+            assert archive.read("proj/greeting.txt") == b"hello!"
+
+    def test_manifest_records_hits(self, template, temp_dir):
+        scaffolder = Scaffolder(template, render_cache=True)
+        scaffolder.scaffold("proj", {}, temp_dir / "first")
+        scaffolder.scaffold("proj", {}, temp_dir / "second", manifest=True)
+        project = temp_dir / "second" / "proj"
+        files = json.loads((project / MANIFEST_FILENAME).read_text())["files"]
+        assert files["greeting.txt"]["hash"] == file_hash(project / "greeting.txt")
+
+    def test_hardlinked_hits(self, request, temp_dir):
+        template_dir = temp_dir / "template_dir"
+        (template_dir / "template").mkdir(parents=True)
+        (template_dir / "template_properties.yaml").write_text("templater: jinja2\n")
+        (template_dir / "template" / "out.txt.jinja").write_text(f"{{{{ project_name }}}} {request.node.nodeid}")
+        os.chmod(template_dir / "template" / "out.txt.jinja", 0o644)
+        scaffolder = Scaffolder(FilesystemTemplate("linked", str(template_dir)), link_static="hardlink", render_cache=True)
+        scaffolder.scaffold("proj", {}, temp_dir / "first")
+        scaffolder.scaffold("proj", {}, temp_dir / "second")
+        first, second = temp_dir / "first" / "proj" / "out.txt", temp_dir / "second" / "proj" / "out.txt"
+        assert os.stat(second).st_nlink > 1
+        assert first.read_text() == second.read_text()
+        assert os.stat(second).st_mode & 0o7777 == 0o644
+
+    def test_edited_template_file_in_a_long_lived_scaffolder(self, request, temp_dir):
+        template_dir = temp_dir / "template_dir"
+        (template_dir / "template").mkdir(parents=True)
+        (template_dir / "template_properties.yaml").write_text(
+            "templater: jinja2\ncustom_variables:\n  - name: extra\n    default: x\n"
+        )
+        source = template_dir / "template" / "out.txt.jinja"
+        source.write_text(f"{{{{ project_name }}}} {request.node.nodeid}")
+        scaffolder = Scaffolder(FilesystemTemplate("edited", str(template_dir)), render_cache=True)
+        scaffolder.scaffold("proj", {}, temp_dir / "first")
+        source.write_text(f"{{{{ extra }}}} {request.node.nodeid}")
+        scaffolder.scaffold("proj", {"extra": "one"}, temp_dir / "second")
+        scaffolder.scaffold("proj", {"extra": "two"}, temp_dir / "third")
+        assert (temp_dir / "third" / "proj" / "out.txt").read_text().startswith("two ")
+
+    def test_disabled_by_default(self, template, temp_dir, monkeypatch):
+        monkeypatch.delenv("SKAF_RENDER_CACHE", raising=False)
+        scaffolder = Scaffolder(template)
+        scaffolder.scaffold("proj", {}, temp_dir / "first")
+        with pytest.raises(AssertionError, match="rendered"), not_rendered():
+            scaffolder.scaffold("proj", {}, temp_dir / "second")
+
+    def test_enabled_by_environment(self, template, temp_dir, monkeypatch):
+        monkeypatch.setenv("SKAF_RENDER_CACHE", "1")
+        scaffolder = Scaffolder(template)
+        scaffolder.scaffold("proj", {}, temp_dir / "first")
+        with not_rendered():
+            scaffolder.scaffold("proj", {}, temp_dir / "second")
+
+    def test_no_cache_wins(self, template, temp_dir, monkeypatch):
+        monkeypatch.setenv("SKAF_NO_CACHE", "1")
+        scaffolder = Scaffolder(template, render_cache=True)
+        scaffolder.scaffold("proj", {}, temp_dir / "first")
+        with pytest.raises(AssertionError, match="rendered"), not_rendered():
+            scaffolder.scaffold("proj", {}, temp_dir / "second")
@@ -7,11 +7,13 @@ from copy import copy
 
 from skaf.scaffold.scaffold import (
     apply_templating,
+    iter_paths,
     map_paths,
     scaffold_project,
     get_template_variable_values,
     get_package_template_dir,
-    load_template_properties
+    load_template_properties,
+    render_relpath
 )
 
 from skaf.scaffold.context import (
@@ -28,6 +30,9 @@ from skaf.scaffold.utils import (
 )
 
 from skaf.templaters.jinja import Jinja2Templater
+from skaf.templaters.pystring import PystringTemplater
+from skaf.template_classes.document import TemplateDocument
+from skaf.template_classes.dict_template import DictTemplate
 
 
 class TestScaffoldUtilities:
@@ -56,6 +61,12 @@ class TestScaffoldUtilities:
         with pytest.raises(RuntimeError):
             apply_templating("Hello {{ missing }}!", {}, templater)
     
+    @pytest.mark.parametrize("templater", [Jinja2Templater(), PystringTemplater()])
+    def test_apply_templating_leaves_non_templated_files_unchanged(self, templater):
+        document = "abc\r\nx\n"
+        assert apply_templating(document, {}, templater, "file.txt") == document
+        assert templater.render(document, {}, template_filename="file.txt") == document
+
     def test_add_project_name_variables(self):
         variables = {}
         result = add_project_name_variables("my_project", variables)
@@ -91,6 +102,8 @@ class TestGetTemplateVariableValues:
         context.project_name = 'test_project'
         context.auto_use_defaults = False
         context.variables_filepath = None
+        context.variables = None
+        context.interactive = True
 
         def variables_helper(variables: dict) -> dict:
             variables["from_helper"] = "HelperValue"
@@ -126,6 +139,8 @@ class TestGetTemplateVariableValues:
         context.project_name = 'test_project'
         context.auto_use_defaults = True
         context.variables_filepath = None
+        context.variables = None
+        context.interactive = True
 
         def variables_helper(variables: dict) -> dict:
             variables["from_helper"] = "HelperValue"
@@ -158,6 +173,8 @@ class TestGetTemplateVariableValues:
         context.auto_use_defaults = False
         context._debug = True
         context.variables_filepath = None
+        context.variables = None
+        context.interactive = True
 
         def variables_helper(variables: dict) -> dict:
             variables["from_helper"] = "HelperValue"
@@ -335,6 +352,26 @@ class TestMapPaths:
         assert Path("src/test_project/main.py") in paths  # project_name substituted
 
 
+    def test_iter_paths_does_not_read_content(self, temp_dir):
+        reads = []
+        template = DictTemplate("lazy", {}, {})
+        template.iter_documents = lambda: iter([
+            TemplateDocument("{{ project_name }}.txt", loader=lambda: reads.append(1) or "content"),
+        ])
+        context = ScaffoldContext(
+            project_name="test_project",
+            template_name="lazy",
+            output_dir=temp_dir,
+            template=template
+        )
+
+        targets = list(iter_paths(context, {"project_name": "test_project"}))
+
+        assert [relpath for relpath, _ in targets] == [Path("test_project.txt")]
+        assert reads == []
+        assert not context.project_path.exists()
+
+
 class TestScaffoldProject:
     @patch('skaf.scaffold.scaffold.get_template_variable_values')
     def test_scaffold_project_basic(self, mock_get_vars, filesystem_template, temp_dir):
@@ -420,29 +457,38 @@ class TestScaffoldProject:
     
     @patch('skaf.scaffold.scaffold.ScaffoldContext')
     @patch('skaf.scaffold.scaffold.get_template_variable_values')
-    @patch('skaf.scaffold.scaffold.map_paths')
+    @patch('skaf.scaffold.scaffold.iter_paths')
     @patch('os.listdir')
     @patch('pathlib.Path.exists')
     @patch('pathlib.Path.mkdir')
     @patch('builtins.open', new_callable=mock_open)
     @patch('skaf.scaffold.scaffold.apply_templating')
     def test_scaffold_project_mock_implementation(self, mock_apply_templating, mock_open_file, mock_mkdir,
-                                     mock_exists, mock_listdir, mock_map_paths, mock_get_vars, mock_context, filesystem_template):
+                                     mock_exists, mock_listdir, mock_iter_paths, mock_get_vars, mock_context, filesystem_template):
         # Setup mocks
         mock_context_instance = MagicMock()
         mock_context_instance.template_name = 'test_template'
         mock_context_instance.project_name = 'test_project'
         mock_context_instance.project_path = Path('/output/test_project')
         mock_context_instance.force = False
+        mock_context_instance.executor = None
+        mock_context_instance.jobs = None
+        mock_context_instance.manifest = False
+        mock_context_instance.stream_threshold = 1 << 20
+        mock_context_instance.output_sink = "directory"
+        mock_context_instance._debug = False
+        mock_context_instance.render_cache = False
+        mock_context_instance.dedup = None
+        mock_context_instance.templater = Jinja2Templater()
         mock_context.return_value = mock_context_instance
         mock_context._debug = False
         
         mock_get_vars.return_value = {'project_name': 'test_project'}
         
-        mock_map_paths.return_value = {
-            Path('file1.py'): 'content1',
-            Path('file2.py'): 'content2'
-        }
+        mock_iter_paths.return_value = [
+            (Path('file1.py.jinja'), TemplateDocument('file1.py.jinja', content='content1')),
+            (Path('file2.py.jinja'), TemplateDocument('file2.py.jinja', content='content2'))
+        ]
         
         # Setup directory checks
         mock_exists.return_value = False
@@ -462,7 +508,7 @@ class TestScaffoldProject:
         # Verify results
         mock_context.assert_called_once()
         mock_get_vars.assert_called_once_with(mock_context_instance)
-        mock_map_paths.assert_called_once_with(mock_context_instance, {'project_name': 'test_project'})
+        mock_iter_paths.assert_called_once_with(mock_context_instance, {'project_name': 'test_project'})
         assert mock_open_file.call_count == 2
         assert mock_apply_templating.call_count == 2
     
@@ -480,6 +526,14 @@ class TestScaffoldProject:
         mock_context_instance.project_name = 'test_project'
         mock_context_instance.project_path = Path('/output/test_project')
         mock_context_instance.overwrite = False
+        mock_context_instance.executor = None
+        mock_context_instance.jobs = None
+        mock_context_instance.manifest = False
+        mock_context_instance.stream_threshold = 1 << 20
+        mock_context_instance.output_sink = "directory"
+        mock_context_instance._debug = False
+        mock_context_instance.render_cache = False
+        mock_context_instance.dedup = None
         mock_context.return_value = mock_context_instance
         
         # Setup directory checks to indicate it exists with files
@@ -502,3 +556,66 @@ class TestScaffoldProject:
             "Project directory '/output/test_project' already exists. Set --overwrite to overwrite."
         )
         mock_exit.assert_called_once_with(1)
+
+    @patch('skaf.scaffold.scaffold.get_template_variable_values')
+    def test_scaffold_project_new_dir_without_overwrite(self, mock_get_vars, filesystem_template, temp_dir):
+        mock_get_vars.return_value = {
+            "project_name": "test_project",
+            "author": "Test Author",
+            "version": "0.1.0",
+        }
+
+        scaffold_project(
+            project_name="test_project",
+            template_name="test_template",
+            output_dir=str(temp_dir),
+            template=filesystem_template,
+            overwrite=False,
+        )
+
+        project_dir = temp_dir / "test_project"
+        assert (project_dir / "src" / "test_project" / "main.py").exists()
+        assert (project_dir / "pyproject.toml").read_text().startswith("[project]")
+
+
+
+class TestUpFrontAnalysis:
+    def test_missing_variable_fails_before_writing(self, temp_dir):
+        template = DictTemplate("t", {"custom_variables": []}, {
+            "a.txt.jinja": "{{ project_name }}",
+            "b.txt.jinja": "{{ undefined_var }}",
+        })
+        with pytest.raises(ValueError, match="'undefined_var' \\(used in b.txt.jinja\\)"):
+            scaffold_project(project_name="proj", template=template, output_dir=str(temp_dir), _debug=True)
+        assert not (temp_dir / "proj").exists()
+
+    def test_missing_variable_exits_without_debug(self, temp_dir, capsys):
+        template = DictTemplate("t", {"custom_variables": []}, {"{{ dirname }}/a.txt": "x"})
+        with pytest.raises(SystemExit):
+            scaffold_project(project_name="proj", template=template, output_dir=str(temp_dir))
+        assert "'dirname'" in capsys.readouterr().out
+        assert not (temp_dir / "proj").exists()
+
+    def test_optional_variables_are_not_required(self, temp_dir):
+        template = DictTemplate("t", {"custom_variables": []}, {
+            "a.txt.jinja": "{% if extra is defined %}{{ extra }}{% endif %}{{ other | default('x') }}",
+        })
+        scaffold_project(project_name="proj", template=template, output_dir=str(temp_dir), _debug=True)
+        assert (temp_dir / "proj" / "a.txt").read_text() == "x"
+
+    def test_render_relpath_memoizes_directories(self):
+        templater = Jinja2Templater()
+        rendered_dirs = {}
+        variables = {"pkg": "demo", "name": "mod"}
+        with patch('skaf.scaffold.scaffold.apply_templating', wraps=apply_templating) as render:
+            assert render_relpath("src/{{ pkg }}/a.py", variables, templater, rendered_dirs) == Path("src/demo/a.py")
+            assert render_relpath("src/{{ pkg }}/{{ name }}.py", variables, templater, rendered_dirs) == Path("src/demo/mod.py")
+            assert render_relpath("README.md", variables, templater, rendered_dirs) == Path("README.md")
+        rendered = [c.args[0] for c in render.call_args_list]
+        assert rendered.count("src/{{ pkg }}") == 1
+        assert "README.md" not in rendered
+
+    def test_render_relpath_expression_spanning_separator(self):
+        templater = Jinja2Templater()
+        path = render_relpath("{{ 'a/b' }}/c", {}, templater, {})
+        assert path == Path("a/b/c")
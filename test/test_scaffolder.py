@@ -0,0 +1,90 @@
+import io
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from skaf import Scaffolder, ScaffoldError, VariableError, OutputExistsError, RenderError
+from skaf.template_classes.dict_template import DictTemplate
+from skaf.templaters.jinja import Jinja2Templater
+
+
+@pytest.fixture
+def service_template() -> DictTemplate:
+    return DictTemplate(
+        "service",
+        {
+            "custom_variables": [
+                {"name": "port", "type": "int"},
+                {"name": "owner", "type": "str", "default": "platform"},
+            ]
+        },
+        {
+            "{{ project_name }}/config.yaml.jinja": "port: {{ port }}\nowner: {{ owner }}",
+            "static.txt": "{{ untouched }}",
+        },
+    )
+
+
+class TestScaffolder:
+    def test_scaffold(self, service_template, temp_dir):
+        scaffolder = Scaffolder(service_template)
+        report = scaffolder.scaffold("svc", {"port": 8000}, temp_dir)
+        assert report is None
+        assert (temp_dir / "svc" / "svc" / "config.yaml").read_text() == "port: 8000\nowner: platform"
+        assert (temp_dir / "svc" / "static.txt").read_text() == "{{ untouched }}"
+
+    def test_setup_happens_once(self, service_template, temp_dir):
+        with patch("skaf.scaffold.context.get_templater") as get_templater:
+            scaffolder = Scaffolder(service_template)
+            for i in range(50):
+                scaffolder.scaffold(f"svc_{i}", {"port": i}, temp_dir)
+        get_templater.assert_not_called()
+        assert (temp_dir / "svc_49" / "svc_49" / "config.yaml").read_text() == "port: 49\nowner: platform"
+
+    def test_warms_compiled_cache(self, service_template):
+        Jinja2Templater.reset_environment()
+        Scaffolder(service_template)
+        assert "port: {{ port }}\nowner: {{ owner }}" in Jinja2Templater.compiled_cache
+
+    def test_concurrent_scaffolds(self, service_template, temp_dir):
+        scaffolder = Scaffolder(service_template)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda i: scaffolder.scaffold(f"svc_{i}", {"port": i}, temp_dir), range(40)))
+        for i in range(40):
+            assert (temp_dir / f"svc_{i}" / f"svc_{i}" / "config.yaml").read_text() == f"port: {i}\nowner: platform"
+
+    def test_archive_to_stream(self, service_template):
+        stream = io.BytesIO()
+        Scaffolder(service_template).scaffold("svc", {"port": 1}, "-", output_format="tar", output_stream=stream)
+        with tarfile.open(fileobj=io.BytesIO(stream.getvalue())) as archive:
+            assert archive.extractfile("svc/svc/config.yaml").read() == b"port: 1\nowner: platform"
+
+
+class TestScaffolderErrors:
+    def test_missing_variable(self, service_template, temp_dir):
+        with pytest.raises(VariableError, match="port"):
+            Scaffolder(service_template).scaffold("svc", {}, temp_dir)
+        assert not (temp_dir / "svc").exists()
+
+    def test_invalid_variable(self, service_template, temp_dir):
+        with pytest.raises(VariableError):
+            Scaffolder(service_template).scaffold("svc", {"port": "not a number"}, temp_dir)
+
+    def test_output_exists(self, service_template, temp_dir):
+        scaffolder = Scaffolder(service_template)
+        scaffolder.scaffold("svc", {"port": 1}, temp_dir)
+        with pytest.raises(OutputExistsError, match="already exists"):
+            scaffolder.scaffold("svc", {"port": 2}, temp_dir)
+        scaffolder.scaffold("svc", {"port": 2}, temp_dir, overwrite=True)
+        assert (temp_dir / "svc" / "svc" / "config.yaml").read_text() == "port: 2\nowner: platform"
+
+    def test_render_error(self, temp_dir):
+        template = DictTemplate("broken", {}, {"a.txt.jinja": "{{ [1, 2][7] + 1 }}"})
+        with pytest.raises(RenderError):
+            Scaffolder(template).scaffold("proj", {}, temp_dir)
+
+    def test_errors_keep_builtin_bases(self):
+        for error, base in ((VariableError, ValueError), (OutputExistsError, FileExistsError), (RenderError, RuntimeError)):
+            assert issubclass(error, ScaffoldError) and issubclass(error, base)
@@ -0,0 +1,135 @@
+import io
+import json
+import tarfile
+import threading
+import zipfile
+from http.client import HTTPConnection, IncompleteRead
+
+import pytest
+
+from skaf.serve import ScaffoldServer, load_served_templates
+from skaf.template_classes.dict_template import DictTemplate
+from skaf.templaters.jinja import Jinja2Templater
+
+
+@pytest.fixture
+def server(filesystem_template):
+    templates = load_served_templates([], [filesystem_template])
+    server = ScaffoldServer(("127.0.0.1", 0), templates, max_concurrency=2, queue_timeout=0, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def request(server, method, path, body=None):
+    connection = HTTPConnection(*server.server_address[:2], timeout=10)
+    try:
+        payload = json.dumps(body).encode() if body is not None else None
+        connection.request(method, path, body=payload, headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+class TestScaffoldServer:
+    def test_templates_are_warm(self, filesystem_template):
+        Jinja2Templater.reset_environment()
+        load_served_templates([], [filesystem_template])
+        readme = next(d for d in filesystem_template.iter_documents() if d.relpath == "README.md.jinja")
+        assert readme.read_text() in Jinja2Templater.compiled_cache
+
+    def test_list_templates(self, server):
+        status, _, body = request(server, "GET", "/templates")
+        assert status == 200
+        assert json.loads(body) == {"templates": ["test_template"]}
+
+    def test_scaffold_tar_gz(self, server):
+        status, headers, body = request(server, "POST", "/scaffold/test_template",
+                                        {"project_name": "served", "variables": {"author": "Ada"}})
+        assert status == 200
+        assert headers["Content-Type"] == "application/gzip"
+        assert 'filename="served.tar.gz"' in headers["Content-Disposition"]
+        with tarfile.open(fileobj=io.BytesIO(body), mode="r:gz") as archive:
+            pyproject = archive.extractfile("served/pyproject.toml").read().decode()
+        assert 'name = "served"' in pyproject
+        assert 'name = "Ada"' in pyproject
+
+    def test_scaffold_zip(self, server):
+        status, _, body = request(server, "POST", "/scaffold/test_template",
+                                  {"project_name": "served", "format": "zip", "no_project_dir": True})
+        assert status == 200
+        with zipfile.ZipFile(io.BytesIO(body)) as archive:
+            assert "pyproject.toml" in archive.namelist()
+
+    def test_bad_requests(self, server):
+        assert request(server, "POST", "/scaffold/missing", {"project_name": "x"})[0] == 404
+        assert request(server, "POST", "/scaffold/test_template", {"variables": {}})[0] == 400
+        assert request(server, "POST", "/scaffold/test_template", {"project_name": "x", "format": "rar"})[0] == 400
+        assert request(server, "GET", "/nothing")[0] == 404
+
+    def test_error_before_output_is_reported(self, temp_dir):
+        template = DictTemplate("needs", {"custom_variables": []}, {"a.txt.jinja": "{{ required_value }}"})
+        server = ScaffoldServer(("127.0.0.1", 0), load_served_templates([], [template]), quiet=True)
+        thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        thread.start()
+        try:
+            status, _, body = request(server, "POST", "/scaffold/needs", {"project_name": "x"})
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert status == 400
+        assert "required_value" in json.loads(body)["error"]
+
+    def test_error_mid_stream_truncates_response(self, temp_dir):
+        template = DictTemplate("late", {"custom_variables": []}, {"a.txt.jinja": "x" * 100_000, "b.txt.jinja": "{{ [][1] }}"})
+        server = ScaffoldServer(("127.0.0.1", 0), load_served_templates([], [template]), quiet=True)
+        # The handler records the failure on its own thread; wait for it rather than
+        # assuming it has run by the time the client sees the broken body.
+        failed = threading.Event()
+        finish = server.metrics.finish
+
+        def record(*args, ok, **kwargs):
+            finish(*args, ok=ok, **kwargs)
+            if not ok:
+                failed.set()
+
+        server.metrics.finish = record
+        thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        thread.start()
+        try:
+            with pytest.raises(IncompleteRead):
+                request(server, "POST", "/scaffold/late", {"project_name": "x", "format": "tar"})
+            assert failed.wait(timeout=10)
+            assert server.metrics.snapshot()["failed"] == 1
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_concurrency_limit(self, server):
+        server.slots.acquire()
+        server.slots.acquire()
+        try:
+            status, headers, _ = request(server, "POST", "/scaffold/test_template", {"project_name": "x"})
+        finally:
+            server.slots.release()
+            server.slots.release()
+        assert status == 503
+        assert headers["Retry-After"] == "1"
+
+    def test_metrics(self, server):
+        request(server, "POST", "/scaffold/test_template", {"project_name": "one"})
+        request(server, "POST", "/scaffold/test_template", {"project_name": "two"})
+        request(server, "POST", "/scaffold/test_template", {})
+        status, _, body = request(server, "GET", "/metrics")
+        metrics = json.loads(body)
+        assert status == 200
+        assert metrics["scaffolds"] == 2
+        assert metrics["scaffolds_by_template"] == {"test_template": 2}
+        assert metrics["in_flight"] == 0
+        assert metrics["bytes_sent"] > 0
+        assert metrics["requests"] == 4
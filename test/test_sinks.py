@@ -0,0 +1,142 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from skaf.scaffold import scaffold_project
+from skaf.scaffold.manifest import MANIFEST_FILENAME
+from skaf.scaffold.sinks import infer_sink
+from skaf.template_classes.dict_template import DictTemplate
+
+
+def _scaffold(filesystem_template, output_dir, **kwargs):
+    return scaffold_project(
+        project_name="test_project",
+        template=filesystem_template,
+        output_dir=str(output_dir),
+        auto_use_defaults=True,
+        **kwargs
+    )
+
+
+def _directory_files(root: Path) -> dict[str, bytes]:
+    return {
+        path.relative_to(root).as_posix(): path.read_bytes()
+        for path in root.rglob("*") if path.is_file()
+    }
+
+
+def _tar_files(archive: tarfile.TarFile) -> dict[str, bytes]:
+    return {member.name: archive.extractfile(member).read() for member in archive.getmembers() if member.isfile()}
+
+
+@pytest.fixture
+def expected(filesystem_template, temp_dir) -> dict[str, bytes]:
+    _scaffold(filesystem_template, temp_dir / "dir")
+    return _directory_files(temp_dir / "dir")
+
+
+class TestArchiveSinks:
+    @pytest.mark.parametrize("suffix", [".tar", ".tar.gz"])
+    def test_tar_matches_directory(self, suffix, filesystem_template, temp_dir, expected):
+        output = temp_dir / f"out{suffix}"
+        _scaffold(filesystem_template, output)
+        with tarfile.open(output) as archive:
+            assert _tar_files(archive) == expected
+        assert not (temp_dir / "test_project").exists()
+        assert [p.name for p in temp_dir.iterdir() if p.name.startswith(".out")] == []
+
+    def test_zip_matches_directory(self, filesystem_template, temp_dir, expected):
+        output = temp_dir / "out.zip"
+        _scaffold(filesystem_template, output)
+        with zipfile.ZipFile(output) as archive:
+            assert {name: archive.read(name) for name in archive.namelist()} == expected
+
+    def test_stream(self, filesystem_template, temp_dir, expected):
+        stream = io.BytesIO()
+        _scaffold(filesystem_template, "-", output_sink="tar.gz", output_stream=stream)
+        stream.seek(0)
+        with tarfile.open(fileobj=stream, mode="r:gz") as archive:
+            assert _tar_files(archive) == expected
+
+    def test_no_project_dir(self, filesystem_template, temp_dir):
+        output = temp_dir / "out.tar"
+        _scaffold(filesystem_template, output, no_project_dir=True)
+        with tarfile.open(output) as archive:
+            assert "pyproject.toml" in archive.getnames()
+
+    def test_overwrite(self, filesystem_template, temp_dir):
+        output = temp_dir / "out.zip"
+        output.write_bytes(b"existing")
+        with pytest.raises(SystemExit):
+            _scaffold(filesystem_template, output)
+        assert output.read_bytes() == b"existing"
+        _scaffold(filesystem_template, output, overwrite=True)
+        assert zipfile.is_zipfile(output)
+
+    def test_failure_leaves_no_archive(self, temp_dir):
+        template = DictTemplate("failing", {"custom_variables": []}, {"a.txt.jinja": "a", "b.txt.jinja": "{{ [][1] }}"})
+        output = temp_dir / "out.tar"
+        with pytest.raises(RuntimeError):
+            scaffold_project(project_name="proj", template=template, output_dir=str(output))
+        assert list(temp_dir.iterdir()) == []
+
+    @pytest.mark.parametrize("suffix", [".tar", ".zip"])
+    def test_streamed_content_modes_and_symlinks(self, suffix, temp_dir):
+        template_dir = temp_dir / "tpl"
+        (template_dir / "template").mkdir(parents=True)
+        (template_dir / "template_properties.yaml").write_text("custom_variables: []\n")
+        (template_dir / "template" / "big.txt.jinja").write_text("{% for i in range(1000) %}{{ i }}\n{% endfor %}")
+        script = template_dir / "template" / "run.sh"
+        script.write_text("#!/bin/sh\n")
+        os.chmod(script, 0o755)
+        os.symlink("run.sh", template_dir / "template" / "link.sh")
+        from skaf.template_classes.filesystem_template import FilesystemTemplate
+
+        output = temp_dir / f"out{suffix}"
+        scaffold_project(project_name="proj", template=FilesystemTemplate("tpl", template_dir),
+                         output_dir=str(output), stream_threshold=0)
+        big = "".join(f"{i}\n" for i in range(1000)).encode()
+        if suffix == ".tar":
+            with tarfile.open(output) as archive:
+                assert archive.extractfile("proj/big.txt").read() == big
+                assert archive.getmember("proj/run.sh").mode == 0o755
+                assert archive.getmember("proj/link.sh").linkname == "run.sh"
+        else:
+            with zipfile.ZipFile(output) as archive:
+                assert archive.read("proj/big.txt") == big
+                assert archive.getinfo("proj/run.sh").external_attr >> 16 & 0o777 == 0o755
+                assert archive.read("proj/link.sh") == b"run.sh"
+
+    def test_manifest_is_written_into_archive(self, filesystem_template, temp_dir):
+        output = temp_dir / "out.tar"
+        report = _scaffold(filesystem_template, output, manifest=True)
+        assert "pyproject.toml" in report.added
+        with tarfile.open(output) as archive:
+            manifest = json.loads(archive.extractfile(f"test_project/{MANIFEST_FILENAME}").read())
+        assert "pyproject.toml" in manifest["files"]
+
+    def test_infer_sink(self):
+        assert infer_sink("-") == "tar"
+        assert infer_sink("a/b.ZIP") == "zip"
+        assert infer_sink("b.tgz") == "tar.gz"
+        assert infer_sink("b.tar") == "tar"
+        assert infer_sink("some/dir") == "directory"
+
+
+def test_cli_writes_tar_to_stdout(sample_template_dir, temp_dir):
+    result = subprocess.run(
+        [sys.executable, "-c", "from skaf.cli import main; main()",
+         "proj", "-p", str(sample_template_dir), "-o", "-", "--auto-use-defaults"],
+        capture_output=True, cwd=temp_dir,
+    )
+    assert result.returncode == 0, result.stderr
+    assert b"initialized successfully" in result.stderr
+    with tarfile.open(fileobj=io.BytesIO(result.stdout)) as archive:
+        assert b'name = "proj"' in archive.extractfile("proj/pyproject.toml").read()
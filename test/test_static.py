@@ -0,0 +1,85 @@
+import os
+import stat
+import pytest
+from pathlib import Path
+
+from skaf.scaffold.scaffold import scaffold_project
+from skaf.scaffold.static import copy_static_file, write_static_document
+from skaf.template_classes.document import TemplateDocument
+from skaf.template_classes.filesystem_template import FilesystemTemplate
+
+
+BINARY = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def binary_template_dir(sample_template_dir) -> Path:
+    content_dir = sample_template_dir / "template"
+    (content_dir / "logo.png").write_bytes(BINARY)
+    script = content_dir / "run.sh.jinja"
+    script.write_text("#!/bin/sh\necho {{ project_name }}\n")
+    script.chmod(0o755)
+    tool = content_dir / "tool.sh"
+    tool.write_text("#!/bin/sh\n")
+    tool.chmod(0o750)
+    os.symlink("logo.png", content_dir / "logo-link.png")
+    return sample_template_dir
+
+
+class TestCopyStaticFile:
+    @pytest.mark.parametrize("link_mode", ["copy", "hardlink", "reflink"])
+    def test_copies_bytes_and_mode(self, link_mode, temp_dir):
+        source = temp_dir / "source.bin"
+        source.write_bytes(BINARY)
+        source.chmod(0o741)
+        destination = temp_dir / "destination.bin"
+        destination.write_bytes(b"stale")
+
+        copy_static_file(source, destination, link_mode)
+
+        assert destination.read_bytes() == BINARY
+        assert stat.S_IMODE(destination.stat().st_mode) == 0o741
+        if link_mode == "hardlink":
+            assert os.path.samefile(source, destination)
+
+    def test_recreates_symlinks(self, temp_dir):
+        (temp_dir / "target").write_text("x")
+        os.symlink("target", temp_dir / "link")
+        copy_static_file(temp_dir / "link", temp_dir / "copied_link")
+        assert os.readlink(temp_dir / "copied_link") == "target"
+
+    def test_invalid_link_mode(self, temp_dir):
+        with pytest.raises(ValueError):
+            copy_static_file(temp_dir / "a", temp_dir / "b", "symlink")
+
+    def test_in_memory_document(self, temp_dir):
+        write_static_document(TemplateDocument("data.bin", content=BINARY), temp_dir / "data.bin")
+        assert (temp_dir / "data.bin").read_bytes() == BINARY
+
+
+class TestStaticPassthrough:
+    def test_binary_files_and_modes_survive_scaffolding(self, binary_template_dir, temp_dir):
+        template = FilesystemTemplate("test_template", str(binary_template_dir))
+        output_dir = temp_dir / "out"
+        scaffold_project(project_name="test_project", template=template, output_dir=str(output_dir))
+
+        project_dir = output_dir / "test_project"
+        assert (project_dir / "logo.png").read_bytes() == BINARY
+        assert os.readlink(project_dir / "logo-link.png") == "logo.png"
+        assert (project_dir / "run.sh").read_text() == "#!/bin/sh\necho test_project"
+        assert stat.S_IMODE((project_dir / "run.sh").stat().st_mode) == 0o755
+        assert stat.S_IMODE((project_dir / "tool.sh").stat().st_mode) == 0o750
+
+    def test_static_files_are_not_read(self, temp_dir):
+        from skaf.template_classes.dict_template import DictTemplate
+
+        template = DictTemplate("lazy", {"custom_variables": []}, {"readme.md.jinja": "# {{ project_name }}"})
+        reads = []
+        static = TemplateDocument("blob.bin", loader=lambda: reads.append("read") or BINARY)
+        template.iter_documents = lambda: iter([static, TemplateDocument("readme.md.jinja", content="# {{ project_name }}")])
+
+        scaffold_project(project_name="proj", template=template, output_dir=str(temp_dir), executor="thread", jobs=2)
+
+        assert (temp_dir / "proj" / "blob.bin").read_bytes() == BINARY
+        assert (temp_dir / "proj" / "readme.md").read_text() == "# proj"
+        assert reads == ["read"]  # read once, while writing
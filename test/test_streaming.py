@@ -0,0 +1,113 @@
+import tracemalloc
+from unittest.mock import patch
+
+import pytest
+
+from skaf.scaffold.scaffold import scaffold_project
+from skaf.template_classes.dict_template import DictTemplate
+from skaf.templaters.base import buffer_chunks
+from skaf.templaters.jinja import Jinja2Templater
+from skaf.templaters.pystring import PystringTemplater
+
+
+class TestRenderStream:
+    @pytest.mark.parametrize("template", [
+        "plain text\n",
+        "Hello {{ name }}!\n{% for i in range(100) %}line {{ i }}\n{% endfor %}",
+        "{{ name }}",
+        "line\r\n" * 20 + "last\r\n",
+        "a" * 15 + "\r\n" + "b" * 40 + "\r" + "\n\n",
+        "\n",
+        "",
+    ])
+    def test_jinja_matches_render(self, template):
+        templater = Jinja2Templater()
+        context = {"name": "world"}
+        chunks = list(templater.render_stream(template, context, buffer_size=16))
+        assert "".join(chunks) == templater.render(template, context)
+
+    def test_jinja_literal_is_sliced_without_rendering(self):
+        templater = Jinja2Templater()
+        template = "plain text\n" * 100
+        with patch.object(Jinja2Templater, "render_literal", side_effect=AssertionError("rendered")), \
+             patch.object(Jinja2Templater, "compile", side_effect=AssertionError("compiled")):
+            chunks = list(templater.render_stream(template, {}, buffer_size=64))
+        assert all(len(chunk) == 64 for chunk in chunks[:-1])
+        assert "".join(chunks) == template[:-1]
+
+    def test_jinja_streamed_template_is_not_kept_compiled(self):
+        templater = Jinja2Templater()
+        template = "{% for i in range(3) %}{{ i }}{% endfor %} streamed"
+        assert "".join(templater.render_stream(template, {})) == "012 streamed"
+        assert template not in templater.compiled_cache
+
+    @pytest.mark.parametrize("template", [
+        "plain text",
+        "Hello $name and ${name}! $$ $missing ${missing} $",
+        "$name" * 50,
+    ])
+    def test_pystring_matches_render(self, template):
+        templater = PystringTemplater()
+        context = {"name": "world"}
+        chunks = list(templater.render_stream(template, context, buffer_size=16))
+        assert "".join(chunks) == templater.render(template, context)
+
+    def test_buffer_chunks(self):
+        chunks = list(buffer_chunks(["ab"] * 10, buffer_size=5))
+        assert chunks == ["ababab", "ababab", "ababab", "ab"]
+        assert list(buffer_chunks([], buffer_size=5)) == []
+
+
+def _large_template(lines: int) -> DictTemplate:
+    body = "{% for i in range(" + str(lines) + ") %}line {{ i }} of {{ project_name }}\n{% endfor %}"
+    return DictTemplate("large", {"custom_variables": []}, {"big.txt.jinja": body, "small.txt.jinja": "{{ project_name }}"})
+
+
+class TestStreamedScaffold:
+    @pytest.mark.parametrize("executor", ["serial", "thread", "process"])
+    def test_streamed_output_matches(self, executor, temp_dir):
+        scaffold_project(
+            project_name="proj",
+            template=_large_template(1000),
+            output_dir=str(temp_dir),
+            executor=executor,
+            jobs=2,
+            stream_threshold=0,
+        )
+        expected = "".join(f"line {i} of proj\n" for i in range(1000))
+        assert (temp_dir / "proj" / "big.txt").read_text() == expected
+        assert (temp_dir / "proj" / "small.txt").read_text() == "proj"
+
+    def test_streaming_bounds_memory(self, temp_dir):
+        lines = 200_000
+        tracemalloc.start()
+        try:
+            scaffold_project(
+                project_name="proj",
+                template=_large_template(lines),
+                output_dir=str(temp_dir),
+                stream_threshold=0,
+            )
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        size = (temp_dir / "proj" / "big.txt").stat().st_size
+        assert size > 3_000_000
+        assert peak < size / 2
+
+    def test_streamed_with_manifest(self, temp_dir):
+        kwargs = dict(
+            project_name="proj",
+            template=_large_template(1000),
+            output_dir=str(temp_dir),
+            stream_threshold=0,
+            manifest=True,
+        )
+        report = scaffold_project(**kwargs)
+        assert sorted(report.added) == ["big.txt", "small.txt"]
+        report = scaffold_project(overwrite=True, **kwargs)
+        assert report.unchanged == 2
+        (temp_dir / "proj" / "big.txt").unlink()
+        report = scaffold_project(overwrite=True, **kwargs)
+        assert report.added == ["big.txt"]
+        assert (temp_dir / "proj" / "big.txt").read_text().startswith("line 0 of proj\n")
@@ -3,6 +3,7 @@ import pytest
 from pathlib import Path
 
 from skaf.template_classes.filesystem_template import FilesystemTemplate
+from skaf.template_classes.document import TemplateDocument
 
 
 class TestFilesystemTemplate:
@@ -73,3 +74,28 @@ class TestFilesystemTemplate:
         assert len(custom_vars) == 2
         assert custom_vars[0]["name"] == "author"
         assert custom_vars[1]["name"] == "version"
+
+    def test_iter_documents_is_lazy(self, filesystem_template, sample_template_dir):
+        documents = {document.relpath: document for document in filesystem_template.iter_documents()}
+        readme = documents["README.md.jinja"]
+        assert readme.path == sample_template_dir / "template" / "README.md.jinja"
+        assert "{{ author }}" in readme.read_text()
+        assert readme.read_bytes() == readme.path.read_bytes()
+
+
+class TestTemplateDocument:
+    def test_in_memory_content(self):
+        document = TemplateDocument("file.txt", content="héllo")
+        assert document.read_text() == "héllo"
+        assert document.read_bytes() == "héllo".encode("utf-8")
+
+    def test_loader_is_called_on_read(self):
+        calls = []
+        document = TemplateDocument("file.bin", loader=lambda: calls.append(1) or b"\x00\x01")
+        assert calls == []
+        assert document.read_bytes() == b"\x00\x01"
+        assert calls == [1]
+
+    def test_without_source(self):
+        with pytest.raises(ValueError):
+            TemplateDocument("missing").read_text()
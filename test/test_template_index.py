@@ -0,0 +1,111 @@
+import os
+from unittest.mock import patch
+
+from skaf.scaffold.manifest import file_hash
+from skaf.template_classes.filesystem_template import FilesystemTemplate
+from skaf.template_classes.template_index import TemplateIndex, file_stamp
+
+
+def documents(template: FilesystemTemplate) -> list[tuple[str, str | None]]:
+    return [(document.relpath, document.digest) for document in template.iter_documents()]
+
+
+def bump(path) -> None:
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestTemplateIndex:
+    def test_unchanged_template_is_not_parsed(self, sample_template_dir):
+        FilesystemTemplate("test_template", str(sample_template_dir))
+        with patch("yaml.safe_load", side_effect=AssertionError("parsed")), \
+             patch("skaf.template_classes.filesystem_template.compile_variables_helper", side_effect=AssertionError("compiled")):
+            template = FilesystemTemplate("test_template", str(sample_template_dir))
+        assert template.properties["templater"] == "jinja2"
+        assert template.variables_helper({})["from_helper"] == "HelperValue"
+
+    def test_changed_properties_are_reparsed(self, sample_template_dir):
+        FilesystemTemplate("test_template", str(sample_template_dir))
+        properties = sample_template_dir / "template_properties.yaml"
+        properties.write_text("templater: pystring\n")
+        bump(properties)
+        assert FilesystemTemplate("test_template", str(sample_template_dir)).properties == {"templater": "pystring"}
+
+    def test_changed_helper_is_recompiled(self, sample_template_dir):
+        FilesystemTemplate("test_template", str(sample_template_dir))
+        helper = sample_template_dir / "variables_helper.py"
+        helper.write_text("def variables_helper(variables):\n    return {'changed': True}\n")
+        bump(helper)
+        assert FilesystemTemplate("test_template", str(sample_template_dir)).variables_helper({}) == {"changed": True}
+
+    def test_documents_match_a_walk(self, sample_template_dir):
+        template_root = sample_template_dir / "template"
+        os.symlink("src", template_root / "linked_src")
+        indexed = documents(FilesystemTemplate("test_template", str(sample_template_dir)))
+        walked = [relpath for relpath, _ in documents(FilesystemTemplate("test_template", str(sample_template_dir), use_index=False))]
+        assert [relpath for relpath, _ in indexed] == walked
+        assert all(digest == file_hash(template_root / relpath) for relpath, digest in indexed)
+
+    def test_files_are_hashed_on_demand(self, sample_template_dir):
+        template_root = sample_template_dir / "template"
+        expected = file_hash(template_root / "README.md.jinja")
+        with patch("skaf.scaffold.manifest.file_hash", wraps=file_hash) as hashed:
+            listed = list(FilesystemTemplate("test_template", str(sample_template_dir)).iter_documents())
+            assert hashed.call_count == 0
+            readme = next(document for document in listed if document.relpath == "README.md.jinja")
+            assert readme.digest == expected
+            assert readme.digest == expected
+        assert [call.args[0] for call in hashed.call_args_list] == [template_root / "README.md.jinja"]
+
+    def test_digests_are_reused_until_files_change(self, sample_template_dir):
+        template_root = sample_template_dir / "template"
+        template = FilesystemTemplate("test_template", str(sample_template_dir))
+        expected = dict(documents(template))
+        template._index.flush()
+        with patch("skaf.scaffold.manifest.file_hash", side_effect=AssertionError("hashed")):
+            assert dict(documents(FilesystemTemplate("test_template", str(sample_template_dir)))) == expected
+        (template_root / "README.md.jinja").write_text("# changed\n")
+        bump(template_root / "README.md.jinja")
+        result = dict(documents(FilesystemTemplate("test_template", str(sample_template_dir))))
+        assert result["README.md.jinja"] == file_hash(template_root / "README.md.jinja") != expected["README.md.jinja"]
+
+    def test_digests_are_saved_when_listed_again(self, sample_template_dir):
+        template = FilesystemTemplate("test_template", str(sample_template_dir))
+        documents(template)
+        list(template.iter_documents())
+        index = TemplateIndex(sample_template_dir)
+        readme = sample_template_dir / "template" / "README.md.jinja"
+        assert index.digest("README.md.jinja", file_stamp(readme)) == file_hash(readme)
+
+    def test_changed_files_are_listed(self, sample_template_dir):
+        template = FilesystemTemplate("test_template", str(sample_template_dir))
+        documents(template)
+        template_root = sample_template_dir / "template"
+        (template_root / "README.md.jinja").write_text("# changed\n")
+        (template_root / "NEW.txt").write_text("new\n")
+        (template_root / "pyproject.toml.jinja").unlink()
+        result = dict(documents(FilesystemTemplate("test_template", str(sample_template_dir))))
+        assert "pyproject.toml.jinja" not in result
+        assert result["NEW.txt"] == file_hash(template_root / "NEW.txt")
+        assert result["README.md.jinja"] == file_hash(template_root / "README.md.jinja")
+
+    def test_unmarshallable_properties_are_not_stored(self, sample_template_dir):
+        (sample_template_dir / "template_properties.yaml").write_text("released: 2024-01-01\n")
+        FilesystemTemplate("test_template", str(sample_template_dir))
+        template = FilesystemTemplate("test_template", str(sample_template_dir))
+        assert str(template.properties["released"]) == "2024-01-01"
+
+    def test_corrupt_index_is_rebuilt(self, sample_template_dir):
+        index = TemplateIndex(sample_template_dir)
+        index.path.parent.mkdir(parents=True, exist_ok=True)
+        index.path.write_bytes(b"not an index")
+        template = FilesystemTemplate("test_template", str(sample_template_dir))
+        assert len(documents(template)) == 4
+        stamp = file_stamp(sample_template_dir / "template_properties.yaml")
+        assert TemplateIndex(sample_template_dir).lookup("properties", stamp) == template.properties
+
+    def test_disabled_cache(self, sample_template_dir, monkeypatch):
+        monkeypatch.setenv("SKAF_NO_CACHE", "1")
+        template = FilesystemTemplate("test_template", str(sample_template_dir))
+        assert all(digest is None for _, digest in documents(template))
+        assert not TemplateIndex(sample_template_dir).path.exists()
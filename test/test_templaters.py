@@ -3,6 +3,7 @@ import pytest
 from skaf.templaters.jinja import Jinja2Templater
 from skaf.templaters.pystring import PystringTemplater
 from skaf.templaters.registry import get_templater
+from skaf.templaters.cache import CompiledTemplateCache
 
 
 class TestTemplaters:
@@ -48,3 +49,47 @@ class TestTemplaterRegistry:
     def test_get_nonexistent_templater(self):
         with pytest.raises(KeyError):
             get_templater("nonexistent")
+
+
+class TestCompiledTemplaters:
+    def test_jinja2_compile_and_render_compiled(self, jinja2_templater):
+        compiled = jinja2_templater.compile("Hello, {{ name }}!")
+        assert jinja2_templater.render_compiled(compiled, {"name": "World"}) == "Hello, World!"
+        assert jinja2_templater.render_compiled(compiled, {"name": "Again"}) == "Hello, Again!"
+
+    def test_jinja2_compile_reuses_cached_template(self, jinja2_templater):
+        source = "Cached {{ value }}"
+        first = jinja2_templater.compile(source)
+        second = Jinja2Templater().compile(source)
+        assert first is second
+        assert source in Jinja2Templater.compiled_cache
+
+    def test_jinja2_shared_environment(self):
+        assert Jinja2Templater.environment() is Jinja2Templater.environment()
+
+    def test_pystring_compile_and_render_compiled(self, pystring_templater):
+        compiled = pystring_templater.compile("Hello, ${name}!")
+        assert pystring_templater.render_compiled(compiled, {"name": "World"}) == "Hello, World!"
+        assert pystring_templater.compile("Hello, ${name}!") is compiled
+
+    def test_render_many(self, jinja2_templater, pystring_templater):
+        assert jinja2_templater.render_many(["{{ a }}", "{{ a }}{{ a }}"], {"a": "x"}) == ["x", "xx"]
+        assert pystring_templater.render_many(["$a", "${a}${a}"], {"a": "x"}) == ["x", "xx"]
+
+    def test_render_respects_suffix(self, jinja2_templater):
+        assert jinja2_templater.render("{{ a }}", {"a": "x"}, template_filename="file.txt") == "{{ a }}"
+        assert jinja2_templater.render("{{ a }}", {"a": "x"}, template_filename="file.txt.jinja") == "x"
+
+
+class TestCompiledTemplateCache:
+    def test_lru_eviction(self):
+        cache = CompiledTemplateCache(maxsize=2)
+        cache.get_or_compile("a", str.upper)
+        cache.get_or_compile("b", str.upper)
+        cache.get_or_compile("a", str.upper)
+        cache.get_or_compile("c", str.upper)
+        assert len(cache) == 2
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.hits == 1
+        assert cache.misses == 3